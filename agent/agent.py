@@ -1,4 +1,49 @@
+from agent.health_planner import HealthStateSpace, plan_lifestyle
 from agent.search import a_star
+from agent.state import GLUCOSE_LEVELS, State
+from models.risk import RISK_LEVELS
+
+
+# Memoized A* results, keyed by interned State
+_PLAN_CACHE = {}
+
+# Discretized glucose/BMI/BP space for multi-step lifestyle plans
+_HEALTH_SPACE = HealthStateSpace()
+
+
+def plan_for(state):
+    """Return the (memoized) A* plan for a state as a tuple of action names."""
+    plan = _PLAN_CACHE.get(state)
+    if plan is None:
+        plan = _PLAN_CACHE[state] = tuple(a_star(state))
+    return plan
+
+
+def plan_many(states):
+    """
+    Plan for many states at once, running A* at most once per distinct state.
+
+    Args:
+        states: Iterable of State objects
+
+    Returns:
+        list: One plan (list of action names) per input state, in order
+    """
+    states = list(states)
+    plans = {state: plan_for(state) for state in dict.fromkeys(states)}
+    return [list(plans[state]) for state in states]
+
+
+def precompute_plans():
+    """Fill the plan table for every glucose x risk state."""
+    for glucose in GLUCOSE_LEVELS:
+        for risk in RISK_LEVELS:
+            plan_for(State(glucose, risk))
+
+
+def clear_plan_cache():
+    """Drop memoized plans (e.g. after changing the action set)."""
+    _PLAN_CACHE.clear()
 
 
 class DiabetesAgent:
@@ -6,4 +51,11 @@ class DiabetesAgent:
         self.state = state
 
     def plan(self):
-        return a_star(self.state)
+        return list(plan_for(self.state))
+
+    def lifestyle_plan(self, patient, algorithm="astar"):
+        """Multi-step scenario plan for a 1 x 8 patient (see agent/health_planner.py)."""
+        return plan_lifestyle(patient, _HEALTH_SPACE, algorithm)
+
+
+precompute_plans()
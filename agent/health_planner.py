@@ -0,0 +1,365 @@
+"""
+Numeric Health Planner
+======================
+Multi-step lifestyle planning over a discretized (glucose, BMI, blood
+pressure) state space. Actions are the simulation scenarios from
+models/simulator.py, with their feature changes as effects and their
+"cost" as step cost.
+
+States are encoded as single integers (mixed-radix over the grid bins),
+so the A* frontier holds plain (f, g, int) tuples and the explored set,
+cost table and parent links are keyed by small ints. For very large
+searches, IDA* with a bounded transposition table trades re-expansions
+for memory.
+
+The chat loop reaches it through DiabetesAgent.lifestyle_plan() when a
+user asks for a step-by-step plan (see utterance.py).
+"""
+
+import heapq
+import itertools
+import math
+import time
+
+from models.simulator import FEATURE_MAP, SCENARIOS
+
+
+# ==================== CONSTANTS ====================
+
+PLANNER_FEATURES = ("Glucose", "BMI", "BloodPressure")
+
+# (low, high, step) per planner feature; lows act as physiological floors
+DEFAULT_GRID = {
+    "Glucose": (60.0, 300.0, 5.0),
+    "BMI": (15.0, 70.0, 0.5),
+    "BloodPressure": (40.0, 140.0, 2.0),
+}
+
+# Upper bounds a state must reach on every feature
+DEFAULT_GOAL = {
+    "Glucose": 140.0,
+    "BMI": 25.0,
+    "BloodPressure": 80.0,
+}
+
+
+# ==================== STATE SPACE ====================
+
+class HealthStateSpace:
+    """
+    Discretized health state space with integer-encoded states.
+
+    A state is the bin index of each feature in PLANNER_FEATURES, encoded
+    as code = glucose_bin * strides[0] + bmi_bin * strides[1] + bp_bin.
+    """
+
+    def __init__(self, grid=None, goal=None, scenario_names=None):
+        grid = {**DEFAULT_GRID, **(grid or {})}
+        goal = {**DEFAULT_GOAL, **(goal or {})}
+
+        self.lows = [grid[f][0] for f in PLANNER_FEATURES]
+        self.steps = [grid[f][2] for f in PLANNER_FEATURES]
+        self.sizes = [int(round((grid[f][1] - grid[f][0]) / grid[f][2])) + 1
+                      for f in PLANNER_FEATURES]
+        self.strides = (self.sizes[1] * self.sizes[2], self.sizes[2], 1)
+        self.n_states = self.sizes[0] * self.sizes[1] * self.sizes[2]
+        self.goal_bins = tuple(self.to_bin(d, goal[f]) for d, f in enumerate(PLANNER_FEATURES))
+
+        if scenario_names is None:
+            scenario_names = [name for name in SCENARIOS if _improves_any(name)]
+        self.actions = self._build_actions(scenario_names)
+
+        # Cheapest cost per bin of reduction, per feature (inf if no action helps)
+        self.rates = []
+        for d in range(len(PLANNER_FEATURES)):
+            ratios = [cost / -deltas[d] for _, cost, deltas in self.actions if deltas[d] < 0]
+            self.rates.append(min(ratios) if ratios else math.inf)
+
+    def _build_actions(self, scenario_names):
+        """Convert scenario modifiers into per-feature bin deltas."""
+        actions = []
+        for name in scenario_names:
+            modifiers = SCENARIOS[name]["modifiers"]
+            deltas = tuple(int(round(modifiers.get(f, 0) / self.steps[d]))
+                           for d, f in enumerate(PLANNER_FEATURES))
+            if any(deltas):
+                actions.append((name, SCENARIOS[name]["cost"], deltas))
+        return actions
+
+    def to_bin(self, dim, value):
+        """Bin index of a raw feature value, clipped to the grid."""
+        index = int(round((value - self.lows[dim]) / self.steps[dim]))
+        return min(max(index, 0), self.sizes[dim] - 1)
+
+    def encode(self, values):
+        """
+        Encode raw feature values as an integer state.
+
+        Args:
+            values: dict keyed by PLANNER_FEATURES, or a sequence in that order
+
+        Returns:
+            int: State code
+        """
+        if isinstance(values, dict):
+            values = [values[f] for f in PLANNER_FEATURES]
+        bins = [self.to_bin(d, v) for d, v in enumerate(values)]
+        return bins[0] * self.strides[0] + bins[1] * self.strides[1] + bins[2]
+
+    def encode_patient(self, patient_data):
+        """Encode the first row of an 8-feature patient array."""
+        row = patient_data[0]
+        return self.encode([row[FEATURE_MAP[f]] for f in PLANNER_FEATURES])
+
+    def decode(self, code):
+        """Bin indices (glucose, bmi, bp) of a state code."""
+        g, rest = divmod(code, self.strides[0])
+        b, p = divmod(rest, self.strides[1])
+        return g, b, p
+
+    def values(self, code):
+        """Raw feature values (bin centres) of a state code."""
+        return {f: self.lows[d] + i * self.steps[d]
+                for d, (f, i) in enumerate(zip(PLANNER_FEATURES, self.decode(code)))}
+
+    def is_goal(self, code):
+        g, b, p = self.decode(code)
+        return g <= self.goal_bins[0] and b <= self.goal_bins[1] and p <= self.goal_bins[2]
+
+    def heuristic(self, code):
+        """
+        Admissible and consistent cost-to-go estimate.
+
+        Any plan must remove the remaining bins above the goal on every
+        feature, and no action removes more than its delta per unit cost,
+        so max over features of (remaining bins * cheapest cost per bin)
+        never overestimates.
+        """
+        g, b, p = self.decode(code)
+        goal_g, goal_b, goal_p = self.goal_bins
+        h = 0.0
+        if g > goal_g:
+            h = (g - goal_g) * self.rates[0]
+        if b > goal_b:
+            h = max(h, (b - goal_b) * self.rates[1])
+        if p > goal_p:
+            h = max(h, (p - goal_p) * self.rates[2])
+        return h
+
+    def successors(self, code):
+        """Yield (action name, cost, next state code) for every applicable action."""
+        g, b, p = self.decode(code)
+        max_g, max_b, max_p = self.sizes[0] - 1, self.sizes[1] - 1, self.sizes[2] - 1
+        stride_g, stride_b, _ = self.strides
+
+        for name, cost, (dg, db, dp) in self.actions:
+            ng = min(max(g + dg, 0), max_g)
+            nb = min(max(b + db, 0), max_b)
+            np_ = min(max(p + dp, 0), max_p)
+            next_code = ng * stride_g + nb * stride_b + np_
+            if next_code != code:
+                yield name, cost, next_code
+
+
+def _improves_any(scenario_name):
+    """True if a scenario lowers at least one planner feature."""
+    modifiers = SCENARIOS[scenario_name]["modifiers"]
+    return any(modifiers.get(f, 0) < 0 for f in PLANNER_FEATURES)
+
+
+# ==================== SEARCH ====================
+
+def a_star_plan(space, start_code, max_expansions=None, heuristic=None):
+    """
+    Optimal plan with A* over integer-encoded states.
+
+    Args:
+        space: HealthStateSpace
+        start_code: Encoded start state
+        max_expansions: Optional cap on node expansions
+        heuristic: Optional override of space.heuristic (e.g. lambda c: 0.0)
+
+    Returns:
+        dict: 'plan' (list of scenario names, or None if not found),
+              'cost', 'expanded', 'seconds' and 'final_state'
+    """
+    start_time = time.perf_counter()
+    heuristic = heuristic or space.heuristic
+    successors = space.successors
+    is_goal = space.is_goal
+
+    frontier = [(heuristic(start_code), 0, start_code)]
+    best_g = {start_code: 0}
+    parent = {start_code: (None, None)}
+    explored = set()
+    expanded = 0
+
+    while frontier:
+        _, cost, code = heapq.heappop(frontier)
+        if code in explored:
+            continue
+
+        if is_goal(code):
+            return _search_result(_reconstruct(parent, code), cost, expanded,
+                                  start_time, space, code)
+
+        explored.add(code)
+        expanded += 1
+        if max_expansions is not None and expanded >= max_expansions:
+            break
+
+        for name, action_cost, next_code in successors(code):
+            if next_code in explored:
+                continue
+
+            new_cost = cost + action_cost
+            if new_cost < best_g.get(next_code, math.inf):
+                h = heuristic(next_code)
+                if h == math.inf:
+                    continue
+                best_g[next_code] = new_cost
+                parent[next_code] = (code, name)
+                heapq.heappush(frontier, (new_cost + h, new_cost, next_code))
+
+    return _search_result(None, math.inf, expanded, start_time, space, None)
+
+
+def ida_star_plan(space, start_code, max_expansions=None, table_size=1_000_000):
+    """
+    Optimal plan with IDA* and a bounded transposition table.
+
+    Memory is O(plan length + table_size) regardless of grid size; the table
+    prunes re-visits of a state at equal or higher cost within an iteration.
+
+    Args:
+        space: HealthStateSpace
+        start_code: Encoded start state
+        max_expansions: Optional cap on node expansions
+        table_size: Maximum transposition table entries
+
+    Returns:
+        dict: Same shape as a_star_plan()
+    """
+    start_time = time.perf_counter()
+    heuristic = space.heuristic
+    successors = space.successors
+    is_goal = space.is_goal
+
+    path = []
+    expanded = 0
+    bound = heuristic(start_code)
+
+    def search(code, cost, table):
+        nonlocal expanded
+        f = cost + heuristic(code)
+        if f > bound:
+            return f, None
+        if is_goal(code):
+            return cost, code
+
+        expanded += 1
+        if max_expansions is not None and expanded >= max_expansions:
+            return math.inf, None
+
+        next_bound = math.inf
+        for name, action_cost, next_code in successors(code):
+            new_cost = cost + action_cost
+            seen = table.get(next_code)
+            if seen is not None and seen <= new_cost:
+                continue
+            if seen is not None or len(table) < table_size:
+                table[next_code] = new_cost
+
+            path.append(name)
+            t, goal = search(next_code, new_cost, table)
+            if goal is not None:
+                return t, goal
+            path.pop()
+            next_bound = min(next_bound, t)
+
+        return next_bound, None
+
+    while bound < math.inf:
+        t, goal = search(start_code, 0, {start_code: 0})
+        if goal is not None:
+            return _search_result(list(path), t, expanded, start_time, space, goal)
+        bound = t
+
+    return _search_result(None, math.inf, expanded, start_time, space, None)
+
+
+def plan_lifestyle(patient_data, space=None, algorithm="astar", max_expansions=None):
+    """
+    Plan scenario steps that bring a patient's glucose, BMI and BP to goal.
+
+    Args:
+        patient_data: 1 x 8 patient array
+        space: HealthStateSpace (defaults to DEFAULT_GRID / DEFAULT_GOAL)
+        algorithm: 'astar' or 'idastar'
+        max_expansions: Optional cap on node expansions
+
+    Returns:
+        dict: Same shape as a_star_plan(), plus 'start_state'
+    """
+    space = space or HealthStateSpace()
+    start_code = space.encode_patient(patient_data)
+
+    if algorithm == "astar":
+        result = a_star_plan(space, start_code, max_expansions)
+    elif algorithm == "idastar":
+        result = ida_star_plan(space, start_code, max_expansions)
+    else:
+        raise ValueError(f"Unknown planning algorithm: {algorithm}")
+    result["start_state"] = space.values(start_code)
+    return result
+
+
+def _reconstruct(parent, code):
+    plan = []
+    while True:
+        code, name = parent[code]
+        if name is None:
+            return plan[::-1]
+        plan.append(name)
+
+
+def _search_result(plan, cost, expanded, start_time, space, final_code):
+    return {
+        "plan": plan,
+        "cost": cost,
+        "expanded": expanded,
+        "seconds": time.perf_counter() - start_time,
+        "final_state": space.values(final_code) if final_code is not None else None,
+    }
+
+
+# ==================== RESPONSE ====================
+
+def format_health_plan(result, goal=None):
+    """
+    Chat reply for a plan_lifestyle() result.
+
+    Args:
+        result: Dictionary from plan_lifestyle()
+        goal: Upper bounds used for the search (default: DEFAULT_GOAL)
+
+    Returns:
+        str: Formatted response
+    """
+    goal = {**DEFAULT_GOAL, **(goal or {})}
+    header = ("🗺️ Step-by-step plan (goal: "
+              + ", ".join(f"{f} ≤ {goal[f]:g}" for f in PLANNER_FEATURES) + ")\n\n")
+
+    if result["plan"] is None:
+        return (header + "⚠️ I could not find a combination of lifestyle changes that gets "
+                "there. Please talk to your doctor about a treatment plan.")
+    if not result["plan"]:
+        return header + "✅ Your glucose, BMI and blood pressure are already within the goal."
+
+    lines = [f"  {i}. {SCENARIOS[name]['description']}" + (f" (× {n})" if n > 1 else "")
+             for i, (name, n) in enumerate(((name, len(list(group))) for name, group
+                                            in itertools.groupby(result["plan"])), 1)]
+    changes = ", ".join(f"{f} {result['start_state'][f]:g} → {result['final_state'][f]:g}"
+                        for f in PLANNER_FEATURES)
+    return (header + "\n".join(lines)
+            + f"\n\n📉 Expected: {changes} (effort {result['cost']:g})")
@@ -1,13 +1,42 @@
+GLUCOSE_LEVELS = ("high", "low", "normal")
+
+
 class State:
+    """
+    Immutable-by-convention patient state, interned per (glucose, risk).
+
+    State("high", "medium") always returns the same instance, so states can
+    be compared by identity and used as cheap dictionary keys.
+    """
+
+    __slots__ = ("glucose", "risk")
+
+    _interned = {}
+
+    def __new__(cls, glucose, risk):
+        key = (glucose, risk)
+        state = cls._interned.get(key)
+        if state is None:
+            state = super().__new__(cls)
+            state.glucose = glucose
+            state.risk = risk
+            cls._interned[key] = state
+        return state
+
     def __init__(self, glucose, risk):
-        self.glucose = glucose
-        self.risk = risk
+        # Attributes are set once in __new__
+        pass
 
     def is_goal(self):
         return self.glucose == "normal"
 
     def __eq__(self, other):
+        if self is other:
+            return True
         return self.glucose == other.glucose and self.risk == other.risk
 
     def __hash__(self):
         return hash((self.glucose, self.risk))
+
+    def __repr__(self):
+        return f"State({self.glucose!r}, {self.risk!r})"
@@ -0,0 +1,54 @@
+"""
+Batch Patient Risk Scoring
+==========================
+Scores a CSV roster of patients (same 8 feature columns as
+data/diabetes.csv) and writes each row's diabetes probability and risk
+label, streaming the file in chunks.
+
+Usage:
+    python batch_score.py patients.csv scored.csv [--chunksize 50000]
+"""
+
+import argparse
+
+from models.batch_scoring import DEFAULT_CHUNKSIZE, score_csv
+from models.cache import load_inference_engines
+
+
+# ==================== CONFIGURATION ====================
+
+DIABETES_DATA_PATH = "data/diabetes.csv"
+INTENTS_DATA_PATH = "data/intents.csv"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Score a CSV of patients for diabetes risk.")
+    parser.add_argument("input", help="CSV with the 8 diabetes feature columns")
+    parser.add_argument("output", help="Destination CSV with probability and risk columns")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"Rows per chunk (default: {DEFAULT_CHUNKSIZE})")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    artifacts = load_inference_engines(DIABETES_DATA_PATH, INTENTS_DATA_PATH)
+    stats = score_csv(artifacts["risk_engine"], args.input, args.output, args.chunksize)
+
+    print("\n" + "="*60)
+    print("BATCH RISK SCORING COMPLETE")
+    print("="*60)
+    print(f"   Rows scored:   {stats['rows']:,}")
+    print(f"   Elapsed:       {stats['seconds']:.2f} s")
+    print(f"   Throughput:    {stats['rows_per_sec']:,.0f} rows/sec")
+    for level in ("low", "medium", "high"):
+        print(f"   {level.capitalize():<8} risk:  {stats['risk_counts'][level]:,}")
+    if stats["invalid_rows"]:
+        print(f"   Skipped:       {stats['invalid_rows']:,} rows with missing or invalid features")
+    print(f"   Output:        {args.output}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
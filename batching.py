@@ -0,0 +1,182 @@
+"""
+Dynamic Micro-Batching
+======================
+Collects concurrent inference requests for up to a few milliseconds (or
+until a batch is full), runs one batched forward pass, and resolves each
+caller's future with its own result. Per-call model overhead is then paid
+once per batch instead of once per request.
+
+Batching is adaptive: when the model is idle, pending requests are sent on
+the next event-loop tick, so a lone client never waits out the window.
+While a batch is running, new requests accumulate until it finishes, the
+batch fills, or max_wait_ms elapses.
+
+Batch functions take a list of inputs and return a list of results in the
+same order. Helpers below build them for the NumPy engines and for the
+original Keras models.
+"""
+
+import asyncio
+import time
+
+import numpy as np
+
+from models.attribution import attribute_batch, rank_contributions
+from models.risk import risk_from_probability
+
+
+# ==================== CONFIGURATION ====================
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 2.0
+
+
+# ==================== BATCHER ====================
+
+class MicroBatcher:
+    """
+    Asyncio micro-batching scheduler for one model.
+
+    Usage:
+        batcher = MicroBatcher(intent_batch_fn(engine), executor=pool)
+        intent, confidence = await batcher.submit("What if I walk daily?")
+    """
+
+    def __init__(self, batch_fn, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS, executor=None, name="batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor
+        self.name = name
+
+        self._pending = []
+        self._timer = None
+        self._in_flight = 0
+
+        # Stats
+        self.batches = 0
+        self.items = 0
+        self.max_seen_batch = 0
+        self.batch_size_counts = {}
+        self.busy_seconds = 0.0
+
+    @property
+    def queue_depth(self):
+        """Requests waiting for a batch plus requests in running batches."""
+        return len(self._pending) + self._in_flight
+
+    async def submit(self, item):
+        """Queue one input and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            delay = 0 if self._in_flight == 0 else self.max_wait
+            self._timer = loop.call_later(delay, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            self._in_flight += len(batch)
+            asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch):
+        items = [item for item, _ in batch]
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(self.executor, self.batch_fn, items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._in_flight -= len(batch)
+            self._record(len(batch), time.perf_counter() - start)
+
+            # Model is idle again: send whatever accumulated meanwhile
+            if self._in_flight == 0 and self._pending:
+                self._flush()
+
+    def _record(self, size, seconds):
+        self.batches += 1
+        self.items += size
+        self.max_seen_batch = max(self.max_seen_batch, size)
+        self.batch_size_counts[size] = self.batch_size_counts.get(size, 0) + 1
+        self.busy_seconds += seconds
+
+    def stats(self):
+        """Queue depth and batch-size statistics."""
+        return {
+            "name": self.name,
+            "queue_depth": self.queue_depth,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_seen_batch,
+            "batch_size_counts": dict(sorted(self.batch_size_counts.items())),
+            "busy_seconds": self.busy_seconds,
+        }
+
+
+# ==================== BATCH FUNCTIONS ====================
+
+def intent_batch_fn(intent_engine):
+    """Batch function returning (intent, confidence) per sentence."""
+    def classify(sentences):
+        intents, confidences = intent_engine.predict(sentences)
+        return list(zip(intents, confidences.tolist()))
+    return classify
+
+
+def risk_batch_fn(risk_engine, explain=False):
+    """
+    Batch function returning (risk, probability) per 1 x 8 patient array.
+
+    With explain=True it returns (risk, probability, ranked feature
+    contributions) instead; the whole batch's attribution rows are scored
+    in the same single forward pass (see models/attribution.py).
+    """
+    def score(patients):
+        probs = risk_engine.predict_proba(np.vstack(patients))
+        return [(risk_from_probability(p), float(p)) for p in probs]
+
+    def score_and_explain(patients):
+        probs, contributions, _ = attribute_batch(risk_engine, np.vstack(patients))
+        return [(risk_from_probability(p), float(p), rank_contributions(c))
+                for p, c in zip(probs, contributions)]
+
+    return score_and_explain if explain else score
+
+
+def keras_intent_batch_fn(model, vectorizer, label_encoder):
+    """Like intent_batch_fn() but with one Keras call per batch."""
+    def classify(sentences):
+        probs = np.asarray(model(vectorizer.transform(sentences).toarray(), training=False))
+        indices = probs.argmax(axis=1)
+        intents = label_encoder.inverse_transform(indices)
+        return list(zip(intents.tolist(), probs[np.arange(len(indices)), indices].tolist()))
+    return classify
+
+
+def keras_risk_batch_fn(model, scaler):
+    """Like risk_batch_fn() but with one Keras call per batch."""
+    def score(patients):
+        probs = np.asarray(model(scaler.transform(np.vstack(patients)), training=False))[:, 0]
+        return [(risk_from_probability(p), float(p)) for p in probs]
+    return score
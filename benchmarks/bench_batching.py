@@ -0,0 +1,103 @@
+"""
+Micro-Batching Throughput Benchmark
+===================================
+Simulates 1, 10 and 100 concurrent clients, each sending a stream of
+intent and risk requests, and compares unbatched inference (one executor
+call per request) against MicroBatcher. Runs for both the NumPy engines
+and the original Keras models.
+
+Run from the repository root:
+    python -m benchmarks.bench_batching [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from batching import (MicroBatcher, intent_batch_fn, keras_intent_batch_fn,
+                      keras_risk_batch_fn, risk_batch_fn)
+from models.batch_scoring import FEATURE_COLUMNS
+from models.cache import load_or_train_models
+
+
+DIABETES_DATA_PATH = "data/diabetes.csv"
+INTENTS_DATA_PATH = "data/intents.csv"
+
+CLIENT_COUNTS = (1, 10, 100)
+
+
+async def run_clients(call, inputs, n_clients, total_requests):
+    """Run n_clients loops that together send total_requests; return req/sec."""
+    per_client = max(1, total_requests // n_clients)
+
+    async def client(offset):
+        for i in range(per_client):
+            await call(inputs[(offset + i) % len(inputs)])
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client(c * per_client) for c in range(n_clients)])
+    return per_client * n_clients / (time.perf_counter() - start)
+
+
+async def benchmark_backend(name, batch_fns, inputs, total_requests, executor):
+    print(f"\n⚙️  Backend: {name}")
+    print(f"   {'model':<8}{'clients':>8}{'unbatched req/s':>18}{'batched req/s':>16}"
+          f"{'speedup':>9}{'mean batch':>12}")
+
+    for model_name, batch_fn in batch_fns.items():
+        model_inputs = inputs[model_name]
+
+        for n_clients in CLIENT_COUNTS:
+            loop = asyncio.get_running_loop()
+
+            async def unbatched(item):
+                return (await loop.run_in_executor(executor, batch_fn, [item]))[0]
+
+            batcher = MicroBatcher(batch_fn, max_batch_size=128, max_wait_ms=2.0,
+                                   executor=executor, name=model_name)
+
+            plain_rate = await run_clients(unbatched, model_inputs, n_clients, total_requests)
+            batched_rate = await run_clients(batcher.submit, model_inputs, n_clients, total_requests)
+            stats = batcher.stats()
+
+            print(f"   {model_name:<8}{n_clients:>8}{plain_rate:>18,.0f}{batched_rate:>16,.0f}"
+                  f"{batched_rate / plain_rate:>8.1f}x{stats['mean_batch_size']:>12.1f}")
+
+
+async def run_benchmark(total_requests):
+    artifacts = load_or_train_models(DIABETES_DATA_PATH, INTENTS_DATA_PATH)
+
+    sentences = pd.read_csv(INTENTS_DATA_PATH)["text"].astype(str).tolist()
+    patients = pd.read_csv(DIABETES_DATA_PATH)[FEATURE_COLUMNS].to_numpy(dtype=float)
+    inputs = {"intent": sentences, "risk": [row[None, :] for row in patients]}
+
+    executor = ThreadPoolExecutor(max_workers=4)
+
+    print("\n" + "="*71)
+    print("MICRO-BATCHING THROUGHPUT BENCHMARK")
+    print("="*71)
+
+    await benchmark_backend("numpy", {
+        "intent": intent_batch_fn(artifacts["intent_engine"]),
+        "risk": risk_batch_fn(artifacts["risk_engine"]),
+    }, inputs, total_requests, executor)
+
+    # Keras is ~1000x slower per call; keep its request count small
+    await benchmark_backend("keras", {
+        "intent": keras_intent_batch_fn(artifacts["intent_model"], artifacts["vectorizer"],
+                                        artifacts["label_encoder"]),
+        "risk": keras_risk_batch_fn(artifacts["diabetes_model"], artifacts["scaler"]),
+    }, inputs, max(100, total_requests // 10), executor)
+
+    print("\n" + "="*71)
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-batching throughput benchmark.")
+    parser.add_argument("--requests", type=int, default=2000,
+                        help="Requests per configuration (NumPy backend)")
+    asyncio.run(run_benchmark(parser.parse_args().requests))
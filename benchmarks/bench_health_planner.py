@@ -0,0 +1,84 @@
+"""
+Numeric Health Planner Benchmark
+================================
+Plans for patients from data/diabetes.csv over coarse and fine
+(millions of states) grids and reports node expansions per second for
+A* and IDA*, checking that both find plans of equal (optimal) cost. A stress
+run with every scenario and a distant goal compares uninformed (zero
+heuristic) and informed A* on raw expansion throughput.
+
+Run from the repository root:
+    python -m benchmarks.bench_health_planner
+"""
+
+import pandas as pd
+
+from agent.health_planner import HealthStateSpace, a_star_plan, ida_star_plan
+from models.simulator import SCENARIOS
+
+
+DIABETES_DATA_PATH = "data/diabetes.csv"
+
+GRIDS = {
+    "coarse": None,
+    "fine": {
+        "Glucose": (0.0, 400.0, 1.0),
+        "BMI": (10.0, 80.0, 0.1),
+        "BloodPressure": (0.0, 200.0, 1.0),
+    },
+}
+
+FLOOR_GOAL = {"Glucose": 0.0, "BMI": 0.0, "BloodPressure": 0.0}
+
+
+def run_benchmark(n_patients=50):
+    data = pd.read_csv(DIABETES_DATA_PATH)
+    patients = data[["Glucose", "BMI", "BloodPressure"]].to_dict("records")
+
+    print("\n" + "="*60)
+    print("NUMERIC HEALTH PLANNER BENCHMARK")
+    print("="*60)
+
+    results = {}
+    for grid_name, grid in GRIDS.items():
+        space = HealthStateSpace(grid=grid)
+        starts = [space.encode(p) for p in patients]
+        starts = [code for code in starts if not space.is_goal(code)][:n_patients]
+
+        totals = {}
+        costs = {}
+        for algorithm, planner in (("A*", a_star_plan), ("IDA*", ida_star_plan)):
+            expanded = seconds = 0.0
+            costs[algorithm] = []
+            for code in starts:
+                result = planner(space, code)
+                expanded += result["expanded"]
+                seconds += result["seconds"]
+                costs[algorithm].append(result["cost"])
+            totals[algorithm] = (expanded, seconds)
+
+        assert costs["A*"] == costs["IDA*"], "A* and IDA* disagree on optimal cost"
+
+        # Stress run: all scenarios (including harmful ones), worst-case start
+        # and the grid floor as goal; uninformed vs informed A*
+        stress_space = HealthStateSpace(grid=grid, goal=FLOOR_GOAL, scenario_names=list(SCENARIOS))
+        corner = stress_space.n_states - 1
+        blind = a_star_plan(stress_space, corner, heuristic=lambda code: 0.0)
+        informed = a_star_plan(stress_space, corner)
+        assert blind["cost"] == informed["cost"]
+        totals["A* stress (h=0)"] = (blind["expanded"], blind["seconds"])
+        totals["A* stress"] = (informed["expanded"], informed["seconds"])
+
+        print(f"\n📐 Grid: {grid_name} ({space.n_states:,} states, {len(starts)} patients)")
+        for algorithm, (expanded, seconds) in totals.items():
+            rate = expanded / seconds if seconds > 0 else float("inf")
+            print(f"   {algorithm:<16} expanded {expanded:>10,.0f} nodes in {seconds:7.3f} s "
+                  f"({rate:,.0f} nodes/sec)")
+        results[grid_name] = totals
+
+    print("\n" + "="*60)
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
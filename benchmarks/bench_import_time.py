@@ -0,0 +1,236 @@
+"""
+Startup Import-Time Report
+==========================
+Starts each entry point in a fresh interpreter with `python -X importtime`
+and summarizes the output. For each one it reports:
+- wall time to a first result
+- total import time
+- which heavy libraries got loaded
+- the slowest top-level packages by their own import time
+
+Fast targets (evaluation, scenario listing, cached NumPy inference) have a
+startup budget. As with benchmarks/suite.py, results can be saved as a
+baseline, and a later run fails (exit code 1) when a target regresses or a
+fast target goes over its budget.
+
+Run from the repository root:
+    python -m benchmarks.bench_import_time               # report (+ compare)
+    python -m benchmarks.bench_import_time --save-baseline
+    python -m benchmarks.bench_import_time --only main --top 15
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+
+# ==================== CONFIGURATION ====================
+
+DEFAULT_BASELINE_PATH = os.path.join("benchmarks", "import_baseline.json")
+DEFAULT_THRESHOLD = 0.25  # Fail when wall time is more than 25% slower
+DEFAULT_RUNS = 5
+
+STARTUP_BUDGET_MS = 200
+HEAVY_PACKAGES = ("tensorflow", "keras", "sklearn", "scipy", "pandas", "matplotlib")
+
+_QUIET = "import contextlib, io\nwith contextlib.redirect_stdout(io.StringIO()):\n    "
+
+# name -> (code run with -c, startup budget in ms or None)
+TARGETS = {
+    "interpreter": ("pass", None),
+    "evaluation.run_evaluation": (
+        _QUIET + "import evaluation; evaluation.run_evaluation()", STARTUP_BUDGET_MS),
+    "scenario listing": (
+        "from models.simulator import SCENARIOS; list(SCENARIOS)", STARTUP_BUDGET_MS),
+    "cached inference": (
+        "from models.cache import load_inference_engines\n"
+        "e = load_inference_engines('data/diabetes.csv', 'data/intents.csv')\n"
+        "e['intent_engine'].predict('what if I walk daily?')\n"
+        "e['risk_engine'].risk_level([[6, 148, 72, 35, 0, 33.6, 0.627, 50]])",
+        STARTUP_BUDGET_MS),
+    "import main": ("import main", None),
+    "import server": ("import server", None),
+    "import models.batch_scoring": ("import models.batch_scoring", None),
+}
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+# ==================== MEASUREMENT ====================
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        tuple: (total import µs, {top-level package: self µs})
+    """
+    total, by_package = 0, defaultdict(int)
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        by_package[name.split(".")[0]] += int(self_us)
+        if not indent:
+            total += int(cumulative_us)
+    return total, dict(by_package)
+
+
+def measure_target(code, runs):
+    """
+    Run code in fresh interpreters and summarize startup cost.
+
+    Returns:
+        dict: Median wall/import time in ms, heavy packages loaded and
+              per-package self import time (ms) from the median run
+    """
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                                capture_output=True, text=True)
+        wall = time.perf_counter() - start
+        if result.returncode != 0:
+            raise RuntimeError(f"Target failed:\n{result.stderr[-2000:]}")
+        samples.append((wall, result.stderr))
+
+    samples.sort(key=lambda sample: sample[0])
+    wall, stderr = samples[len(samples) // 2]
+    total_us, by_package = parse_importtime(stderr)
+    return {
+        "wall_ms": wall * 1e3,
+        "wall_ms_min": samples[0][0] * 1e3,
+        "import_ms": total_us / 1e3,
+        "heavy": [name for name in HEAVY_PACKAGES if name in by_package],
+        "packages_ms": {name: us / 1e3 for name, us in
+                        sorted(by_package.items(), key=lambda item: -item[1])},
+    }
+
+
+# ==================== REPORTING ====================
+
+def print_results(results, top):
+    print("\n" + "="*86)
+    print("STARTUP IMPORT TIME (median of fresh interpreters, ms)")
+    print("="*86)
+    print(f"   {'target':<28}{'wall':>9}{'imports':>10}{'budget':>9}   heavy packages loaded")
+    for name, stats in results.items():
+        budget = TARGETS[name][1]
+        budget_text = "" if budget is None else \
+            f"{'✅' if stats['wall_ms'] <= budget else '❌'} {budget}"
+        print(f"   {name:<28}{stats['wall_ms']:>9.0f}{stats['import_ms']:>10.0f}"
+              f"{budget_text:>9}   {', '.join(stats['heavy']) or '-'}")
+
+    print(f"\n   Slowest packages (own import time, top {top}):")
+    for name, stats in results.items():
+        slowest = list(stats["packages_ms"].items())[:top]
+        print(f"   {name:<28}" + ", ".join(f"{pkg} {ms:.0f}" for pkg, ms in slowest))
+    print("="*86)
+
+
+def over_budget(results):
+    return [name for name, stats in results.items()
+            if TARGETS[name][1] is not None and stats["wall_ms"] > TARGETS[name][1]]
+
+
+# ==================== BASELINES ====================
+
+def compare_to_baseline(results, baseline, threshold):
+    """
+    Compare wall times against a baseline.
+
+    Returns:
+        list: (name, baseline ms, current ms, ratio, regressed) tuples
+    """
+    rows = []
+    for name, stats in results.items():
+        if name not in baseline.get("results", {}):
+            continue
+        base_value = baseline["results"][name]["wall_ms"]
+        ratio = stats["wall_ms"] / base_value if base_value > 0 else float("inf")
+        rows.append((name, base_value, stats["wall_ms"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def save_baseline(results, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }, f, indent=2)
+
+
+def print_comparison(rows, threshold):
+    print(f"\n📊 Regression check (wall ms, threshold +{threshold:.0%})")
+    for name, base_value, value, ratio, regressed in rows:
+        status = "❌ REGRESSED" if regressed else "✅"
+        print(f"   {status:<12} {name:<28}{base_value:>8.0f} → {value:>8.0f} ms ({ratio:.2f}x)")
+
+
+# ==================== ENTRY POINT ====================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize startup import time.")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS,
+                        help=f"Fresh interpreters per target (default: {DEFAULT_RUNS})")
+    parser.add_argument("--top", type=int, default=6, help="Packages listed per target")
+    parser.add_argument("--only", nargs="+", metavar="TARGET", help="Run only these targets")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH,
+                        help=f"Baseline JSON path (default: {DEFAULT_BASELINE_PATH})")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Write this run's results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown as a fraction (default: 0.25)")
+    parser.add_argument("--json", dest="json_path", help="Also write results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def run_report(argv=None):
+    args = parse_args(argv)
+
+    targets = TARGETS
+    if args.only:
+        unknown = set(args.only) - set(TARGETS)
+        if unknown:
+            raise ValueError(f"Unknown targets: {', '.join(sorted(unknown))}")
+        targets = {name: TARGETS[name] for name in args.only}
+
+    results = {name: measure_target(code, args.runs) for name, (code, _) in targets.items()}
+    print_results(results, args.top)
+
+    if args.json_path:
+        save_baseline(results, args.json_path)
+
+    failed = over_budget(results)
+    if failed:
+        print(f"\n❌ Over the {STARTUP_BUDGET_MS} ms startup budget: {', '.join(failed)}")
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"\n✅ Baseline saved: {args.baseline}")
+        return 1 if failed else 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\n⚠️  No baseline at {args.baseline}; run with --save-baseline first.")
+        return 1 if failed else 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    rows = compare_to_baseline(results, baseline, args.threshold)
+    print_comparison(rows, args.threshold)
+    return 1 if failed or any(row[4] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_report())
@@ -0,0 +1,78 @@
+"""
+Intent Classification Inference Benchmark
+=========================================
+Compares per-sentence latency of predict_intent() (dense TF-IDF + Keras)
+against the sparse NumPy IntentEngine, for single sentences and for one
+batched call over the whole intents dataset.
+
+Run from the repository root:
+    python -m benchmarks.bench_intent_inference
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from models.cache import load_or_train_models
+from models.intent_nn import predict_intent
+from models.numpy_inference import IntentEngine
+
+
+DIABETES_DATA_PATH = "data/diabetes.csv"
+INTENTS_DATA_PATH = "data/intents.csv"
+
+
+def run_benchmark(n_sentences=100):
+    artifacts = load_or_train_models(DIABETES_DATA_PATH, INTENTS_DATA_PATH)
+    model = artifacts["intent_model"]
+    vectorizer = artifacts["vectorizer"]
+    label_encoder = artifacts["label_encoder"]
+    engine = IntentEngine.from_keras(model, vectorizer, label_encoder)
+
+    sentences = pd.read_csv(INTENTS_DATA_PATH)["text"].astype(str).tolist()
+
+    # Correctness: full dataset through both paths
+    keras_probs = model.predict(vectorizer.transform(sentences).toarray(), verbose=0)
+    numpy_probs = engine.predict_proba(sentences)
+    max_error = float(np.max(np.abs(keras_probs - numpy_probs)))
+    agreement = float(np.mean(keras_probs.argmax(axis=1) == numpy_probs.argmax(axis=1)))
+
+    sample = sentences[:n_sentences]
+
+    start = time.perf_counter()
+    for sentence in sample:
+        predict_intent(model, vectorizer, label_encoder, sentence)
+    keras_latency = (time.perf_counter() - start) / len(sample)
+
+    repeats = 20
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for sentence in sample:
+            engine.predict(sentence)
+    numpy_latency = (time.perf_counter() - start) / (repeats * len(sample))
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        engine.predict(sentences)
+    batch_latency = (time.perf_counter() - start) / (repeats * len(sentences))
+
+    print("\n" + "="*60)
+    print("INTENT INFERENCE BENCHMARK")
+    print("="*60)
+    print(f"   Sentences checked:       {len(sentences)}")
+    print(f"   Max |keras - numpy|:     {max_error:.2e}")
+    print(f"   Label agreement:         {agreement:.2%}")
+    print(f"   predict_intent (Keras):  {keras_latency * 1e6:10.1f} µs/sentence")
+    print(f"   IntentEngine single:     {numpy_latency * 1e6:10.1f} µs/sentence")
+    print(f"   IntentEngine batch:      {batch_latency * 1e6:10.1f} µs/sentence")
+    print(f"   Speedup (single):        {keras_latency / numpy_latency:10.1f}x")
+    print("="*60)
+
+    return {"max_error": max_error, "agreement": agreement,
+            "keras_latency": keras_latency, "numpy_latency": numpy_latency,
+            "batch_latency": batch_latency}
+
+
+if __name__ == "__main__":
+    run_benchmark()
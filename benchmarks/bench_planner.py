@@ -0,0 +1,54 @@
+"""
+Agent Planning Benchmark
+========================
+Compares running agent/search.a_star from scratch on every turn against
+the memoized plan table behind DiabetesAgent.plan() and plan_many().
+
+Run from the repository root:
+    python -m benchmarks.bench_planner
+"""
+
+import random
+import time
+
+from agent.agent import DiabetesAgent, plan_many
+from agent.search import a_star
+from agent.state import GLUCOSE_LEVELS, State
+from models.risk import RISK_LEVELS
+
+
+def run_benchmark(n_turns=100_000, seed=0):
+    rng = random.Random(seed)
+    keys = [(rng.choice(GLUCOSE_LEVELS), rng.choice(RISK_LEVELS)) for _ in range(n_turns)]
+
+    start = time.perf_counter()
+    uncached = [a_star(State(g, r)) for g, r in keys]
+    search_latency = (time.perf_counter() - start) / n_turns
+
+    start = time.perf_counter()
+    cached = [DiabetesAgent(State(g, r)).plan() for g, r in keys]
+    agent_latency = (time.perf_counter() - start) / n_turns
+
+    states = [State(g, r) for g, r in keys]
+    start = time.perf_counter()
+    batched = plan_many(states)
+    batch_latency = (time.perf_counter() - start) / n_turns
+
+    assert uncached == cached == batched
+
+    print("\n" + "="*60)
+    print("AGENT PLANNING BENCHMARK")
+    print("="*60)
+    print(f"   Turns:                   {n_turns:,}")
+    print(f"   a_star from scratch:     {search_latency * 1e6:8.2f} µs/turn")
+    print(f"   DiabetesAgent.plan():    {agent_latency * 1e6:8.2f} µs/turn")
+    print(f"   plan_many():             {batch_latency * 1e6:8.2f} µs/turn")
+    print(f"   Speedup (agent):         {search_latency / agent_latency:8.1f}x")
+    print("="*60)
+
+    return {"search_latency": search_latency, "agent_latency": agent_latency,
+            "batch_latency": batch_latency}
+
+
+if __name__ == "__main__":
+    run_benchmark()
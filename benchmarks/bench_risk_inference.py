@@ -0,0 +1,66 @@
+"""
+Diabetes Risk Inference Benchmark
+=================================
+Compares per-call latency of Keras model.predict() (with scaler.transform)
+against the fused NumPy DiabetesRiskEngine for single-patient rows, and
+checks that both return the same probabilities.
+
+Run from the repository root:
+    python -m benchmarks.bench_risk_inference
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from models.cache import load_or_train_models
+from models.numpy_inference import DiabetesRiskEngine
+
+
+DIABETES_DATA_PATH = "data/diabetes.csv"
+INTENTS_DATA_PATH = "data/intents.csv"
+
+
+def time_per_call(func, rows, repeats=1):
+    """Return mean seconds per call of func(row) over all rows."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for row in rows:
+            func(row)
+    return (time.perf_counter() - start) / (repeats * len(rows))
+
+
+def run_benchmark(n_rows=200):
+    artifacts = load_or_train_models(DIABETES_DATA_PATH, INTENTS_DATA_PATH)
+    model, scaler = artifacts["diabetes_model"], artifacts["scaler"]
+    engine = DiabetesRiskEngine.from_keras(model, scaler)
+
+    X = pd.read_csv(DIABETES_DATA_PATH).drop(columns=["Outcome"]).values.astype(float)
+    rows = [X[i:i + 1] for i in range(min(n_rows, len(X)))]
+
+    # Correctness: full dataset in one batch
+    keras_probs = model.predict(scaler.transform(X), verbose=0)[:, 0]
+    numpy_probs = engine.predict_proba(X)
+    max_error = float(np.max(np.abs(keras_probs - numpy_probs)))
+
+    keras_latency = time_per_call(
+        lambda row: model.predict(scaler.transform(row), verbose=0), rows)
+    numpy_latency = time_per_call(engine.predict_proba, rows, repeats=50)
+
+    print("\n" + "="*60)
+    print("DIABETES RISK INFERENCE BENCHMARK (single-row calls)")
+    print("="*60)
+    print(f"   Rows checked:            {len(X)}")
+    print(f"   Max |keras - numpy|:     {max_error:.2e}")
+    print(f"   Keras model.predict:     {keras_latency * 1e6:10.1f} µs/call")
+    print(f"   NumPy engine:            {numpy_latency * 1e6:10.1f} µs/call")
+    print(f"   Speedup:                 {keras_latency / numpy_latency:10.1f}x")
+    print("="*60)
+
+    return {"max_error": max_error, "keras_latency": keras_latency,
+            "numpy_latency": numpy_latency}
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,246 @@
+"""
+Chat Hot-Path Benchmark Suite
+=============================
+Micro-benchmarks for every stage of a chat turn, run offline against the
+bundled CSVs. Each case reports latency percentiles and throughput;
+results can be saved as a baseline and later runs fail (exit code 1) when
+a tracked metric regresses beyond a configurable threshold.
+
+Run from the repository root:
+    python -m benchmarks.suite --save-baseline      # record a baseline
+    python -m benchmarks.suite                      # compare against it
+    python -m benchmarks.suite --threshold 0.5 --metric p90 --only a_star
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+from agent.agent import DiabetesAgent
+from agent.search import a_star
+from agent.state import State
+from chatbot import generate_response
+from main import DIABETES_DATA_PATH, INTENTS_DATA_PATH, handle_turn, run_simulation
+from models.cache import load_or_train_models
+from models.diabetes_nn import get_risk_level
+from models.intent_nn import predict_intent
+from models.simulator import apply_scenario
+
+
+# ==================== CONFIGURATION ====================
+
+DEFAULT_BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+DEFAULT_THRESHOLD = 0.25  # Fail when a metric is more than 25% slower
+DEFAULT_METRIC = "p50"
+
+PATIENT = np.array([[6, 148, 72, 35, 0, 33.6, 0.627, 50]], dtype=float)
+
+TURN_UTTERANCES = [
+    "Give me diet advice",
+    "What if I walk daily?",
+    "Help me plan my day",
+    "My sugar is high",
+    "What if I eat junk food?",
+    "Tell me about diabetes",
+    "Compare all scenarios",
+    "thanks",
+]
+
+
+# ==================== MEASUREMENT ====================
+
+def measure(func, iterations, warmup):
+    """
+    Time individual calls of func().
+
+    Args:
+        func: Zero-argument callable
+        iterations: Timed calls
+        warmup: Untimed calls made first
+
+    Returns:
+        dict: Latency percentiles and mean in microseconds, plus throughput
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = np.empty(iterations)
+    clock = time.perf_counter_ns
+    for i in range(iterations):
+        start = clock()
+        func()
+        timings[i] = clock() - start
+
+    timings /= 1e3  # ns -> µs
+    mean = float(timings.mean())
+    return {
+        "iterations": iterations,
+        "mean_us": mean,
+        "p50": float(np.percentile(timings, 50)),
+        "p90": float(np.percentile(timings, 90)),
+        "p99": float(np.percentile(timings, 99)),
+        "max_us": float(timings.max()),
+        "throughput_per_sec": 1e6 / mean if mean > 0 else float("inf"),
+    }
+
+
+def build_cases(artifacts):
+    """
+    Build the benchmark cases.
+
+    Returns:
+        dict: name -> (callable, iterations, warmup)
+    """
+    risk_engine = artifacts["risk_engine"]
+    intent_engine = artifacts["intent_engine"]
+    diabetes_model, scaler = artifacts["diabetes_model"], artifacts["scaler"]
+    intent_model = artifacts["intent_model"]
+    vectorizer, label_encoder = artifacts["vectorizer"], artifacts["label_encoder"]
+
+    risk = risk_engine.risk_level(PATIENT)
+    plan = DiabetesAgent(State("high", risk)).plan()
+    utterances = _cycle(TURN_UTTERANCES)
+    intents = _cycle(["diet_advice", "exercise_advice", "daily_plan", "reduce_glucose",
+                      "general_info", "simulate", "fallback", "acknowledgment"])
+    scenarios = _cycle(["walk_daily", "no_exercise", "healthy_diet", "poor_diet", "reduce_stress"])
+    states = _cycle([State(g, r) for g in ("high", "low", "normal")
+                     for r in ("low", "medium", "high")])
+
+    return {
+        # Keras paths (kept to track the original API)
+        "predict_intent": (
+            lambda: predict_intent(intent_model, vectorizer, label_encoder, next(utterances)), 30, 3),
+        "get_risk_level": (
+            lambda: get_risk_level(diabetes_model, scaler, PATIENT), 30, 3),
+        # NumPy engines used by the chat loop
+        "intent_engine.predict": (lambda: intent_engine.predict(next(utterances)), 5000, 100),
+        "risk_engine.risk_level": (lambda: risk_engine.risk_level(PATIENT), 5000, 100),
+        "run_simulation": (
+            lambda: run_simulation(PATIENT, risk, next(scenarios), risk_engine), 5000, 100),
+        "a_star": (lambda: a_star(next(states)), 20000, 100),
+        "generate_response": (lambda: generate_response(next(intents), plan, risk), 20000, 100),
+        "apply_scenario": (lambda: apply_scenario(PATIENT, next(scenarios)), 20000, 100),
+        "chat_turn": (
+            lambda: handle_turn(next(utterances), PATIENT, risk, risk_engine, intent_engine),
+            3000, 100),
+    }
+
+
+def _cycle(items):
+    """Endless iterator over items."""
+    while True:
+        yield from items
+
+
+# ==================== BASELINES ====================
+
+def compare_to_baseline(results, baseline, metric, threshold):
+    """
+    Compare results against a baseline.
+
+    Returns:
+        list: (name, baseline value, current value, ratio, regressed) tuples
+    """
+    rows = []
+    for name, stats in results.items():
+        if name not in baseline.get("results", {}):
+            continue
+        base_value = baseline["results"][name][metric]
+        value = stats[metric]
+        ratio = value / base_value if base_value > 0 else float("inf")
+        rows.append((name, base_value, value, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def save_baseline(results, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }, f, indent=2)
+
+
+# ==================== REPORTING ====================
+
+def print_results(results):
+    print("\n" + "="*86)
+    print("CHAT HOT-PATH BENCHMARKS (latency in µs)")
+    print("="*86)
+    print(f"   {'case':<26}{'p50':>10}{'p90':>10}{'p99':>10}{'mean':>10}{'calls/sec':>14}")
+    for name, stats in results.items():
+        print(f"   {name:<26}{stats['p50']:>10.1f}{stats['p90']:>10.1f}{stats['p99']:>10.1f}"
+              f"{stats['mean_us']:>10.1f}{stats['throughput_per_sec']:>14,.0f}")
+    print("="*86)
+
+
+def print_comparison(rows, metric, threshold):
+    print(f"\n📊 Regression check ({metric}, threshold +{threshold:.0%})")
+    for name, base_value, value, ratio, regressed in rows:
+        status = "❌ REGRESSED" if regressed else "✅"
+        print(f"   {status:<12} {name:<26}{base_value:>10.1f} → {value:>10.1f} µs ({ratio:.2f}x)")
+
+
+# ==================== ENTRY POINT ====================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the chat hot path.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH,
+                        help=f"Baseline JSON path (default: {DEFAULT_BASELINE_PATH})")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Write this run's results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown as a fraction (default: 0.25)")
+    parser.add_argument("--metric", default=DEFAULT_METRIC, choices=["p50", "p90", "p99", "mean_us"],
+                        help=f"Tracked metric (default: {DEFAULT_METRIC})")
+    parser.add_argument("--only", nargs="+", metavar="CASE", help="Run only these cases")
+    parser.add_argument("--json", dest="json_path", help="Also write results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def run_suite(argv=None):
+    args = parse_args(argv)
+    random.seed(0)
+
+    artifacts = load_or_train_models(DIABETES_DATA_PATH, INTENTS_DATA_PATH)
+    cases = build_cases(artifacts)
+    if args.only:
+        unknown = set(args.only) - set(cases)
+        if unknown:
+            raise ValueError(f"Unknown benchmark cases: {', '.join(sorted(unknown))}")
+        cases = {name: cases[name] for name in args.only}
+
+    results = {name: measure(func, iterations, warmup)
+               for name, (func, iterations, warmup) in cases.items()}
+    print_results(results)
+
+    if args.json_path:
+        save_baseline(results, args.json_path)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"\n✅ Baseline saved: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\n⚠️  No baseline at {args.baseline}; run with --save-baseline first.")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    rows = compare_to_baseline(results, baseline, args.metric, args.threshold)
+    print_comparison(rows, args.metric, args.threshold)
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_suite())
@@ -175,7 +175,9 @@ def _handle_simulation_prompt():
         "  • 'What if I don't exercise?'\n"
         "  • 'What if I eat healthy?'\n"
         "  • 'What if I eat junk food?'\n"
-        "  • 'What if I reduce stress?'\n\n"
+        "  • 'What if I reduce stress?'\n"
+        "  • 'Compare all scenarios'\n"
+        "  • 'What would it take to get to low risk?'\n\n"
         "Type your scenario question to see predicted outcomes!"
     )
 
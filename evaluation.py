@@ -13,7 +13,6 @@ PEAS Framework Definition:
 - S (Sensors): User text input and patient health attributes (numerical data)
 """
 
-from sklearn.metrics import accuracy_score, f1_score, classification_report, confusion_matrix
 from agent.state import State
 from agent.agent import DiabetesAgent
 import numpy as np
@@ -34,6 +33,77 @@ GROUND_TRUTH = {
 }
 
 
+# The metrics below are small NumPy equivalents of the sklearn.metrics
+# functions (same definitions, zero_division=0). Importing scikit-learn
+# alone takes ~1.7s, far longer than the whole evaluation.
+
+def confusion_matrix(y_true, y_pred, labels):
+    """Counts with true labels as rows and predicted labels as columns."""
+    index = {label: i for i, label in enumerate(labels)}
+    matrix = np.zeros((len(labels), len(labels)), dtype=np.int64)
+    for true, pred in zip(y_true, y_pred):
+        if true in index and pred in index:
+            matrix[index[true], index[pred]] += 1
+    return matrix
+
+
+def precision_recall_f1(y_true, y_pred, labels):
+    """
+    Per-label precision, recall, F1 and support.
+
+    Returns:
+        tuple: Four arrays aligned with labels
+    """
+    matrix = confusion_matrix(y_true, y_pred, labels)
+    true_positive = np.diag(matrix).astype(float)
+    predicted = matrix.sum(axis=0)
+    support = matrix.sum(axis=1)
+
+    precision = np.divide(true_positive, predicted, out=np.zeros(len(labels)),
+                          where=predicted > 0)
+    recall = np.divide(true_positive, support, out=np.zeros(len(labels)),
+                       where=support > 0)
+    total = predicted + support
+    f1 = np.divide(2 * true_positive, total, out=np.zeros(len(labels)), where=total > 0)
+    return precision, recall, f1, support
+
+
+def accuracy_score(y_true, y_pred):
+    return float(np.mean(np.asarray(y_true) == np.asarray(y_pred)))
+
+
+def weighted_f1_score(y_true, y_pred, labels):
+    """F1 averaged over labels, weighted by each label's support."""
+    _, _, f1, support = precision_recall_f1(y_true, y_pred, labels)
+    return float(np.average(f1, weights=support)) if support.sum() > 0 else 0.0
+
+
+def classification_report(y_true, y_pred, digits=2):
+    """Text report in the layout of sklearn.metrics.classification_report."""
+    labels = sorted(set(y_true) | set(y_pred))
+    precision, recall, f1, support = precision_recall_f1(y_true, y_pred, labels)
+
+    width = max(max(len(label) for label in labels), len("weighted avg"))
+    headers = ["precision", "recall", "f1-score", "support"]
+    report = ("{:>{width}s} " + " {:>9}" * len(headers)).format("", *headers, width=width)
+    report += "\n\n"
+
+    row_fmt = "{:>{width}s} " + " {:>9.{digits}f}" * 3 + " {:>9}\n"
+    for row in zip(labels, precision, recall, f1, support):
+        report += row_fmt.format(*row, width=width, digits=digits)
+    report += "\n"
+
+    total = int(support.sum())
+    report += ("{:>{width}s} " + " {:>9.{digits}}" * 2 + " {:>9.{digits}f} {:>9}\n").format(
+        "accuracy", "", "", accuracy_score(y_true, y_pred), total, width=width, digits=digits)
+    report += row_fmt.format("macro avg", precision.mean(), recall.mean(), f1.mean(), total,
+                             width=width, digits=digits)
+    weights = support / total if total else np.zeros(len(labels))
+    report += row_fmt.format("weighted avg", precision @ weights, recall @ weights,
+                             f1 @ weights, total, width=width, digits=digits)
+    return report
+
+
 def create_test_cases():
     """
     Create test cases covering all possible state combinations.
@@ -92,10 +162,10 @@ def evaluate_agent(test_cases, agent_class):
     
     # Get unique labels for F1 calculation
     labels = list(set(y_true + y_pred))
-    f1 = f1_score(y_true, y_pred, average="weighted", labels=labels, zero_division=0)
+    f1 = weighted_f1_score(y_true, y_pred, labels)
     
     # Generate classification report
-    report = classification_report(y_true, y_pred, zero_division=0)
+    report = classification_report(y_true, y_pred)
     
     # Generate confusion matrix
     conf_matrix = confusion_matrix(y_true, y_pred, labels=labels)
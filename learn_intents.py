@@ -0,0 +1,94 @@
+"""
+Incremental Intent Learning
+===========================
+Teaches the online intent model new labeled utterances without a full
+retrain (see models/online_intent.py).
+
+The input CSV needs 'text' and 'intent' columns: either intents.csv-style
+rows or a low-confidence log (main.LOW_CONFIDENCE_LOG_PATH / server.py
+--log-low-confidence) whose 'intent' column has been filled in. Unlabeled
+rows are skipped.
+
+By default the saved online model in the artifact cache is updated. With
+--server the examples (and --epochs/--replay-ratio) are sent to a running
+`server.py --online-learning`, which fine-tunes and hot-swaps its intent
+model without restarting.
+
+Usage:
+    python learn_intents.py labeled.csv [--epochs 5] [--replay-ratio 4]
+    python learn_intents.py labeled.csv --server http://127.0.0.1:8000 [--epochs 5]
+"""
+
+import argparse
+import json
+import urllib.request
+
+from models.online_intent import (DEFAULT_REPLAY_RATIO, DEFAULT_UPDATE_EPOCHS,
+                                  read_labeled_examples)
+
+
+# ==================== CONFIGURATION ====================
+
+DIABETES_DATA_PATH = "data/diabetes.csv"
+INTENTS_DATA_PATH = "data/intents.csv"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Incrementally teach the intent model.")
+    parser.add_argument("input", help="CSV with 'text' and 'intent' columns")
+    parser.add_argument("--epochs", type=int, default=DEFAULT_UPDATE_EPOCHS)
+    parser.add_argument("--replay-ratio", type=int, default=DEFAULT_REPLAY_RATIO,
+                        help="Earlier examples replayed per new example")
+    parser.add_argument("--server", help="Send the examples to a running server instead")
+    return parser.parse_args()
+
+
+def send_to_server(url, texts, labels, epochs=DEFAULT_UPDATE_EPOCHS,
+                   replay_ratio=DEFAULT_REPLAY_RATIO):
+    """POST the examples (and update settings) to a running server's /intents/learn."""
+    body = json.dumps({"examples": [{"text": t, "intent": i} for t, i in zip(texts, labels)],
+                       "epochs": epochs, "replay_ratio": replay_ratio})
+    request = urllib.request.Request(f"{url.rstrip('/')}/intents/learn", data=body.encode(),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+
+def print_stats(stats):
+    print("\n" + "="*60)
+    print("INTENT MODEL UPDATE")
+    print("="*60)
+    print(f"   New examples:      {stats['examples']} (+{stats['replayed']} replayed, "
+          f"{stats['epochs']} epochs, {stats['seconds']:.1f}s)")
+    print(f"   New examples acc:  {stats['new_accuracy_before']:.3f} → "
+          f"{stats['new_accuracy_after']:.3f}")
+    print(f"   Earlier data acc:  {stats['replay_accuracy_before']:.3f} → "
+          f"{stats['replay_accuracy_after']:.3f}")
+    print("="*60)
+
+
+def main():
+    args = parse_args()
+
+    texts, labels = read_labeled_examples(args.input)
+    if not texts:
+        print(f"⚠️  No labeled rows in {args.input}")
+        return
+
+    if args.server:
+        stats = send_to_server(args.server, texts, labels, args.epochs, args.replay_ratio)
+    else:
+        from models.online_intent import OnlineIntentLearner
+
+        learner, directory = OnlineIntentLearner.load_or_train(DIABETES_DATA_PATH,
+                                                               INTENTS_DATA_PATH)
+        stats = learner.update(texts, labels, epochs=args.epochs,
+                               replay_ratio=args.replay_ratio)
+        learner.save(directory)
+        print(f"✅ Online model saved: {directory}")
+
+    print_stats(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
+import importlib.util
+import weakref
 
 import numpy as np
-from models.diabetes_nn import train_diabetes_model, get_risk_level
-from models.intent_nn import train_intent_model, predict_intent
-from models.simulator import apply_scenario
+from models.attribution import explain_risk, format_attributions
+from models.goal_seek import GoalSeeker, format_goal_seek
+from models.risk import risk_from_probability
+from models.online_intent import log_low_confidence
+from models.simulator import SCENARIOS, apply_scenario, build_scenario_matrix
 from agent.state import State
 from agent.agent import DiabetesAgent
+from agent.health_planner import format_health_plan
 from chatbot import generate_response
+from telemetry import METRICS
+from utterance import parse_utterance
 
 
 # ==================== CONFIGURATION ====================
@@ -13,7 +20,20 @@ from chatbot import generate_response
 CONFIDENCE_THRESHOLD = 0.20
 DIABETES_DATA_PATH = "data/diabetes.csv"
 INTENTS_DATA_PATH = "data/intents.csv"
-DEBUG_MODE = False  # Set to True to see intent predictions
+METRICS_ENABLED = False  # Set to True to record per-stage turn latency
+METRICS_PATH = "metrics/chat_metrics.prom"  # Dumped on exit and on SIGUSR1
+FORCE_RETRAIN = False  # Set to True to ignore cached models and retrain
+PARALLEL_TRAINING = True  # Train both models at once in worker processes on a cache miss
+STREAMING_TRAINING = False  # Stream the diabetes CSV in chunks when training (very large files)
+SPARSE_INTENT_TRAINING = False  # Train the intent model on sparse TF-IDF (large vocabularies)
+LOW_CONFIDENCE_LOG_PATH = None  # e.g. "logs/low_confidence_turns.csv" to collect turns to label
+PLOT_FORMAT = "png"  # Training plots after a retrain: "png" or "svg"
+PLOT_PREVIEW = False  # Set to True for quick 72-dpi plots instead of 300 dpi
+
+# One GoalSeeker (and its per-patient result cache) per risk engine. The
+# seeker only holds a weak proxy to its engine, so an entry disappears when
+# the engine is dropped (e.g. after a reload or hot swap)
+_GOAL_SEEKERS = weakref.WeakKeyDictionary()
 
 
 # ==================== HELPER FUNCTIONS ====================
@@ -28,13 +48,7 @@ def extract_glucose_state(text):
     Returns:
         str: 'high', 'low', or 'normal'
     """
-    text = text.lower()
-    if "low" in text:
-        return "low"
-    elif "high" in text or "reduce" in text:
-        return "high"
-    else:
-        return "normal"
+    return parse_utterance(text).glucose
 
 
 def get_user_input():
@@ -75,36 +89,10 @@ def detect_simulation_scenario(user_input):
     Returns:
         str or None: Scenario name or None if not detected
     """
-    user_lower = user_input.lower()
-    
-    # Check for negative keywords
-    has_negative = any(word in user_lower for word in 
-                      ["don't", "dont", "no", "stop", "not", "avoid", "bad", "poor", "junk"])
-    
-    # Exercise scenarios
-    if "walk" in user_lower or "exercise" in user_lower:
-        return "no_exercise" if has_negative else "walk_daily"
-    
-    # Diet scenarios - check negative first
-    elif "diet" in user_lower or "eat" in user_lower or "food" in user_lower:
-        # Negative diet keywords
-        if has_negative or "junk" in user_lower or "unhealthy" in user_lower:
-            return "poor_diet"
-        # Positive diet keywords
-        elif "healthy" in user_lower or "good" in user_lower or "strict" in user_lower or "better" in user_lower:
-            return "healthy_diet"
-        # Default to poor diet if just "eat" with negative context
-        elif has_negative:
-            return "poor_diet"
-    
-    # Stress scenario
-    elif "stress" in user_lower:
-        return "reduce_stress"
-    
-    return None
+    return parse_utterance(user_input).scenario
 
 
-def run_simulation(patient, risk, scenario_name, diabetes_model, scaler):
+def run_simulation(patient, risk, scenario_name, risk_engine):
     """
     Run a what-if simulation and generate response.
     
@@ -112,18 +100,16 @@ def run_simulation(patient, risk, scenario_name, diabetes_model, scaler):
         patient: Patient data array
         risk: Current risk level
         scenario_name: Name of scenario to simulate
-        diabetes_model: Trained diabetes prediction model
-        scaler: Data scaler for normalization
+        risk_engine: DiabetesRiskEngine (scaler fused in)
         
     Returns:
         str: Formatted simulation response
     """
     modified_patient, description = apply_scenario(patient, scenario_name)
-    new_risk = get_risk_level(diabetes_model, scaler, modified_patient)
     
-    # Get probabilities
-    current_prob = diabetes_model.predict(scaler.transform(patient))[0][0]
-    new_prob = diabetes_model.predict(scaler.transform(modified_patient))[0][0]
+    # Score current and modified patient together
+    current_prob, new_prob = risk_engine.predict_proba(np.vstack([patient, modified_patient]))
+    new_risk = risk_from_probability(new_prob)
     
     # Build response
     response = (f"🔮 Simulating: {description}\n\n"
@@ -152,6 +138,116 @@ def run_simulation(patient, risk, scenario_name, diabetes_model, scaler):
     return response
 
 
+def compare_all_scenarios(patient, risk, risk_engine):
+    """
+    Score every simulation scenario in one batch and rank the outcomes.
+    
+    Args:
+        patient: Patient data array
+        risk: Current risk level
+        risk_engine: DiabetesRiskEngine (scaler fused in)
+        
+    Returns:
+        str: Formatted comparison table, best scenario first
+    """
+    names, matrix = build_scenario_matrix(patient)
+    
+    # Single forward pass: row 0 is the current patient
+    probs = risk_engine.predict_proba(matrix)
+    current_prob, scenario_probs = probs[0], probs[1:]
+    
+    response = (f"🔮 Comparing all lifestyle scenarios\n\n"
+               f"📊 Current Risk: {risk.upper()} (probability: {current_prob:.2f})\n\n"
+               f"  {'#':<3}{'Scenario':<42}{'Prob':>6}{'Change':>9}  Risk\n")
+    
+    for rank, i in enumerate(np.argsort(scenario_probs), 1):
+        prob = scenario_probs[i]
+        response += (f"  {rank:<3}{SCENARIOS[names[i]]['description']:<42}"
+                    f"{prob:>6.2f}{prob - current_prob:>+9.2f}  "
+                    f"{risk_from_probability(prob).upper()}\n")
+    
+    return response.rstrip("\n")
+
+
+def seek_low_risk(patient, risk_engine):
+    """
+    Find the smallest scaled scenario combination that reaches low risk.
+    
+    Args:
+        patient: Patient data array
+        risk_engine: DiabetesRiskEngine (scaler fused in)
+        
+    Returns:
+        str: Formatted goal-seek response
+    """
+    seeker = _GOAL_SEEKERS.get(risk_engine)
+    if seeker is None:
+        seeker = _GOAL_SEEKERS.setdefault(risk_engine, GoalSeeker(weakref.proxy(risk_engine)))
+    return format_goal_seek(seeker.seek(patient))
+
+
+def handle_turn(user_input, patient, risk, risk_engine, intent_engine, prediction=None):
+    """
+    Process one chat message and build the bot's reply.
+    
+    Args:
+        user_input: User's message (non-empty, not 'exit')
+        patient: Patient data array
+        risk: Current risk level
+        risk_engine: DiabetesRiskEngine (scaler fused in)
+        intent_engine: IntentEngine for intent classification
+        prediction: Optional precomputed (intent, confidence), e.g. from a
+                    micro-batched classifier; skips intent_engine when given
+        
+    Returns:
+        str: Bot response
+    """
+    # Predict intent
+    if prediction is None:
+        with METRICS.stage("intent"):
+            prediction = intent_engine.predict(user_input)
+    intent, confidence = prediction
+    
+    # Parse glucose/scenario/simulation cues in one pass
+    with METRICS.stage("parse"):
+        parsed = parse_utterance(user_input)
+    
+    # Handle "what if" questions and simulation keywords - bypass confidence check
+    if parsed.simulate or parsed.goal_seek or parsed.health_plan:
+        intent = "simulate"
+    elif confidence < CONFIDENCE_THRESHOLD:
+        METRICS.count("intent.low_confidence")
+        if LOW_CONFIDENCE_LOG_PATH:
+            log_low_confidence(LOW_CONFIDENCE_LOG_PATH, user_input, intent, confidence)
+        intent = "fallback"
+    METRICS.count(f"intent.{intent}")
+    
+    # Plan actions using agent
+    with METRICS.stage("plan"):
+        state = State(parsed.glucose, risk)
+        agent = DiabetesAgent(state)
+        plan = agent.plan()
+    
+    # Handle simulation requests
+    if (intent == "simulate" or parsed.what_if) and (parsed.scenario or parsed.compare):
+        with METRICS.stage("simulation"):
+            if parsed.scenario:
+                response = run_simulation(patient, risk, parsed.scenario, risk_engine)
+            else:
+                response = compare_all_scenarios(patient, risk, risk_engine)
+    elif parsed.goal_seek:
+        with METRICS.stage("simulation"):
+            response = seek_low_risk(patient, risk_engine)
+    elif parsed.health_plan:
+        with METRICS.stage("health_plan"):
+            response = format_health_plan(agent.lifestyle_plan(patient))
+    else:
+        with METRICS.stage("response"):
+            response = generate_response(intent, plan, risk)
+    
+    return response
+
+
 # ==================== MAIN APPLICATION ====================
 
 def main():
@@ -161,33 +257,45 @@ def main():
     print("DIABETES CHATBOT - Intelligent Health Management System")
     print("="*60)
     
-    # Train models
-    print("\n[1/2] Training diabetes risk prediction model...")
-    diabetes_model, scaler, diabetes_history = train_diabetes_model(DIABETES_DATA_PATH)
+    if METRICS_ENABLED:
+        METRICS.enabled = True
+        METRICS.install_dump_handlers(METRICS_PATH)
     
-    print("\n[2/2] Training intent classification model...")
-    intent_model, vectorizer, label_encoder, intent_history = train_intent_model(INTENTS_DATA_PATH)
+    # Load cached engines or train the models if the data/hyperparameters
+    # changed (a cache hit needs NumPy only, not TensorFlow)
+    from models.cache import load_inference_engines
+    artifacts = load_inference_engines(DIABETES_DATA_PATH, INTENTS_DATA_PATH,
+                                       retrain=FORCE_RETRAIN, parallel=PARALLEL_TRAINING,
+                                       streaming=STREAMING_TRAINING,
+                                       sparse_intent=SPARSE_INTENT_TRAINING)
+    risk_engine = artifacts["risk_engine"]
+    intent_engine = artifacts["intent_engine"]
     
-    print("\n✅ Models trained successfully!")
-    
-    # Generate training visualization plots (optional)
-    try:
-        from models.visualize import plot_both_models
-        plot_both_models(intent_history, diabetes_history)
-    except ImportError:
-        print("\n⚠️  Matplotlib not installed. Skipping visualization plots.")
-        print("   To generate plots, install matplotlib: pip install matplotlib")
+    if artifacts["from_cache"]:
+        print(f"\n✅ Models loaded from cache ({artifacts['cache_key']})")
+    else:
+        print("\n✅ Models trained successfully!")
+        
+        # Generate training visualization plots (optional) in a background
+        # process, so the chat can start right away
+        if importlib.util.find_spec("matplotlib") is None:
+            print("\n⚠️  Matplotlib not installed. Skipping visualization plots.")
+            print("   To generate plots, install matplotlib: pip install matplotlib")
+        else:
+            from models.visualize import start_background_plots
+            if start_background_plots(artifacts["intent_history"], artifacts["diabetes_history"],
+                                      fmt=PLOT_FORMAT, preview=PLOT_PREVIEW):
+                print("\n📊 Rendering training plots in the background (plots/, log: plots/plots.log)")
     
     # Get patient data
     patient = get_user_input()
-    risk = get_risk_level(diabetes_model, scaler, patient)
-    
-    # Get actual probability for debugging
-    prob = diabetes_model.predict(scaler.transform(patient))[0][0]
+    prob = risk_engine.predict_proba(patient)[0]
+    risk = risk_from_probability(prob)
     
     print(f"\n{'='*60}")
     print(f"RISK ASSESSMENT RESULT: {risk.upper()}")
     print(f"Diabetes Probability: {prob:.4f}")
+    print(format_attributions(explain_risk(risk_engine, patient)["contributions"]))
     print(f"{'='*60}")
     
     # Chat loop
@@ -195,6 +303,7 @@ def main():
     print("Examples:")
     print("  • 'Give me diet advice'")
     print("  • 'What if I walk daily?'")
+    print("  • 'What would it take to get to low risk?'")
     print("  • 'Help me plan my day'")
     
     while True:
@@ -207,39 +316,8 @@ def main():
             print("\n👋 Bot: Goodbye! Stay healthy!")
             break
         
-        # Predict intent
-        intent, confidence = predict_intent(intent_model, vectorizer, label_encoder, user_input)
-        
-        # Debug output (optional)
-        if DEBUG_MODE:
-            print(f"[DEBUG] Predicted: {intent} (confidence: {confidence:.3f})")
-        
-        # Handle "what if" questions and simulation keywords - bypass confidence check
-        simulation_keywords = ["what if", "simulate", "show me", "predict", "compare"]
-        if any(keyword in user_input.lower() for keyword in simulation_keywords):
-            intent = "simulate"
-        elif confidence < CONFIDENCE_THRESHOLD:
-            if DEBUG_MODE:
-                print(f"[DEBUG] Confidence {confidence:.3f} < {CONFIDENCE_THRESHOLD}, using fallback")
-            intent = "fallback"
-        
-        # Extract glucose state for agent
-        glucose_state = extract_glucose_state(user_input)
-        state = State(glucose_state, risk)
-        
-        # Plan actions using agent
-        agent = DiabetesAgent(state)
-        plan = agent.plan()
-        
-        # Handle simulation requests
-        if intent == "simulate" or "what if" in user_input.lower():
-            scenario = detect_simulation_scenario(user_input)
-            if scenario:
-                response = run_simulation(patient, risk, scenario, diabetes_model, scaler)
-            else:
-                response = generate_response(intent, plan, risk)
-        else:
-            response = generate_response(intent, plan, risk)
+        with METRICS.stage("turn"):
+            response = handle_turn(user_input, patient, risk, risk_engine, intent_engine)
         
         print(f"\nBot: {response}")
 
@@ -0,0 +1,171 @@
+"""
+Batch Risk Scoring
+==================
+Streams patient rosters from CSV in fixed-size chunks and scores each chunk
+with a single vectorized forward pass, so memory stays bounded by the chunk
+size rather than the file size.
+
+Rows with a missing or non-finite feature are not scored: they get an
+empty probability and the risk label INVALID_RISK, and are counted
+separately so they never inflate the low-risk totals.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from models.risk import RISK_LEVELS, risk_codes, risk_labels
+from models.simulator import FEATURE_COLUMNS, SCENARIOS, apply_scenario_batch
+
+
+# ==================== CONSTANTS ====================
+
+DEFAULT_CHUNKSIZE = 50_000
+INVALID_RISK = "invalid"  # Risk label for rows with missing or non-finite features
+
+
+# ==================== STREAMING ====================
+
+def iter_patient_chunks(csv_path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Yield DataFrame chunks of a patient CSV, validating the feature columns.
+
+    Args:
+        csv_path: Path to a CSV with the 8 diabetes feature columns
+        chunksize: Rows per chunk
+
+    Yields:
+        pandas.DataFrame: Next chunk of rows
+    """
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        missing = [col for col in FEATURE_COLUMNS if col not in chunk.columns]
+        if missing:
+            raise ValueError(f"Patient CSV is missing columns: {', '.join(missing)}")
+        yield chunk
+
+
+def valid_rows(patients):
+    """Boolean mask of the rows of an N x 8 array whose features are all finite."""
+    return np.isfinite(patients).all(axis=1)
+
+
+def score_chunk(risk_engine, chunk):
+    """
+    Score every valid row of a chunk.
+
+    Args:
+        risk_engine: DiabetesRiskEngine
+        chunk: DataFrame containing FEATURE_COLUMNS
+
+    Returns:
+        tuple: (probabilities, risk labels, valid mask) as numpy arrays;
+               invalid rows have probability NaN and label INVALID_RISK
+    """
+    patients = chunk[FEATURE_COLUMNS].to_numpy(dtype=float)
+    valid = valid_rows(patients)
+    probs = np.full(len(patients), np.nan)
+    labels = np.full(len(patients), INVALID_RISK, dtype=object)
+    if valid.any():
+        probs[valid] = risk_engine.predict_proba(patients[valid])
+        labels[valid] = risk_labels(probs[valid])
+    return probs, labels, valid
+
+
+def score_csv(risk_engine, input_path, output_path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Score a patient CSV and write the input rows plus probability and risk.
+
+    Args:
+        risk_engine: DiabetesRiskEngine
+        input_path: CSV with the 8 diabetes feature columns
+        output_path: Destination CSV (overwritten)
+        chunksize: Rows held in memory at once
+
+    Returns:
+        dict: Row count, invalid (unscored) row count, elapsed seconds,
+              rows per second and risk counts of the scored rows
+    """
+    start = time.perf_counter()
+    rows = 0
+    invalid = 0
+    risk_counts = {"low": 0, "medium": 0, "high": 0}
+
+    for i, chunk in enumerate(iter_patient_chunks(input_path, chunksize)):
+        probs, labels, valid = score_chunk(risk_engine, chunk)
+        chunk["probability"] = probs.round(6)
+        chunk["risk"] = labels
+
+        chunk.to_csv(output_path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+
+        rows += len(chunk)
+        invalid += int((~valid).sum())
+        for level, count in chunk["risk"][valid].value_counts().items():
+            risk_counts[level] += int(count)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "invalid_rows": invalid,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed > 0 else float("inf"),
+        "risk_counts": risk_counts,
+    }
+
+
+# ==================== POPULATION WHAT-IFS ====================
+
+def scenario_transition_matrices(risk_engine, csv_path, scenario_names=None,
+                                 chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Count low/medium/high risk transitions for each scenario over a population.
+
+    Every chunk is scored once as-is and once per scenario; transitions are
+    accumulated with a single bincount per scenario and chunk. Rows with
+    missing or non-finite features are skipped and counted in 'invalid_rows'.
+
+    Args:
+        risk_engine: DiabetesRiskEngine
+        csv_path: CSV with the 8 diabetes feature columns
+        scenario_names: scenarios to evaluate (defaults to all SCENARIOS)
+        chunksize: Rows held in memory at once
+
+    Returns:
+        dict: 'matrices' maps scenario name to a 3x3 int array indexed
+              [current risk, new risk] in RISK_LEVELS order, plus 'rows'
+              (valid rows scored), 'invalid_rows', 'seconds' and 'rows_per_sec'
+    """
+    if scenario_names is None:
+        scenario_names = list(SCENARIOS)
+
+    n_levels = len(RISK_LEVELS)
+    counts = {name: np.zeros(n_levels * n_levels, dtype=np.int64) for name in scenario_names}
+
+    start = time.perf_counter()
+    rows = 0
+    invalid = 0
+
+    for chunk in iter_patient_chunks(csv_path, chunksize):
+        patients = chunk[FEATURE_COLUMNS].to_numpy(dtype=float)
+        valid = valid_rows(patients)
+        if not valid.all():
+            invalid += int((~valid).sum())
+            patients = patients[valid]
+        if len(patients) == 0:
+            continue
+        base = risk_codes(risk_engine.predict_proba(patients)).astype(np.intp) * n_levels
+
+        for name in scenario_names:
+            new = risk_codes(risk_engine.predict_proba(apply_scenario_batch(patients, name)))
+            counts[name] += np.bincount(base + new, minlength=n_levels * n_levels)
+
+        rows += len(patients)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "matrices": {name: c.reshape(n_levels, n_levels) for name, c in counts.items()},
+        "rows": rows,
+        "invalid_rows": invalid,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed > 0 else float("inf"),
+    }
@@ -0,0 +1,323 @@
+"""
+Model Artifact Cache
+====================
+Persists the trained Keras models and their preprocessors (scaler, TF-IDF
+vectorizer, label encoder) so the chatbot only retrains when the training
+data or hyperparameters change.
+
+Each cache entry lives in its own directory named after a content hash of
+both CSV files and both hyperparameter dicts. An entry is written to a
+temporary directory first and renamed into place, so a crash mid-save never
+leaves a half-written entry behind.
+
+TensorFlow and the training code are imported only when a Keras model is
+actually loaded or trained. load_inference_engines() serves a cache hit
+from the entry's NumPy weight export, without TensorFlow or scikit-learn.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+
+from models.diabetes_nn import DIABETES_PARAMS
+from models.intent_nn import INTENT_PARAMS
+from models.numpy_inference import DiabetesRiskEngine, IntentEngine
+from models.online_intent import ONLINE_DIR_NAME
+
+
+# ==================== CONSTANTS ====================
+
+CACHE_DIR = "artifacts"
+
+# Bump when the on-disk layout changes so old entries are ignored
+CACHE_FORMAT_VERSION = 2
+
+MANIFEST_FILE = "manifest.json"
+DIABETES_MODEL_FILE = "diabetes_model.keras"
+INTENT_MODEL_FILE = "intent_model.keras"
+PREPROCESSORS_FILE = "preprocessors.pkl"
+HISTORIES_FILE = "histories.json"
+RISK_ENGINE_FILE = "diabetes_engine.npz"
+
+
+# ==================== HISTORY ====================
+
+class CachedHistory:
+    """Stand-in for keras.callbacks.History restored from disk."""
+
+    def __init__(self, history):
+        self.history = history
+
+
+# ==================== CACHE KEY ====================
+
+def compute_cache_key(diabetes_path, intents_path, diabetes_params=None, intent_params=None):
+    """
+    Compute the content hash that identifies a set of trained artifacts.
+
+    Args:
+        diabetes_path: Path to the diabetes CSV
+        intents_path: Path to the intents CSV
+        diabetes_params: Diabetes model hyperparameters (defaults to DIABETES_PARAMS)
+        intent_params: Intent model hyperparameters (defaults to INTENT_PARAMS)
+
+    Returns:
+        str: Hex digest identifying the artifacts
+    """
+    digest = hashlib.sha256()
+    digest.update(f"format={CACHE_FORMAT_VERSION}".encode())
+
+    for path in (diabetes_path, intents_path):
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+
+    params = {
+        "diabetes": {**DIABETES_PARAMS, **(diabetes_params or {})},
+        "intent": {**INTENT_PARAMS, **(intent_params or {})},
+    }
+    digest.update(json.dumps(params, sort_keys=True).encode())
+
+    return digest.hexdigest()[:16]
+
+
+# ==================== SAVE / LOAD ====================
+
+def save_artifacts(artifacts, cache_key, cache_dir=CACHE_DIR):
+    """
+    Write trained models and preprocessors to the cache.
+
+    Args:
+        artifacts: Dictionary as returned by load_or_train_models()
+        cache_key: Key from compute_cache_key()
+        cache_dir: Root cache directory
+
+    Returns:
+        str: Path of the cache entry directory
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    entry_dir = os.path.join(cache_dir, cache_key)
+    staging_dir = tempfile.mkdtemp(prefix=f".{cache_key}-", dir=cache_dir)
+
+    try:
+        artifacts["diabetes_model"].save(os.path.join(staging_dir, DIABETES_MODEL_FILE))
+        artifacts["intent_model"].save(os.path.join(staging_dir, INTENT_MODEL_FILE))
+        artifacts["risk_engine"].save(os.path.join(staging_dir, RISK_ENGINE_FILE))
+
+        with open(os.path.join(staging_dir, PREPROCESSORS_FILE), "wb") as f:
+            pickle.dump({
+                "scaler": artifacts["scaler"],
+                "vectorizer": artifacts["vectorizer"],
+                "label_encoder": artifacts["label_encoder"],
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        with open(os.path.join(staging_dir, HISTORIES_FILE), "w", encoding="utf-8") as f:
+            json.dump({
+                "diabetes": _history_to_dict(artifacts["diabetes_history"]),
+                "intent": _history_to_dict(artifacts["intent_history"]),
+            }, f)
+
+        # Manifest is written last and marks the entry as complete
+        with open(os.path.join(staging_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump({"key": cache_key, "format": CACHE_FORMAT_VERSION}, f)
+
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(staging_dir, entry_dir)
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    return entry_dir
+
+
+def load_artifacts(cache_key, cache_dir=CACHE_DIR):
+    """
+    Load a complete cache entry.
+
+    Args:
+        cache_key: Key from compute_cache_key()
+        cache_dir: Root cache directory
+
+    Returns:
+        dict or None: Artifacts dictionary, or None if no complete entry exists
+    """
+    from keras.models import load_model
+
+    entry_dir = os.path.join(cache_dir, cache_key)
+    if not os.path.isfile(os.path.join(entry_dir, MANIFEST_FILE)):
+        return None
+
+    with open(os.path.join(entry_dir, PREPROCESSORS_FILE), "rb") as f:
+        preprocessors = pickle.load(f)
+
+    with open(os.path.join(entry_dir, HISTORIES_FILE), encoding="utf-8") as f:
+        histories = json.load(f)
+
+    return {
+        "diabetes_model": load_model(os.path.join(entry_dir, DIABETES_MODEL_FILE)),
+        "scaler": preprocessors["scaler"],
+        "diabetes_history": CachedHistory(histories["diabetes"]),
+        "intent_model": load_model(os.path.join(entry_dir, INTENT_MODEL_FILE)),
+        "vectorizer": preprocessors["vectorizer"],
+        "label_encoder": preprocessors["label_encoder"],
+        "intent_history": CachedHistory(histories["intent"]),
+        "risk_engine": DiabetesRiskEngine.load(os.path.join(entry_dir, RISK_ENGINE_FILE)),
+    }
+
+
+def prune_cache(keep_key, cache_dir=CACHE_DIR):
+    """Remove every cache entry except keep_key (the online intent model is kept)."""
+    if not os.path.isdir(cache_dir):
+        return
+
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name == ONLINE_DIR_NAME or name.startswith(f".{ONLINE_DIR_NAME}-"):
+            continue
+        if name != keep_key and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+# ==================== PUBLIC API ====================
+
+def load_or_train_models(diabetes_path, intents_path, cache_dir=CACHE_DIR, retrain=False,
+                         parallel=False, streaming=False, sparse_intent=False):
+    """
+    Return trained models, loading them from cache when the key matches.
+
+    Args:
+        diabetes_path: Path to the diabetes CSV
+        intents_path: Path to the intents CSV
+        cache_dir: Root cache directory
+        retrain: Ignore any cached entry and train from scratch
+        parallel: On a cache miss, train both models concurrently in worker
+                  processes (see models/parallel_training.py); ignored on
+                  single-CPU machines, where it only adds overhead
+        streaming: On a cache miss, train the diabetes model from a chunked
+                   tf.data pipeline over the CSV instead of loading it all
+                   (train_diabetes_model_streaming(), for very large files).
+                   Not part of the cache key: either way the entry holds a
+                   model trained on the same data and hyperparameters
+        sparse_intent: On a cache miss, train the intent model on the sparse
+                       TF-IDF matrix (train_intent_model_sparse()) instead of
+                       densifying it. Not part of the cache key either
+
+    Returns:
+        dict: Models, preprocessors, histories and the NumPy 'risk_engine'
+              and 'intent_engine', plus 'from_cache' (bool) and 'cache_key' (str)
+    """
+    cache_key = compute_cache_key(diabetes_path, intents_path)
+
+    artifacts = None if retrain else load_artifacts(cache_key, cache_dir)
+    if artifacts is not None:
+        artifacts["intent_engine"] = _build_intent_engine(artifacts)
+        artifacts["from_cache"] = True
+        artifacts["cache_key"] = cache_key
+        return artifacts
+
+    if parallel and (os.cpu_count() or 1) > 1:
+        artifacts = _train_in_parallel(diabetes_path, intents_path, streaming, sparse_intent)
+    else:
+        artifacts = _train_sequentially(diabetes_path, intents_path, streaming, sparse_intent)
+    artifacts["risk_engine"] = DiabetesRiskEngine.from_keras(artifacts["diabetes_model"],
+                                                             artifacts["scaler"])
+
+    save_artifacts(artifacts, cache_key, cache_dir)
+    prune_cache(cache_key, cache_dir)
+
+    artifacts["intent_engine"] = _build_intent_engine(artifacts)
+    artifacts["from_cache"] = False
+    artifacts["cache_key"] = cache_key
+    return artifacts
+
+
+def load_inference_engines(diabetes_path, intents_path, cache_dir=CACHE_DIR, retrain=False,
+                           parallel=False, streaming=False, sparse_intent=False):
+    """
+    Return the NumPy inference engines, avoiding TensorFlow when possible.
+
+    On a cache hit the engines are read from the entry's shared-weights
+    export (models/shared_weights.py), which needs only NumPy. Otherwise
+    this falls back to load_or_train_models() and writes the export, so the
+    next start is fast.
+
+    Args:
+        diabetes_path: Path to the diabetes CSV
+        intents_path: Path to the intents CSV
+        cache_dir: Root cache directory
+        retrain: Ignore any cached entry and train from scratch
+        parallel: Passed to load_or_train_models()
+        streaming: Passed to load_or_train_models()
+        sparse_intent: Passed to load_or_train_models()
+
+    Returns:
+        dict: 'risk_engine', 'intent_engine', 'from_cache' and 'cache_key';
+              on the fallback path everything load_or_train_models() returns
+    """
+    from models.shared_weights import (export_shared_weights, is_current_export,
+                                       load_shared_engines, shared_weights_dir)
+
+    cache_key = compute_cache_key(diabetes_path, intents_path)
+    directory = shared_weights_dir(cache_dir, cache_key)
+    if not retrain and is_current_export(directory, cache_key):
+        risk_engine, intent_engine = load_shared_engines(directory)
+        return {"risk_engine": risk_engine, "intent_engine": intent_engine,
+                "from_cache": True, "cache_key": cache_key}
+
+    artifacts = load_or_train_models(diabetes_path, intents_path, cache_dir, retrain, parallel,
+                                     streaming, sparse_intent)
+    export_shared_weights(artifacts["risk_engine"], artifacts["intent_engine"], directory,
+                          cache_key)
+    return artifacts
+
+
+def _train_sequentially(diabetes_path, intents_path, streaming=False, sparse_intent=False):
+    from models.diabetes_nn import train_diabetes_model, train_diabetes_model_streaming
+    from models.intent_nn import train_intent_model, train_intent_model_sparse
+
+    print("\n[1/2] Training diabetes risk prediction model...")
+    train_diabetes = train_diabetes_model_streaming if streaming else train_diabetes_model
+    diabetes_model, scaler, diabetes_history = train_diabetes(diabetes_path)
+
+    print("\n[2/2] Training intent classification model...")
+    train_intent = train_intent_model_sparse if sparse_intent else train_intent_model
+    intent_model, vectorizer, label_encoder, intent_history = train_intent(intents_path)
+
+    return {
+        "diabetes_model": diabetes_model,
+        "scaler": scaler,
+        "diabetes_history": diabetes_history,
+        "intent_model": intent_model,
+        "vectorizer": vectorizer,
+        "label_encoder": label_encoder,
+        "intent_history": intent_history,
+    }
+
+
+def _train_in_parallel(diabetes_path, intents_path, streaming=False, sparse_intent=False):
+    from models.parallel_training import default_thread_split, train_models_parallel
+
+    print(f"\n[1-2/2] Training diabetes and intent models in parallel "
+          f"({default_thread_split()} TensorFlow threads per worker)...")
+    artifacts = train_models_parallel(diabetes_path, intents_path, streaming=streaming,
+                                      sparse_intent=sparse_intent)
+
+    for job, seconds in artifacts.pop("train_seconds").items():
+        history = artifacts[f"{job}_history"].history
+        print(f"   {job:<9} {len(history['loss'])} epochs in {seconds:.1f}s, "
+              f"val_accuracy {history['val_accuracy'][-1]:.3f}")
+    return artifacts
+
+
+def _build_intent_engine(artifacts):
+    """Export the intent model into an IntentEngine."""
+    return IntentEngine.from_keras(artifacts["intent_model"], artifacts["vectorizer"],
+                                   artifacts["label_encoder"])
+
+
+def _history_to_dict(history):
+    """Convert a Keras History (or CachedHistory) into JSON-serializable lists."""
+    return {name: [float(v) for v in values] for name, values in history.history.items()}
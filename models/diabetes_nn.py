@@ -1,32 +1,33 @@
-import pandas as pd
+import math
+
 import numpy as np
-from keras.models import Sequential
-from keras.layers import Dense
-from sklearn.preprocessing import StandardScaler
+from models.risk import risk_from_probability
 
+# Keras, scikit-learn and pandas are imported inside the functions that use
+# them, so importing this module (e.g. for DIABETES_PARAMS) stays cheap.
 
-def train_diabetes_model(csv_path):
-    data = pd.read_csv(csv_path)
 
-    # Detect target column automatically
-    target_col = None
-    for col in data.columns:
-        if col.lower() in ["outcome", "target", "diabetes"]:
-            target_col = col
-            break
+# Training hyperparameters (also part of the artifact cache key)
+DIABETES_PARAMS = {
+    "hidden_units": [16, 8],
+    "epochs": 100,
+    "batch_size": 16,
+    "validation_split": 0.2,
+}
 
-    if target_col is None:
-        raise ValueError("Target column not found in diabetes dataset")
+# Rows read per CSV chunk by train_diabetes_model_streaming()
+STREAMING_CHUNKSIZE = 100_000
 
-    X = data.drop(columns=[target_col]).values
-    y = data[target_col].values
 
-    scaler = StandardScaler()
-    X = scaler.fit_transform(X)
+def build_diabetes_model(input_dim, hidden_units):
+    """Compile the diabetes MLP: two ReLU layers and a sigmoid output."""
+    from keras.layers import Dense
+    from keras.models import Sequential
 
+    first_units, second_units = hidden_units
     model = Sequential()
-    model.add(Dense(16, input_dim=X.shape[1], activation="relu"))
-    model.add(Dense(8, activation="relu"))
+    model.add(Dense(first_units, input_dim=input_dim, activation="relu"))
+    model.add(Dense(second_units, activation="relu"))
     model.add(Dense(1, activation="sigmoid"))
 
     model.compile(
@@ -34,19 +35,151 @@ def train_diabetes_model(csv_path):
         optimizer="adam",
         metrics=["accuracy"]
     )
+    return model
+
+
+def find_target_column(columns):
+    """Detect the target column automatically."""
+    for col in columns:
+        if col.lower() in ["outcome", "target", "diabetes"]:
+            return col
+    raise ValueError("Target column not found in diabetes dataset")
+
+
+def load_diabetes_data(csv_path):
+    """Read the diabetes CSV and split it into raw features and target."""
+    import pandas as pd
+
+    data = pd.read_csv(csv_path)
+    target_col = find_target_column(data.columns)
+    return data.drop(columns=[target_col]).values, data[target_col].values
+
+
+def iter_diabetes_chunks(csv_path, chunksize=STREAMING_CHUNKSIZE):
+    """Yield (raw features, target) arrays for consecutive chunks of the CSV."""
+    import pandas as pd
+
+    target_col = find_target_column(pd.read_csv(csv_path, nrows=0).columns)
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        yield (chunk.drop(columns=[target_col]).to_numpy(dtype=np.float64),
+               chunk[target_col].to_numpy(dtype=np.float32))
+
+
+def train_diabetes_model(csv_path, params=None):
+    from sklearn.preprocessing import StandardScaler
+
+    params = {**DIABETES_PARAMS, **(params or {})}
+    X, y = load_diabetes_data(csv_path)
+
+    scaler = StandardScaler()
+    X = scaler.fit_transform(X)
+
+    model = build_diabetes_model(X.shape[1], params["hidden_units"])
 
-    history = model.fit(X, y, epochs=100, batch_size=16, validation_split=0.2, verbose=1)
+    history = model.fit(X, y,
+              epochs=params["epochs"],
+              batch_size=params["batch_size"],
+              validation_split=params["validation_split"],
+              verbose=1)
+
+    return model, scaler, history
+
+
+def train_diabetes_model_streaming(csv_path, params=None, chunksize=STREAMING_CHUNKSIZE,
+                                   seed=42):
+    """
+    Train the diabetes model without loading the whole CSV into memory.
+
+    Pass 1 streams the file once to fit the StandardScaler with
+    partial_fit() and count the rows. Training then feeds the network
+    from a tf.data pipeline over a chunked reader, with prefetching, so
+    peak memory depends on chunksize, not on the file size.
+
+    The last validation_split fraction of rows is held out, exactly as
+    model.fit(validation_split=...) does. Rows are shuffled within each
+    chunk with a fresh permutation every epoch.
+
+    Args:
+        csv_path: Path to the diabetes CSV
+        params: Overrides for DIABETES_PARAMS
+        chunksize: Rows read per chunk
+        seed: Shuffling seed
+
+    Returns:
+        tuple: (model, scaler, history) like train_diabetes_model()
+    """
+    import tensorflow as tf
+    from sklearn.preprocessing import StandardScaler
+
+    params = {**DIABETES_PARAMS, **(params or {})}
+    batch_size = params["batch_size"]
+
+    # Pass 1: scaler statistics and row count
+    scaler = StandardScaler()
+    n_rows = 0
+    for X, _ in iter_diabetes_chunks(csv_path, chunksize):
+        scaler.partial_fit(X)
+        n_rows += len(X)
+    if n_rows == 0:
+        raise ValueError("Diabetes dataset is empty")
+
+    n_features = scaler.n_features_in_
+    n_train = int(math.floor(n_rows * (1.0 - params["validation_split"])))
+    rng = np.random.default_rng(seed)
+
+    def batches(start, stop, shuffle):
+        """Scaled (X, y) batches for rows [start, stop) of the file."""
+        row = 0
+        rest_X = np.empty((0, n_features), dtype=np.float32)
+        rest_y = np.empty(0, dtype=np.float32)
+
+        for X, y in iter_diabetes_chunks(csv_path, chunksize):
+            lo, hi = max(start - row, 0), min(stop - row, len(X))
+            row += len(X)
+            if lo < hi:
+                X = scaler.transform(X[lo:hi]).astype(np.float32)
+                y = y[lo:hi]
+                if shuffle:
+                    order = rng.permutation(len(X))
+                    X, y = X[order], y[order]
+
+                # Carry the partial batch over to the next chunk
+                X = np.concatenate([rest_X, X])
+                y = np.concatenate([rest_y, y])
+                full = len(X) - len(X) % batch_size
+                for i in range(0, full, batch_size):
+                    yield X[i:i + batch_size], y[i:i + batch_size]
+                rest_X, rest_y = X[full:], y[full:]
+            if row >= stop:
+                break
+
+        if len(rest_X):
+            yield rest_X, rest_y
+
+    signature = (tf.TensorSpec((None, n_features), tf.float32),
+                 tf.TensorSpec((None,), tf.float32))
+
+    def dataset(start, stop, shuffle):
+        # Batch count is exact, so Keras knows the epoch length up front
+        steps = math.ceil((stop - start) / batch_size)
+        return tf.data.Dataset.from_generator(
+            lambda: batches(start, stop, shuffle), output_signature=signature
+        ).apply(tf.data.experimental.assert_cardinality(steps)).prefetch(tf.data.AUTOTUNE)
+
+    model = build_diabetes_model(n_features, params["hidden_units"])
+    validation = dataset(n_train, n_rows, False) if n_train < n_rows else None
+
+    history = model.fit(dataset(0, n_train, True),
+              epochs=params["epochs"],
+              validation_data=validation,
+              shuffle=False,  # Shuffled per chunk in batches()
+              verbose=1)
 
     return model, scaler, history
 
 
 def get_risk_level(model, scaler, patient_data):
     patient_data = scaler.transform(patient_data)
-    prob = model.predict(patient_data)[0][0]
-
-    if prob > 0.7:
-        return "high"
-    elif prob > 0.4:
-        return "medium"
-    else:
-        return "low"
+    prob = model.predict(patient_data, verbose=0)[0][0]
+
+    return risk_from_probability(prob)
@@ -0,0 +1,260 @@
+"""
+Goal-Seeking Scenario Optimizer
+===============================
+Answers "what would I have to change to get to low risk?" by searching
+for the cheapest scaled combination of the lifestyle scenarios in
+models/simulator.py that brings the diabetes model's probability down to
+the low-risk threshold (0.4).
+
+A candidate assigns each scenario an intensity, a multiple of `step` up
+to `max_multiple` (e.g. 1.5 x walking daily), and changes the patient by
+the sum of the scaled modifiers. Its effort is the sum of intensity x
+scenario "cost". Candidates form a lattice that is explored best-first
+in order of effort:
+
+    - the cheapest unexplored candidates are popped in batches and scored
+      with a single risk_engine.predict_proba() call per batch
+    - every scored lattice point is memoized, so no point is scored twice
+    - a candidate that reaches the goal is never expanded: everything
+      above it on the lattice does at least as much and costs more, so it
+      is dominated
+    - the search stops once the cheapest remaining candidate costs more
+      than the best solution found (or the time budget runs out)
+
+Ties on effort go to the fewest scenarios, then the lower probability.
+The model is not assumed to be monotone in the intensities (a ReLU network
+with clipped features need not be), so a patient is only reported as
+unreachable once the whole lattice has been searched; the reply then shows
+the lowest probability found. Results are cached per patient.
+"""
+
+import heapq
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from models.risk import MEDIUM_RISK_THRESHOLD
+from models.simulator import SCENARIOS, SCENARIO_DELTAS
+
+
+# ==================== CONSTANTS ====================
+
+DEFAULT_STEP = 0.25          # Intensity granularity, in scenario applications
+DEFAULT_MAX_MULTIPLE = 3.0   # Highest intensity per scenario
+DEFAULT_BATCH_SIZE = 256     # Candidates scored per predict_proba() call
+DEFAULT_TIME_BUDGET = 0.25   # Seconds; interactive chat latency
+RESULT_CACHE_SIZE = 256
+
+
+# ==================== OPTIMIZER ====================
+
+class GoalSeeker:
+    """
+    Finds the cheapest scenario intensities that reach a risk target.
+
+    Usage:
+        seeker = GoalSeeker(risk_engine)
+        result = seeker.seek(patient)       # patient: 1 x 8 array
+        result["intensities"]               # {'walk_daily': 1.5, ...}
+    """
+
+    def __init__(self, risk_engine, scenario_names=None, target=MEDIUM_RISK_THRESHOLD,
+                 step=DEFAULT_STEP, max_multiple=DEFAULT_MAX_MULTIPLE,
+                 batch_size=DEFAULT_BATCH_SIZE, time_budget=DEFAULT_TIME_BUDGET):
+        """
+        Args:
+            risk_engine: DiabetesRiskEngine (anything with predict_proba(N x 8))
+            scenario_names: Scenarios to combine (default: every scenario that
+                            lowers at least one feature)
+            target: Highest acceptable probability (default: low-risk threshold)
+            step: Intensity granularity
+            max_multiple: Highest intensity per scenario
+            batch_size: Candidates scored per batch
+            time_budget: Seconds before returning the best solution so far
+        """
+        if scenario_names is None:
+            scenario_names = [name for name in SCENARIOS if _lowers_any(name)]
+        unknown = [name for name in scenario_names if name not in SCENARIOS]
+        if unknown:
+            raise ValueError(f"Unknown scenarios: {', '.join(unknown)}")
+        if step <= 0 or max_multiple < step:
+            raise ValueError("Need 0 < step <= max_multiple")
+
+        self.risk_engine = risk_engine
+        self.names = list(scenario_names)
+        self.target = target
+        self.step = step
+        self.max_steps = int(math.floor(max_multiple / step + 1e-9))
+        self.batch_size = batch_size
+        self.time_budget = time_budget
+
+        # Per-step feature change of each scenario, and the combined floor
+        self.deltas = np.vstack([SCENARIO_DELTAS[name][0] for name in self.names]) * step
+        self.floor = np.max(np.vstack([SCENARIO_DELTAS[name][1] for name in self.names]), axis=0)
+        self.step_costs = np.array([SCENARIOS[name]["cost"] for name in self.names]) * step
+
+        self._results = OrderedDict()
+        self._lock = threading.Lock()  # Guards _results when serving threads share a seeker
+
+    def apply(self, patient, points):
+        """Patients after applying lattice points (K x n_scenarios step counts)."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, len(self.names))
+        return np.maximum(patient[:1] + points @ self.deltas, self.floor)
+
+    def seek(self, patient):
+        """
+        Search for the cheapest intensities that reach the target.
+
+        Args:
+            patient: 1 x 8 patient array
+
+        Returns:
+            dict: 'reachable', 'intensities' (scenario -> multiple, non-zero
+                  only), 'effort', 'probability', 'current_probability',
+                  'patient' (modified 1 x 8 row), 'evaluated', 'batches',
+                  'complete' (False if the time budget cut the search
+                  short) and 'seconds'
+        """
+        patient = np.asarray(patient, dtype=np.float64).reshape(1, -1)
+        key = patient.tobytes()
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return dict(self._results[key])
+
+        result = self._search(patient)
+        with self._lock:
+            self._results[key] = result
+            if len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        return dict(result)
+
+    def _search(self, patient):
+        start = time.perf_counter()
+        n = len(self.names)
+        origin = (0,) * n
+        ceiling = (self.max_steps,) * n
+
+        # The unchanged patient and the all-out effort; the latter is only an
+        # initial solution (the model need not be monotone, so it does not
+        # bound what is reachable)
+        current, all_out = self.risk_engine.predict_proba(self.apply(patient, [origin, ceiling]))
+        probs = {origin: float(current), ceiling: float(all_out)}
+        batches = 1
+
+        if current <= self.target:
+            return self._result(patient, origin, probs, batches, True, start)
+
+        frontier = [(0.0, 0, origin)]
+        queued = {origin}
+        best = ceiling
+        if all_out <= self.target:
+            best_key = self._rank(ceiling, probs[ceiling])
+        else:
+            best_key = (math.inf,)  # No solution yet: search the whole lattice
+        complete = True
+
+        while frontier and frontier[0][0] <= best_key[0]:
+            if time.perf_counter() - start > self.time_budget:
+                complete = False
+                break
+
+            # Pop the cheapest candidates; skip those already scored
+            batch = []
+            while frontier and len(batch) < self.batch_size and frontier[0][0] <= best_key[0]:
+                point = heapq.heappop(frontier)[2]
+                batch.append(point)
+
+            pending = [point for point in batch if point not in probs]
+            if pending:
+                scores = self.risk_engine.predict_proba(self.apply(patient, pending))
+                probs.update(zip(pending, scores.tolist()))
+                batches += 1
+
+            for point in batch:
+                prob = probs[point]
+                if prob <= self.target:
+                    rank = self._rank(point, prob)
+                    if rank < best_key:
+                        best, best_key = point, rank
+                    continue  # Everything above a solution is dominated
+
+                for i in range(n):
+                    if point[i] < self.max_steps:
+                        child = point[:i] + (point[i] + 1,) + point[i + 1:]
+                        if child not in queued:
+                            queued.add(child)
+                            heapq.heappush(frontier, (self._effort(child), len(queued), child))
+
+        if probs[best] > self.target:
+            # Unreachable (so far): report the lowest probability found
+            best = min(probs, key=lambda point: (probs[point], self._effort(point)))
+        return self._result(patient, best, probs, batches, complete, start)
+
+    def _effort(self, point):
+        return float(np.dot(point, self.step_costs))
+
+    def _rank(self, point, prob):
+        """Sort key: effort, then scenarios used, then probability."""
+        return (round(self._effort(point), 9), sum(1 for s in point if s), prob)
+
+    def _result(self, patient, point, probs, batches, complete, start):
+        origin = (0,) * len(self.names)
+        return {
+            "reachable": probs[point] <= self.target,
+            "intensities": {name: steps * self.step
+                            for name, steps in zip(self.names, point) if steps},
+            "effort": self._effort(point),
+            "probability": probs[point],
+            "current_probability": probs[origin],
+            "patient": self.apply(patient, [point]),
+            "evaluated": len(probs),
+            "batches": batches,
+            "complete": complete,
+            "seconds": time.perf_counter() - start,
+        }
+
+
+def _lowers_any(scenario_name):
+    """True if a scenario lowers at least one feature."""
+    return any(change < 0 for change in SCENARIOS[scenario_name]["modifiers"].values())
+
+
+# ==================== RESPONSE ====================
+
+def format_goal_seek(result, target=MEDIUM_RISK_THRESHOLD):
+    """
+    Chat reply for a GoalSeeker result.
+
+    Args:
+        result: Dictionary from GoalSeeker.seek()
+        target: Probability target used for the search
+
+    Returns:
+        str: Formatted response
+    """
+    current = result["current_probability"]
+    header = (f"🎯 Reaching LOW risk (probability ≤ {target:.2f})\n\n"
+              f"📊 Current probability: {current:.2f}\n\n")
+
+    if not result["intensities"] and result["reachable"]:
+        return header + "✅ You are already at low risk. Keep up your current habits!"
+
+    lines = [f"  • {multiple:g}× {SCENARIOS[name]['description'].lower()}"
+             for name, multiple in sorted(result["intensities"].items(),
+                                          key=lambda item: -item[1])]
+
+    if not result["reachable"]:
+        return (header + "⚠️ None of the combinations I can simulate reaches low risk; "
+                f"the best would lower your probability to {result['probability']:.2f}:\n"
+                + "\n".join(lines) + "\n\nPlease talk to your doctor about a treatment plan.")
+
+    response = (header + "✅ The smallest change that gets you there:\n" + "\n".join(lines)
+                + f"\n\n📉 Predicted probability: {result['probability']:.2f} "
+                  f"(effort {result['effort']:g})")
+    if not result["complete"]:
+        response += "\n(Search stopped early; a slightly easier combination may exist.)"
+    return response
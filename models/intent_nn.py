@@ -1,61 +1,117 @@
-import pandas as pd
 import numpy as np
-from keras.models import Sequential
-from keras.layers import Dense, Dropout
-from keras.callbacks import EarlyStopping
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import train_test_split
 
+# Keras, scikit-learn and pandas are imported inside the functions that use
+# them, so importing this module (e.g. for INTENT_PARAMS) stays cheap.
 
-def train_intent_model(csv_path):
-    data = pd.read_csv(csv_path)
 
-    if "text" not in data.columns or "intent" not in data.columns:
-        raise ValueError("intents.csv must contain 'text' and 'intent' columns")
+# Training hyperparameters (also part of the artifact cache key)
+INTENT_PARAMS = {
+    "max_features": 500,
+    "ngram_range": [1, 2],
+    "max_df": 0.9,
+    "hidden_units": [32, 16],
+    "dropout": [0.4, 0.3],
+    "epochs": 50,
+    "batch_size": 8,
+    "patience": 5,
+    "test_size": 0.2,
+}
 
-    texts = data["text"].astype(str)
-    labels = data["intent"].astype(str)
+# Hashed feature space for train_intent_model_sparse(hashing=True)
+HASHING_FEATURES = 2 ** 16
 
-    label_encoder = LabelEncoder()
-    y = label_encoder.fit_transform(labels)
+
+def build_vectorizer(params):
+    """TF-IDF vectorizer configured from INTENT_PARAMS-style settings."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
 
     # Improved TF-IDF with better parameters
-    vectorizer = TfidfVectorizer(
-        max_features=500,  # Reduced features for small dataset
+    return TfidfVectorizer(
+        max_features=params["max_features"],  # Reduced features for small dataset
         stop_words="english",
-        ngram_range=(1, 2),  # Include bigrams for better context
+        ngram_range=tuple(params["ngram_range"]),  # Include bigrams for better context
         min_df=1,
-        max_df=0.9
+        max_df=params["max_df"]
     )
-    X = vectorizer.fit_transform(texts).toarray()
 
-    # Stratified split to ensure balanced validation set
-    X_train, X_val, y_train, y_val = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
+
+def build_hashing_vectorizer(params, n_features=HASHING_FEATURES):
+    """Vocabulary-free vectorizer: hashed n-gram counts, l2-normalized."""
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    return HashingVectorizer(
+        n_features=n_features,
+        stop_words="english",
+        ngram_range=tuple(params["ngram_range"]),
+        alternate_sign=False,
+        norm="l2"
     )
 
-    # Improved model architecture
+
+def build_intent_model(input_dim, n_classes, hidden_units, dropout):
+    """Compile the intent MLP: two ReLU + Dropout blocks and a softmax output."""
+    from keras.layers import Dense, Dropout
+    from keras.models import Sequential
+
+    first_units, second_units = hidden_units
+    first_dropout, second_dropout = dropout
     model = Sequential()
-    model.add(Dense(32, input_shape=(X.shape[1],), activation="relu"))
-    model.add(Dropout(0.4))
-    model.add(Dense(16, activation="relu"))
-    model.add(Dropout(0.3))
-    model.add(Dense(len(np.unique(y)), activation="softmax"))
+    model.add(Dense(first_units, input_shape=(input_dim,), activation="relu"))
+    model.add(Dropout(first_dropout))
+    model.add(Dense(second_units, activation="relu"))
+    model.add(Dropout(second_dropout))
+    model.add(Dense(n_classes, activation="softmax"))
 
     model.compile(
         loss="sparse_categorical_crossentropy",
         optimizer="adam",
         metrics=["accuracy"]
     )
+    return model
+
+
+def load_intent_data(csv_path):
+    """Read the intents CSV as (texts, labels) string Series."""
+    import pandas as pd
+
+    data = pd.read_csv(csv_path)
+
+    if "text" not in data.columns or "intent" not in data.columns:
+        raise ValueError("intents.csv must contain 'text' and 'intent' columns")
+
+    return data["text"].astype(str), data["intent"].astype(str)
+
+
+def train_intent_model(csv_path, params=None):
+    from keras.callbacks import EarlyStopping
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder
+
+    params = {**INTENT_PARAMS, **(params or {})}
+    texts, labels = load_intent_data(csv_path)
+
+    label_encoder = LabelEncoder()
+    y = label_encoder.fit_transform(labels)
+
+    vectorizer = build_vectorizer(params)
+    X = vectorizer.fit_transform(texts).toarray()
+
+    # Stratified split to ensure balanced validation set
+    X_train, X_val, y_train, y_val = train_test_split(
+        X, y, test_size=params["test_size"], random_state=42, stratify=y
+    )
+
+    # Improved model architecture
+    model = build_intent_model(X.shape[1], len(np.unique(y)),
+                               params["hidden_units"], params["dropout"])
 
     # Early stopping to prevent overfitting
-    early_stop = EarlyStopping(monitor='val_loss', patience=5, restore_best_weights=True)
+    early_stop = EarlyStopping(monitor='val_loss', patience=params["patience"], restore_best_weights=True)
 
     # Train with more epochs but early stopping
     history = model.fit(X_train, y_train, 
-              epochs=50, 
-              batch_size=8, 
+              epochs=params["epochs"], 
+              batch_size=params["batch_size"], 
               validation_data=(X_val, y_val), 
               callbacks=[early_stop],
               verbose=1)
@@ -63,9 +119,68 @@ def train_intent_model(csv_path):
     return model, vectorizer, label_encoder, history
 
 
+def train_intent_model_sparse(csv_path, params=None, hashing=False,
+                              hashing_features=HASHING_FEATURES):
+    """
+    Train the intent model without densifying the feature matrix.
+
+    Same stratified split and early stopping as train_intent_model(), but
+    the TF-IDF (or hashed) matrix stays sparse and the network is fed by
+    SparseBatches. With hashing=True a HashingVectorizer replaces the
+    TF-IDF vocabulary, so nothing has to be fitted on the text and new
+    n-grams need no refit; IntentEngine serves it through
+    vectorizer.transform().
+
+    Args:
+        csv_path: Path to the intents CSV
+        params: Overrides for INTENT_PARAMS
+        hashing: Use a HashingVectorizer instead of TF-IDF
+        hashing_features: Hashed feature space size
+
+    Returns:
+        tuple: (model, vectorizer, label_encoder, history) like train_intent_model()
+    """
+    from keras.callbacks import EarlyStopping
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder
+
+    from models.sparse_batches import SparseBatches
+
+    params = {**INTENT_PARAMS, **(params or {})}
+    texts, labels = load_intent_data(csv_path)
+
+    label_encoder = LabelEncoder()
+    y = label_encoder.fit_transform(labels)
+
+    if hashing:
+        vectorizer = build_hashing_vectorizer(params, hashing_features)
+        X = vectorizer.transform(texts)
+    else:
+        vectorizer = build_vectorizer(params)
+        X = vectorizer.fit_transform(texts)
+
+    # Stratified split on row indices; the matrix itself is only sliced
+    train_idx, val_idx = train_test_split(
+        np.arange(len(y)), test_size=params["test_size"], random_state=42, stratify=y
+    )
+
+    model = build_intent_model(X.shape[1], len(np.unique(y)),
+                               params["hidden_units"], params["dropout"])
+
+    early_stop = EarlyStopping(monitor='val_loss', patience=params["patience"], restore_best_weights=True)
+
+    history = model.fit(SparseBatches(X[train_idx], y[train_idx], params["batch_size"], shuffle=True),
+              epochs=params["epochs"],
+              validation_data=SparseBatches(X[val_idx], y[val_idx], params["batch_size"]),
+              callbacks=[early_stop],
+              verbose=1)
+
+    return model, vectorizer, label_encoder, history
+
+
 def predict_intent(model, vectorizer, label_encoder, sentence):
     vec = vectorizer.transform([sentence]).toarray()
-    prediction = model.predict(vec)
+    prediction = model.predict(vec, verbose=0)
     intent_index = np.argmax(prediction)
     confidence = np.max(prediction)
     return label_encoder.inverse_transform([intent_index])[0], confidence
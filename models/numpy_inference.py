@@ -0,0 +1,283 @@
+"""
+NumPy Inference Engines
+=======================
+Pure-NumPy forward passes for the trained Keras networks. Weights are
+exported once from the Keras model; serving afterwards needs neither
+TensorFlow nor Keras and avoids Keras' per-call overhead, which dominates
+for single-row predictions on these small networks.
+"""
+
+import numpy as np
+
+from models.risk import risk_from_probability, risk_labels
+
+
+# ==================== ACTIVATIONS ====================
+
+def _relu(x):
+    return np.maximum(x, 0.0, out=x)
+
+
+def _sigmoid(x):
+    # Numerically stable logistic: exp(-log(1 + exp(-x)))
+    return np.exp(-np.logaddexp(0.0, -x))
+
+
+def _softmax(x):
+    x = x - x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=1, keepdims=True)
+    return x
+
+
+def _linear(x):
+    return x
+
+
+ACTIVATIONS = {
+    "relu": _relu,
+    "sigmoid": _sigmoid,
+    "softmax": _softmax,
+    "linear": _linear,
+}
+
+
+# ==================== WEIGHT EXPORT ====================
+
+def extract_dense_stack(model):
+    """
+    Pull Dense layer weights out of a Keras Sequential model.
+
+    Dropout layers are skipped (they are the identity at inference time).
+
+    Args:
+        model: Trained Keras Sequential model
+
+    Returns:
+        tuple: (weights, biases, activations) lists, one entry per Dense layer
+    """
+    weights, biases, activations = [], [], []
+
+    for layer in model.layers:
+        params = layer.get_weights()
+        if not params:
+            continue  # Dropout / activation-free layers
+
+        name = layer.activation.__name__
+        if name not in ACTIVATIONS:
+            raise ValueError(f"Unsupported activation for NumPy inference: {name}")
+
+        kernel, bias = params
+        weights.append(np.asarray(kernel, dtype=np.float64))
+        biases.append(np.asarray(bias, dtype=np.float64))
+        activations.append(name)
+
+    return weights, biases, activations
+
+
+def dense_forward(x, weights, biases, activations):
+    """Run a stack of Dense layers over a 2D input array."""
+    for kernel, bias, activation in zip(weights, biases, activations):
+        x = ACTIVATIONS[activation](x @ kernel + bias)
+    return x
+
+
+# ==================== DIABETES RISK ENGINE ====================
+
+class DiabetesRiskEngine:
+    """
+    NumPy forward pass for the diabetes risk MLP with StandardScaler fused in.
+
+    Scaling (x - mean) / scale followed by the first Dense layer is folded
+    into a single affine map, so raw patient arrays go straight in:
+
+        (x - m) / s @ W + b  ==  x @ (W / s[:, None]) + (b - (m / s) @ W)
+    """
+
+    def __init__(self, weights, biases, activations, mean, scale):
+        self.weights = weights
+        self.biases = biases
+        self.activations = activations
+        self.mean = mean
+        self.scale = scale
+
+    @classmethod
+    def from_keras(cls, model, scaler):
+        """
+        Build an engine from a trained Keras model and fitted StandardScaler.
+
+        Args:
+            model: Trained diabetes Keras model
+            scaler: Fitted StandardScaler
+
+        Returns:
+            DiabetesRiskEngine: Engine with scaling fused into the first layer
+        """
+        weights, biases, activations = extract_dense_stack(model)
+        mean = np.asarray(scaler.mean_, dtype=np.float64)
+        scale = np.asarray(scaler.scale_, dtype=np.float64)
+
+        first_kernel = weights[0] / scale[:, None]
+        first_bias = biases[0] - (mean / scale) @ weights[0]
+
+        return cls([first_kernel] + weights[1:], [first_bias] + biases[1:],
+                   activations, mean, scale)
+
+    def predict_proba(self, patient_data):
+        """
+        Diabetes probability for each row of raw (unscaled) patient data.
+
+        Args:
+            patient_data: Array of shape (n, 8) or (8,)
+
+        Returns:
+            numpy.ndarray: 1D array of n probabilities
+        """
+        x = np.atleast_2d(np.asarray(patient_data, dtype=np.float64))
+        return dense_forward(x, self.weights, self.biases, self.activations)[:, 0]
+
+    def predict(self, patient_data):
+        """Keras-compatible output of shape (n, 1)."""
+        return self.predict_proba(patient_data)[:, None]
+
+    def risk_level(self, patient_data):
+        """Risk label for the first row, matching get_risk_level()."""
+        return risk_from_probability(self.predict_proba(patient_data)[0])
+
+    def risk_levels(self, patient_data):
+        """Risk labels for every row."""
+        return risk_labels(self.predict_proba(patient_data))
+
+    def save(self, path):
+        """Save the exported weights to a .npz file."""
+        arrays = {"mean": self.mean, "scale": self.scale,
+                  "activations": np.asarray(self.activations)}
+        for i, (kernel, bias) in enumerate(zip(self.weights, self.biases)):
+            arrays[f"kernel_{i}"] = kernel
+            arrays[f"bias_{i}"] = bias
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Load an engine saved with save(); does not require TensorFlow."""
+        with np.load(path) as data:
+            activations = [str(a) for a in data["activations"]]
+            weights = [data[f"kernel_{i}"] for i in range(len(activations))]
+            biases = [data[f"bias_{i}"] for i in range(len(activations))]
+            return cls(weights, biases, activations, data["mean"], data["scale"])
+
+
+# ==================== INTENT ENGINE ====================
+
+class IntentEngine:
+    """
+    Sparse-aware NumPy forward pass for the intent classifier.
+
+    For the fitted TfidfVectorizer (l2 norm, plain term counts) the TF-IDF
+    row of a sentence is counts * idf / ||counts * idf||. The IDF weights
+    are folded into the first Dense kernel, so classifying a sentence only
+    gathers the kernel rows of the n-grams it contains:
+
+        tfidf @ W  ==  (counts @ (idf[:, None] * W)) / ||counts * idf||
+
+    Vectorizers that don't fit this form (e.g. HashingVectorizer) fall back
+    to vectorizer.transform(), still multiplying the sparse result directly.
+    """
+
+    def __init__(self, weights, biases, activations, vectorizer, classes):
+        self.weights = weights
+        self.biases = biases
+        self.activations = activations
+        self.vectorizer = vectorizer
+        self.classes = np.asarray(classes)
+
+        self._analyzer = None
+        if _is_plain_tfidf(vectorizer):
+            self._analyzer = vectorizer.build_analyzer()
+            self._vocabulary = vectorizer.vocabulary_
+            self._idf = np.asarray(vectorizer.idf_, dtype=np.float64)
+            self._idf_kernel = self._idf[:, None] * weights[0]
+
+    @classmethod
+    def from_keras(cls, model, vectorizer, label_encoder):
+        """
+        Build an engine from a trained intent model and its preprocessors.
+
+        Args:
+            model: Trained intent Keras model
+            vectorizer: Fitted TF-IDF vectorizer
+            label_encoder: Fitted LabelEncoder
+
+        Returns:
+            IntentEngine: Engine ready for predict()
+        """
+        weights, biases, activations = extract_dense_stack(model)
+        return cls(weights, biases, activations, vectorizer, label_encoder.classes_)
+
+    def first_layer(self, sentences):
+        """Pre-activation output of the first Dense layer, shape (n, units)."""
+        if self._analyzer is None:
+            return self.vectorizer.transform(sentences) @ self.weights[0] + self.biases[0]
+
+        hidden = np.empty((len(sentences), self.weights[0].shape[1]))
+        for row, sentence in enumerate(sentences):
+            counts = {}
+            for term in self._analyzer(sentence):
+                index = self._vocabulary.get(term)
+                if index is not None:
+                    counts[index] = counts.get(index, 0) + 1
+
+            if not counts:
+                hidden[row] = 0.0
+                continue
+
+            indices = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+            tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+            norm = np.sqrt(np.dot(tf * self._idf[indices], tf * self._idf[indices]))
+            hidden[row] = (tf @ self._idf_kernel[indices]) / norm
+
+        return hidden + self.biases[0]
+
+    def predict_proba(self, sentences):
+        """
+        Class probabilities for a batch of sentences.
+
+        Args:
+            sentences: List of user input strings
+
+        Returns:
+            numpy.ndarray: Array of shape (n, n_intents)
+        """
+        x = ACTIVATIONS[self.activations[0]](self.first_layer(sentences))
+        return dense_forward(x, self.weights[1:], self.biases[1:], self.activations[1:])
+
+    def predict(self, sentences):
+        """
+        Predict intents, mirroring predict_intent().
+
+        Args:
+            sentences: A single string or a list of strings
+
+        Returns:
+            tuple: (intent, confidence) for a string, or
+                   (list of intents, array of confidences) for a list
+        """
+        single = isinstance(sentences, str)
+        probs = self.predict_proba([sentences] if single else list(sentences))
+
+        indices = probs.argmax(axis=1)
+        confidences = probs[np.arange(len(indices)), indices]
+        intents = self.classes[indices]
+
+        if single:
+            return str(intents[0]), float(confidences[0])
+        return [str(intent) for intent in intents], confidences
+
+
+def _is_plain_tfidf(vectorizer):
+    """True for a fitted TfidfVectorizer using l2 norm and raw term counts."""
+    return (hasattr(vectorizer, "vocabulary_") and hasattr(vectorizer, "idf_")
+            and getattr(vectorizer, "use_idf", False)
+            and getattr(vectorizer, "norm", None) == "l2"
+            and not getattr(vectorizer, "sublinear_tf", True)
+            and not getattr(vectorizer, "binary", True))
@@ -0,0 +1,328 @@
+"""
+Online Intent Learning
+======================
+Incrementally teaches the intent classifier new phrasings without a full
+retrain.
+
+The online model uses hashed n-gram features (see
+train_intent_model_sparse(hashing=True)), so utterances with words the
+model has never seen still map into the same fixed input space and no
+vocabulary refit is needed. An update fine-tunes a copy of the current
+network for a few epochs on the new examples mixed with a random replay
+sample of earlier training data, which keeps it from forgetting the
+original intents. The copy is exported to a NumPy IntentEngine and then
+swapped in with a single attribute assignment, so a running process keeps
+serving the old engine until the new one is ready.
+
+The learner is saved in the cache root, not inside a content-hashed cache
+entry, so a forced retrain or a cache-key change does not delete it. It
+remembers the cache key its base model was trained for and every example
+it has learned. When intents.csv (or a hyperparameter) changes, the base
+model is retrained on the new data and the learned examples are applied
+to it again.
+
+Low-confidence turns (below main.CONFIDENCE_THRESHOLD) can be appended
+to a CSV with an empty 'intent' column; once labeled, that file is a
+valid input for an update.
+
+TensorFlow is imported lazily, so logging costs nothing in processes that
+never train.
+"""
+
+import csv
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from models.numpy_inference import ACTIVATIONS, IntentEngine, dense_forward
+
+
+# ==================== CONSTANTS ====================
+
+ONLINE_DIR_NAME = "online"  # In the cache root, next to the cache entries
+ONLINE_MODEL_FILE = "intent_model.keras"
+ONLINE_PREPROCESSORS_FILE = "preprocessors.pkl"
+ONLINE_STATE_FILE = "online_state.npz"  # Replay pool; written last, marks a complete save
+
+DEFAULT_UPDATE_EPOCHS = 10
+DEFAULT_REPLAY_RATIO = 4  # Replayed earlier examples per new example
+DEFAULT_LEARNING_RATE = 2e-3
+RETENTION_SAMPLE = 500  # Earlier examples scored to check for forgetting
+
+LOW_CONFIDENCE_FIELDS = ("timestamp", "text", "predicted_intent", "confidence", "intent")
+
+_log_lock = threading.Lock()
+
+
+# ==================== LOW-CONFIDENCE LOG ====================
+
+def log_low_confidence(path, text, predicted_intent, confidence):
+    """
+    Append one low-confidence turn to a CSV for later labeling.
+
+    The 'intent' column is left empty; fill it in and pass the file to
+    OnlineIntentLearner.update() via read_labeled_examples().
+    """
+    with _log_lock:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        new_file = not os.path.exists(path)
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(LOW_CONFIDENCE_FIELDS)
+            writer.writerow([time.strftime("%Y-%m-%dT%H:%M:%S"), text, predicted_intent,
+                             f"{confidence:.4f}", ""])
+
+
+def read_labeled_examples(csv_path):
+    """
+    Read labeled utterances from an intents.csv-style or labeled log file.
+
+    Rows whose 'intent' is empty are skipped.
+
+    Returns:
+        tuple: (list of texts, list of intent labels)
+    """
+    texts, labels = [], []
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames or "text" not in reader.fieldnames \
+                or "intent" not in reader.fieldnames:
+            raise ValueError(f"{csv_path} must contain 'text' and 'intent' columns")
+        for row in reader:
+            text, intent = (row["text"] or "").strip(), (row["intent"] or "").strip()
+            if text and intent:
+                texts.append(text)
+                labels.append(intent)
+    return texts, labels
+
+
+# ==================== LEARNER ====================
+
+class OnlineIntentLearner:
+    """
+    Hashed-feature intent model that can be updated while serving.
+
+    Usage:
+        learner, _ = OnlineIntentLearner.load_or_train("data/diabetes.csv", "data/intents.csv")
+        engine = learner.engine                     # serve this
+        stats = learner.update(["I want to jog"], ["exercise_advice"])
+        engine = learner.engine                     # swap in the update
+    """
+
+    def __init__(self, model, vectorizer, label_encoder, replay_X, replay_y, seed=42):
+        self.model = model
+        self.vectorizer = vectorizer
+        self.label_encoder = label_encoder
+        self.replay_X = replay_X.tocsr()
+        self.replay_y = np.asarray(replay_y)
+        self.updates = 0
+        self.base_key = None  # Cache key of the data the base model was trained on
+        self.learned_texts, self.learned_labels = [], []  # Every example update() was given
+
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self.engine = IntentEngine.from_keras(model, vectorizer, label_encoder)
+
+    @classmethod
+    def train(cls, csv_path, params=None):
+        """Train the hashed base model from an intents CSV (a full training run)."""
+        from models.intent_nn import load_intent_data, train_intent_model_sparse
+
+        model, vectorizer, label_encoder, _ = train_intent_model_sparse(csv_path, params,
+                                                                        hashing=True)
+        texts, labels = load_intent_data(csv_path)
+        return cls(model, vectorizer, label_encoder, vectorizer.transform(texts),
+                   label_encoder.transform(labels))
+
+    @classmethod
+    def load_or_train(cls, diabetes_path, intents_path, cache_dir=None):
+        """
+        Load the saved online model, or train it for the current artifact cache key.
+
+        It lives in <cache root>/online. If it was trained for another cache
+        key (the base data or hyperparameters changed), the base model is
+        retrained and the examples learned so far are applied to it again.
+
+        Returns:
+            tuple: (OnlineIntentLearner, directory it is saved in)
+        """
+        from models.cache import CACHE_DIR, compute_cache_key
+
+        cache_dir = cache_dir or CACHE_DIR
+        directory = os.path.join(cache_dir, ONLINE_DIR_NAME)
+        base_key = compute_cache_key(diabetes_path, intents_path)
+
+        previous = None
+        if os.path.isfile(os.path.join(directory, ONLINE_STATE_FILE)):
+            previous = cls.load(directory)
+            if previous.base_key == base_key:
+                return previous, directory
+
+        learner = cls.train(intents_path)
+        learner.base_key = base_key
+        if previous is not None and previous.learned_texts:
+            learner.relearn(previous)
+        learner.save(directory)
+        return learner, directory
+
+    def relearn(self, previous):
+        """
+        Apply the examples another learner had learned (after a base retrain).
+
+        Examples whose intent no longer exists in the training data are dropped.
+        """
+        known = set(self.label_encoder.classes_)
+        kept = [(t, label) for t, label in zip(previous.learned_texts, previous.learned_labels)
+                if label in known]
+        dropped = len(previous.learned_texts) - len(kept)
+
+        print(f"\n🔁 Base intent data changed: re-applying {len(kept)} learned examples")
+        if dropped:
+            print(f"⚠️  Dropped {dropped} learned examples whose intent no longer exists")
+        if kept:
+            texts, labels = zip(*kept)
+            self.update(list(texts), list(labels))
+
+    # ---------- updates ----------
+
+    def update(self, texts, labels, epochs=DEFAULT_UPDATE_EPOCHS,
+               replay_ratio=DEFAULT_REPLAY_RATIO, learning_rate=DEFAULT_LEARNING_RATE,
+               batch_size=8):
+        """
+        Fine-tune on new labeled utterances and hot-swap self.engine.
+
+        Args:
+            texts: New utterances
+            labels: Their intents (must be intents the model already knows)
+            epochs: Fine-tuning passes over new + replayed examples
+            replay_ratio: Earlier examples replayed per new example
+            learning_rate: Adam learning rate for fine-tuning
+            batch_size: Fine-tuning batch size
+
+        Returns:
+            dict: Example counts, timing, and accuracy before/after on the new
+                  examples and on a sample of earlier examples
+        """
+        import keras
+        from scipy.sparse import vstack
+        from models.sparse_batches import SparseBatches
+
+        texts, labels = list(texts), [str(label) for label in labels]
+        if not texts or len(texts) != len(labels):
+            raise ValueError("update() needs the same, non-zero number of texts and labels")
+
+        unknown = sorted(set(labels) - set(self.label_encoder.classes_))
+        if unknown:
+            raise ValueError(f"Unknown intents (retrain to add new ones): {', '.join(unknown)}")
+
+        with self._lock:
+            start = time.perf_counter()
+            X_new = self.vectorizer.transform(texts)
+            y_new = self.label_encoder.transform(labels)
+
+            n_old = len(self.replay_y)
+            replay = self._rng.choice(n_old, min(n_old, replay_ratio * len(texts)), replace=False)
+            retention = self._rng.choice(n_old, min(n_old, RETENTION_SAMPLE), replace=False)
+
+            before_new = self._accuracy(self.engine, texts, y_new)
+            before_old = self._replay_accuracy(self.engine, retention)
+
+            # Fine-tune a copy so the serving model is never half-updated
+            candidate = keras.models.clone_model(self.model)
+            candidate.set_weights(self.model.get_weights())
+            candidate.compile(loss="sparse_categorical_crossentropy",
+                              optimizer=keras.optimizers.Adam(learning_rate),
+                              metrics=["accuracy"])
+            candidate.fit(SparseBatches(vstack([X_new, self.replay_X[replay]]),
+                                        np.concatenate([y_new, self.replay_y[replay]]),
+                                        batch_size, shuffle=True),
+                          epochs=epochs, verbose=0)
+            engine = IntentEngine.from_keras(candidate, self.vectorizer, self.label_encoder)
+
+            stats = {
+                "examples": len(texts),
+                "replayed": len(replay),
+                "epochs": epochs,
+                "new_accuracy_before": before_new,
+                "new_accuracy_after": self._accuracy(engine, texts, y_new),
+                "replay_accuracy_before": before_old,
+                "replay_accuracy_after": self._replay_accuracy(engine, retention),
+            }
+
+            # Swap in the new model and keep the examples for future replay
+            self.model, self.engine = candidate, engine
+            self.replay_X = vstack([self.replay_X, X_new]).tocsr()
+            self.replay_y = np.concatenate([self.replay_y, y_new])
+            self.learned_texts += texts
+            self.learned_labels += labels
+            self.updates += 1
+
+            stats["seconds"] = time.perf_counter() - start
+            return stats
+
+    def _accuracy(self, engine, texts, y):
+        probs = engine.predict_proba(texts)
+        return float((probs.argmax(axis=1) == y).mean())
+
+    def _replay_accuracy(self, engine, rows):
+        """Accuracy on already-vectorized replay rows."""
+        if not len(rows):
+            return 0.0
+        x = ACTIVATIONS[engine.activations[0]](self.replay_X[rows] @ engine.weights[0]
+                                               + engine.biases[0])
+        x = dense_forward(x, engine.weights[1:], engine.biases[1:], engine.activations[1:])
+        return float((x.argmax(axis=1) == self.replay_y[rows]).mean())
+
+    # ---------- persistence ----------
+
+    def save(self, directory):
+        """Write model, preprocessors and replay pool (staged, then renamed)."""
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        staging_dir = tempfile.mkdtemp(prefix=".online-", dir=parent)
+        try:
+            self.model.save(os.path.join(staging_dir, ONLINE_MODEL_FILE))
+            with open(os.path.join(staging_dir, ONLINE_PREPROCESSORS_FILE), "wb") as f:
+                pickle.dump({"vectorizer": self.vectorizer, "label_encoder": self.label_encoder},
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            X = self.replay_X
+            np.savez(os.path.join(staging_dir, ONLINE_STATE_FILE),
+                     replay_data=X.data, replay_indices=X.indices, replay_indptr=X.indptr,
+                     replay_shape=np.asarray(X.shape), replay_y=self.replay_y,
+                     updates=np.asarray(self.updates), base_key=np.asarray(self.base_key or ""),
+                     learned_texts=np.asarray(self.learned_texts, dtype=str),
+                     learned_labels=np.asarray(self.learned_labels, dtype=str))
+            shutil.rmtree(directory, ignore_errors=True)
+            os.replace(staging_dir, directory)
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+        return directory
+
+    @classmethod
+    def load(cls, directory):
+        """Load a learner written by save()."""
+        from keras.models import load_model
+        from scipy.sparse import csr_matrix
+
+        with open(os.path.join(directory, ONLINE_PREPROCESSORS_FILE), "rb") as f:
+            preprocessors = pickle.load(f)
+
+        with np.load(os.path.join(directory, ONLINE_STATE_FILE)) as state:
+            replay_X = csr_matrix((state["replay_data"], state["replay_indices"],
+                                   state["replay_indptr"]), shape=tuple(state["replay_shape"]))
+            learner = cls(load_model(os.path.join(directory, ONLINE_MODEL_FILE)),
+                          preprocessors["vectorizer"], preprocessors["label_encoder"],
+                          replay_X, state["replay_y"])
+            learner.updates = int(state["updates"])
+            learner.base_key = str(state["base_key"]) or None
+            learner.learned_texts = state["learned_texts"].tolist()
+            learner.learned_labels = state["learned_labels"].tolist()
+        return learner
@@ -0,0 +1,148 @@
+"""
+Parallel Model Training
+=======================
+Trains the diabetes and intent models at the same time in two worker
+processes, so a cold start takes roughly as long as the slower job
+instead of the sum of both.
+
+Each worker is a fresh (spawned) process that caps TensorFlow's thread
+pools before TensorFlow is imported, splitting the machine's cores between
+the two jobs instead of letting both grab every core. Keras models are not
+picklable, so workers save them as .keras files in a temporary directory;
+preprocessors and training histories come back to the parent pickled.
+"""
+
+import contextlib
+import io
+import multiprocessing
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+# ==================== CONSTANTS ====================
+
+INTEROP_THREADS = 2  # Per worker; these models have little inter-op parallelism
+
+
+# ==================== WORKER SIDE ====================
+
+def limit_threads(intra_op_threads, inter_op_threads):
+    """Worker initializer: cap TensorFlow and BLAS threads before TF loads."""
+    for var in ("TF_NUM_INTRAOP_THREADS", "OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS",
+                "MKL_NUM_THREADS"):
+        os.environ[var] = str(intra_op_threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = str(inter_op_threads)
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+
+
+def _train_job(job, csv_path, out_dir, streaming=False, sparse_intent=False):
+    """
+    Train one model inside a worker process.
+
+    Args:
+        job: 'diabetes' or 'intent'
+        csv_path: Training CSV
+        out_dir: Directory for the saved .keras model and pickled extras
+        streaming: Train the diabetes model with train_diabetes_model_streaming()
+        sparse_intent: Train the intent model with train_intent_model_sparse()
+
+    Returns:
+        dict: {'job', 'model_path', 'extras_path', 'seconds'}
+    """
+    start = time.perf_counter()
+
+    # Progress bars from two processes would interleave; keep them quiet
+    with contextlib.redirect_stdout(io.StringIO()):
+        if job == "diabetes":
+            from models.diabetes_nn import train_diabetes_model, train_diabetes_model_streaming
+            train = train_diabetes_model_streaming if streaming else train_diabetes_model
+            model, scaler, history = train(csv_path)
+            extras = {"scaler": scaler}
+        elif job == "intent":
+            from models.intent_nn import train_intent_model, train_intent_model_sparse
+            train = train_intent_model_sparse if sparse_intent else train_intent_model
+            model, vectorizer, label_encoder, history = train(csv_path)
+            extras = {"vectorizer": vectorizer, "label_encoder": label_encoder}
+        else:
+            raise ValueError(f"Unknown training job: {job}")
+
+    model_path = os.path.join(out_dir, f"{job}_model.keras")
+    extras_path = os.path.join(out_dir, f"{job}_extras.pkl")
+    model.save(model_path)
+    extras["history"] = {name: [float(v) for v in values]
+                         for name, values in history.history.items()}
+    with open(extras_path, "wb") as f:
+        pickle.dump(extras, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    return {"job": job, "model_path": model_path, "extras_path": extras_path,
+            "seconds": time.perf_counter() - start}
+
+
+# ==================== PARENT SIDE ====================
+
+def default_thread_split(jobs=2):
+    """Intra-op threads per worker so that all workers together fill the CPU."""
+    return max(1, (os.cpu_count() or 1) // jobs)
+
+
+def train_models_parallel(diabetes_path, intents_path, threads_per_worker=None,
+                          streaming=False, sparse_intent=False):
+    """
+    Train both models concurrently in two spawned worker processes.
+
+    Args:
+        diabetes_path: Path to the diabetes CSV
+        intents_path: Path to the intents CSV
+        threads_per_worker: TensorFlow intra-op threads per worker
+                            (default: half the CPU count, at least 1)
+        streaming: Train the diabetes model from a chunked tf.data pipeline
+        sparse_intent: Train the intent model on the sparse TF-IDF matrix
+
+    Returns:
+        dict: Same model/preprocessor/history keys as load_or_train_models()
+              produces after training, plus 'train_seconds' per job
+    """
+    from keras.models import load_model
+    from models.cache import CachedHistory
+
+    threads = threads_per_worker or default_thread_split()
+    out_dir = tempfile.mkdtemp(prefix="parallel-train-")
+
+    try:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=2, mp_context=context,
+                                 initializer=limit_threads,
+                                 initargs=(threads, INTEROP_THREADS)) as pool:
+            futures = {
+                "diabetes": pool.submit(_train_job, "diabetes", diabetes_path, out_dir,
+                                         streaming),
+                "intent": pool.submit(_train_job, "intent", intents_path, out_dir,
+                                       sparse_intent=sparse_intent),
+            }
+            results = {job: future.result() for job, future in futures.items()}
+
+        extras = {}
+        for job, result in results.items():
+            with open(result["extras_path"], "rb") as f:
+                extras[job] = pickle.load(f)
+
+        return {
+            "diabetes_model": load_model(results["diabetes"]["model_path"]),
+            "scaler": extras["diabetes"]["scaler"],
+            "diabetes_history": CachedHistory(extras["diabetes"]["history"]),
+            "intent_model": load_model(results["intent"]["model_path"]),
+            "vectorizer": extras["intent"]["vectorizer"],
+            "label_encoder": extras["intent"]["label_encoder"],
+            "intent_history": CachedHistory(extras["intent"]["history"]),
+            "train_seconds": {job: result["seconds"] for job, result in results.items()},
+        }
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
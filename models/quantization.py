@@ -0,0 +1,241 @@
+"""
+Reduced-Precision Weights
+=========================
+float16 and per-channel int8 versions of the Dense kernels used by the
+NumPy inference engines, dequantized on the fly during the forward pass.
+
+    float16: kernel stored as float16 (half the float32 size)
+    int8:    kernel stored as int8 with one float scale per input row and
+             one per output unit, W[i, j] ~= row_scale[i] * q[i, j] * scale[j]
+             (about a quarter of the float32 size)
+
+The row scale matters for the diabetes model: the StandardScaler is folded
+into its first kernel, so rows differ in magnitude by ~400x and a
+per-column scale alone rounds the small rows to zero (risk labels agreed
+on only 89% of patients). Both scales factor out of the matrix product,
+so x @ W is computed as ((x * row_scale) @ q) * scale. The product walks
+the stored kernel in blocks of rows, converting one block at a time, so
+no full-size float copy of the kernel is built per call. Biases stay in full precision;
+they are tiny.
+
+evaluate_quantization() reports the accuracy change on each model's
+validation split and how often the 0.4/0.7 risk labels still agree with
+the full-precision engine.
+"""
+
+import copy
+import math
+
+import numpy as np
+
+from models.risk import risk_codes
+
+
+# ==================== CONSTANTS ====================
+
+PRECISIONS = ("float64", "float16", "int8")
+INT8_MAX = 127
+MATMUL_BLOCK_ELEMENTS = 1 << 16  # Kernel elements converted per block in x @ kernel
+
+
+# ==================== QUANTIZED TENSOR ====================
+
+class QuantizedTensor:
+    """
+    A 2D kernel stored in reduced precision.
+
+    Supports what the engines do with kernels: x @ kernel, row gathering
+    (kernel[indices]) and .shape. Anything else goes through __array__(),
+    which returns the dequantized float64 kernel.
+    """
+
+    # Make ndarray @ QuantizedTensor defer to __rmatmul__ instead of converting
+    __array_ufunc__ = None
+
+    def __init__(self, values, scale=None, row_scale=None):
+        self.values = values        # float16 or int8
+        self.scale = scale          # int8: per-column float scale, else None
+        self.row_scale = row_scale  # int8: per-row float scale, else None
+
+    @classmethod
+    def quantize(cls, kernel, precision):
+        """
+        Quantize a float kernel.
+
+        Args:
+            kernel: 2D float array of shape (inputs, units)
+            precision: 'float16' or 'int8'
+
+        Returns:
+            QuantizedTensor
+        """
+        kernel = np.asarray(kernel, dtype=np.float64)
+        if precision == "float16":
+            return cls(kernel.astype(np.float16))
+        if precision == "int8":
+            row_scale = np.abs(kernel).max(axis=1)
+            row_scale[row_scale == 0] = 1.0
+            kernel = kernel / row_scale[:, None]
+            scale = np.abs(kernel).max(axis=0) / INT8_MAX
+            scale[scale == 0] = 1.0
+            values = np.clip(np.rint(kernel / scale), -INT8_MAX, INT8_MAX).astype(np.int8)
+            return cls(values, scale.astype(np.float32), row_scale.astype(np.float32))
+        raise ValueError(f"Unsupported precision: {precision} (use float16 or int8)")
+
+    @property
+    def precision(self):
+        return "int8" if self.scale is not None else "float16"
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def nbytes(self):
+        if self.scale is None:
+            return self.values.nbytes
+        return self.values.nbytes + self.scale.nbytes + self.row_scale.nbytes
+
+    def dequantize(self):
+        values = self.values.astype(np.float64)
+        if self.scale is None:
+            return values
+        return self.row_scale[:, None] * values * self.scale
+
+    def __array__(self, dtype=None, copy=None):
+        values = self.dequantize()
+        return values.astype(dtype) if dtype is not None else values
+
+    def __rmatmul__(self, x):
+        x = np.asarray(x)
+        if self.row_scale is not None:
+            x = x * self.row_scale
+
+        # Accumulate x[..., block] @ kernel[block] over row blocks; only one
+        # block is ever held in float
+        rows, units = self.values.shape
+        block_rows = max(1, MATMUL_BLOCK_ELEMENTS // max(units, 1))
+        dtype = np.result_type(x.dtype, np.float32)
+        out = x[..., :block_rows] @ self.values[:block_rows].astype(dtype)
+        for start in range(block_rows, rows, block_rows):
+            stop = start + block_rows
+            out += x[..., start:stop] @ self.values[start:stop].astype(dtype)
+
+        if self.scale is not None:
+            out *= self.scale
+        return out
+
+    def __getitem__(self, rows):
+        row_scale = self.row_scale[rows] if self.row_scale is not None else None
+        return QuantizedTensor(self.values[rows], self.scale, row_scale)
+
+
+# ==================== ENGINES ====================
+
+def quantize_engine(engine, precision):
+    """
+    Copy of a DiabetesRiskEngine or IntentEngine with quantized kernels.
+
+    Args:
+        engine: Full-precision engine
+        precision: 'float16', 'int8' or 'float64' (returns the engine as is)
+
+    Returns:
+        Engine of the same class
+    """
+    if precision == "float64":
+        return engine
+
+    quantized = copy.copy(engine)
+    quantized.weights = [QuantizedTensor.quantize(k, precision) for k in engine.weights]
+
+    # IntentEngine gathers rows of the IDF-folded first kernel directly
+    if getattr(engine, "_idf_kernel", None) is not None:
+        quantized._idf_kernel = QuantizedTensor.quantize(engine._idf_kernel, precision)
+    return quantized
+
+
+def kernel_bytes(engine):
+    """Bytes used by an engine's kernels as stored."""
+    return int(sum(np.asarray(k).nbytes if isinstance(k, np.ndarray) else k.nbytes
+                   for k in engine.weights))
+
+
+# ==================== EVALUATION ====================
+
+def evaluate_quantization(risk_engine, intent_engine, diabetes_path, intents_path,
+                          precisions=("float16", "int8")):
+    """
+    Compare quantized engines with the full-precision ones.
+
+    The diabetes validation split is the last validation_split fraction of
+    rows (as in training); the intent split is the stratified
+    train_test_split used by train_intent_model().
+
+    Args:
+        risk_engine: Full-precision DiabetesRiskEngine
+        intent_engine: Full-precision IntentEngine
+        diabetes_path: Path to the diabetes CSV
+        intents_path: Path to the intents CSV
+        precisions: Precisions to evaluate
+
+    Returns:
+        dict: precision -> {'diabetes': {...}, 'intent': {...}}, plus
+              'float64' with the baseline accuracies and kernel sizes
+    """
+    from sklearn.model_selection import train_test_split
+    from models.diabetes_nn import DIABETES_PARAMS, load_diabetes_data
+    from models.intent_nn import INTENT_PARAMS, load_intent_data
+
+    X, y = load_diabetes_data(diabetes_path)
+    split = int(math.floor(len(X) * (1.0 - DIABETES_PARAMS["validation_split"])))
+    X_val, y_val = X[split:], y[split:]
+
+    texts, labels = load_intent_data(intents_path)
+    _, texts_val, _, labels_val = train_test_split(
+        texts.tolist(), labels.tolist(), test_size=INTENT_PARAMS["test_size"],
+        random_state=42, stratify=labels)
+
+    base_probs = risk_engine.predict_proba(X)
+    base_codes = risk_codes(base_probs)
+    base_intents, _ = intent_engine.predict(texts_val)
+    base_risk_acc = float(((base_probs[split:] >= 0.5) == y_val).mean())
+    base_intent_acc = float(np.mean(np.asarray(base_intents) == np.asarray(labels_val)))
+
+    # Keras trains in float32; the engines hold the same values as float64
+    report = {"float64": {
+        "diabetes": {"val_accuracy": base_risk_acc,
+                     "kernel_bytes": kernel_bytes(risk_engine),
+                     "float32_kernel_bytes": kernel_bytes(risk_engine) // 2},
+        "intent": {"val_accuracy": base_intent_acc,
+                   "kernel_bytes": kernel_bytes(intent_engine),
+                   "float32_kernel_bytes": kernel_bytes(intent_engine) // 2},
+    }}
+
+    for precision in precisions:
+        q_risk = quantize_engine(risk_engine, precision)
+        q_intent = quantize_engine(intent_engine, precision)
+
+        probs = q_risk.predict_proba(X)
+        intents, _ = q_intent.predict(texts_val)
+        risk_acc = float(((probs[split:] >= 0.5) == y_val).mean())
+        intent_acc = float(np.mean(np.asarray(intents) == np.asarray(labels_val)))
+
+        report[precision] = {
+            "diabetes": {
+                "val_accuracy": risk_acc,
+                "accuracy_delta": risk_acc - base_risk_acc,
+                "risk_label_agreement": float((risk_codes(probs) == base_codes).mean()),
+                "max_probability_error": float(np.abs(probs - base_probs).max()),
+                "kernel_bytes": kernel_bytes(q_risk),
+            },
+            "intent": {
+                "val_accuracy": intent_acc,
+                "accuracy_delta": intent_acc - base_intent_acc,
+                "prediction_agreement": float(np.mean(np.asarray(intents)
+                                                      == np.asarray(base_intents))),
+                "kernel_bytes": kernel_bytes(q_intent),
+            },
+        }
+
+    return report
@@ -0,0 +1,64 @@
+"""
+Risk Thresholds
+===============
+Maps diabetes probabilities to risk labels. Kept free of TensorFlow and
+scikit-learn so serving code can classify risk without loading either.
+"""
+
+import numpy as np
+
+
+# ==================== CONSTANTS ====================
+
+HIGH_RISK_THRESHOLD = 0.7
+MEDIUM_RISK_THRESHOLD = 0.4
+
+RISK_LEVELS = ("low", "medium", "high")
+
+
+# ==================== CLASSIFICATION ====================
+
+def risk_from_probability(prob):
+    """
+    Convert a single diabetes probability into a risk label.
+
+    Args:
+        prob: Probability of diabetes (0-1)
+
+    Returns:
+        str: 'high', 'medium', or 'low'
+    """
+    if prob > HIGH_RISK_THRESHOLD:
+        return "high"
+    elif prob > MEDIUM_RISK_THRESHOLD:
+        return "medium"
+    else:
+        return "low"
+
+
+def risk_labels(probs):
+    """
+    Vectorized risk_from_probability() over an array of probabilities.
+
+    Args:
+        probs: Array-like of probabilities
+
+    Returns:
+        numpy.ndarray: Array of 'high'/'medium'/'low' labels
+    """
+    return np.asarray(RISK_LEVELS)[risk_codes(probs)]
+
+
+def risk_codes(probs):
+    """
+    Integer risk codes (0=low, 1=medium, 2=high) indexing RISK_LEVELS.
+
+    Args:
+        probs: Array-like of probabilities
+
+    Returns:
+        numpy.ndarray: int8 array of risk codes
+    """
+    probs = np.asarray(probs)
+    return ((probs > MEDIUM_RISK_THRESHOLD).astype(np.int8)
+            + (probs > HIGH_RISK_THRESHOLD).astype(np.int8))
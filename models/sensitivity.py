@@ -0,0 +1,186 @@
+"""
+Risk Sensitivity Surfaces
+=========================
+Shows how one patient's diabetes probability changes as two features
+(any pair from FEATURE_MAP, e.g. Glucose and BMI) vary over a range,
+with every other feature held at the patient's value.
+
+The whole grid is built as one (ny * nx) x 8 matrix and scored in
+chunked forward passes of the NumPy risk engine, instead of one model
+call per grid point. The 0.4 and 0.7 risk contours are then traced on
+the probability grid with marching squares and returned as line
+segments in feature units (ready for a matplotlib LineCollection).
+"""
+
+import time
+
+import numpy as np
+
+from models.risk import HIGH_RISK_THRESHOLD, MEDIUM_RISK_THRESHOLD
+from models.simulator import FEATURE_MAP
+
+
+# ==================== CONSTANTS ====================
+
+DEFAULT_RESOLUTION = 200
+DEFAULT_CHUNKSIZE = 16_384  # Grid rows per forward pass
+RISK_CONTOUR_LEVELS = (MEDIUM_RISK_THRESHOLD, HIGH_RISK_THRESHOLD)
+
+# Default axis ranges (roughly the span of data/diabetes.csv)
+FEATURE_RANGES = {
+    "Pregnancies": (0.0, 17.0),
+    "Glucose": (40.0, 250.0),
+    "BloodPressure": (30.0, 130.0),
+    "SkinThickness": (0.0, 100.0),
+    "Insulin": (0.0, 850.0),
+    "BMI": (15.0, 67.0),
+    "DiabetesPedigreeFunction": (0.05, 2.5),
+    "Age": (21.0, 81.0),
+}
+
+# Marching-squares segments per cell case, as pairs of cell edges.
+# Corners: 0 = (x0, y0), 1 = (x1, y0), 2 = (x1, y1), 3 = (x0, y1); bit k of
+# the case is set when corner k is above the level. Edges: 0 = bottom (0-1),
+# 1 = right (1-2), 2 = top (3-2), 3 = left (0-3). Saddles 5 and 10 are
+# resolved separately using the cell centre.
+_CASE_SEGMENTS = {
+    1: [(3, 0)], 2: [(0, 1)], 3: [(3, 1)], 4: [(1, 2)], 6: [(0, 2)], 7: [(3, 2)],
+    8: [(3, 2)], 9: [(0, 2)], 11: [(1, 2)], 12: [(3, 1)], 13: [(0, 1)], 14: [(3, 0)],
+}
+_SADDLE_SEGMENTS = {
+    # case: (segments if the centre is above the level, segments if below)
+    5: ([(0, 1), (2, 3)], [(3, 0), (1, 2)]),
+    10: ([(3, 0), (1, 2)], [(0, 1), (2, 3)]),
+}
+
+
+# ==================== SURFACE ====================
+
+def risk_surface(risk_engine, patient, x_feature="Glucose", y_feature="BMI", x_range=None,
+                 y_range=None, resolution=DEFAULT_RESOLUTION, levels=RISK_CONTOUR_LEVELS,
+                 chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Probability grid over two features, plus its risk contours.
+
+    Args:
+        risk_engine: DiabetesRiskEngine (anything with predict_proba(N x 8))
+        patient: 1 x 8 patient array; the other six features stay fixed
+        x_feature: FEATURE_MAP name varied along the x axis (columns)
+        y_feature: FEATURE_MAP name varied along the y axis (rows)
+        x_range: (low, high) for x (default: FEATURE_RANGES)
+        y_range: (low, high) for y (default: FEATURE_RANGES)
+        resolution: Points per axis, an int or (nx, ny)
+        levels: Probabilities to trace contours at
+        chunksize: Grid rows per forward pass
+
+    Returns:
+        dict: 'x_feature', 'y_feature', 'x' (nx,), 'y' (ny,),
+              'probabilities' (ny x nx), 'contours' (level -> k x 2 x 2
+              array of segment endpoints in feature units),
+              'patient_point' (x, y), 'patient_probability', 'seconds'
+    """
+    start = time.perf_counter()
+
+    for feature in (x_feature, y_feature):
+        if feature not in FEATURE_MAP:
+            raise ValueError(f"Unknown feature: {feature} (use one of {', '.join(FEATURE_MAP)})")
+    if x_feature == y_feature:
+        raise ValueError("x_feature and y_feature must differ")
+
+    nx, ny = (resolution, resolution) if np.isscalar(resolution) else resolution
+    if nx < 2 or ny < 2:
+        raise ValueError("resolution must be at least 2 points per axis")
+
+    x_low, x_high = x_range or FEATURE_RANGES[x_feature]
+    y_low, y_high = y_range or FEATURE_RANGES[y_feature]
+    if not np.isfinite([x_low, x_high, y_low, y_high]).all():
+        raise ValueError("Range bounds must be finite")
+    if not (x_low < x_high and y_low < y_high):
+        raise ValueError("Ranges must be (low, high) with low < high")
+
+    patient = np.asarray(patient, dtype=np.float64).reshape(1, -1)
+    xs = np.linspace(x_low, x_high, nx)
+    ys = np.linspace(y_low, y_high, ny)
+
+    # Row r of the grid matrix is the point (xs[r % nx], ys[r // nx])
+    grid = np.repeat(patient, nx * ny, axis=0)
+    grid[:, FEATURE_MAP[x_feature]] = np.tile(xs, ny)
+    grid[:, FEATURE_MAP[y_feature]] = np.repeat(ys, nx)
+
+    probs = np.empty(nx * ny)
+    for lo in range(0, len(grid), chunksize):
+        probs[lo:lo + chunksize] = risk_engine.predict_proba(grid[lo:lo + chunksize])
+    probs = probs.reshape(ny, nx)
+
+    return {
+        "x_feature": x_feature,
+        "y_feature": y_feature,
+        "x": xs,
+        "y": ys,
+        "probabilities": probs,
+        "contours": {level: marching_squares(xs, ys, probs, level) for level in levels},
+        "patient_point": (float(patient[0, FEATURE_MAP[x_feature]]),
+                          float(patient[0, FEATURE_MAP[y_feature]])),
+        "patient_probability": float(risk_engine.predict_proba(patient)[0]),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+# ==================== CONTOURS ====================
+
+def marching_squares(xs, ys, values, level):
+    """
+    Iso-line of a grid at one level, as line segments.
+
+    Args:
+        xs: Grid x coordinates (nx,)
+        ys: Grid y coordinates (ny,)
+        values: ny x nx grid
+        level: Contour level
+
+    Returns:
+        numpy.ndarray: k x 2 x 2 array of segments [[x0, y0], [x1, y1]]
+    """
+    v0, v1 = values[:-1, :-1], values[:-1, 1:]
+    v2, v3 = values[1:, 1:], values[1:, :-1]
+    cases = ((v0 > level) * 1 + (v1 > level) * 2 + (v2 > level) * 4 + (v3 > level) * 8)
+
+    # Crossing point on each cell edge (only meaningful where the edge is crossed)
+    x0, x1 = np.broadcast_to(xs[:-1], cases.shape), np.broadcast_to(xs[1:], cases.shape)
+    y0, y1 = np.broadcast_to(ys[:-1, None], cases.shape), np.broadcast_to(ys[1:, None], cases.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_bottom = (level - v0) / (v1 - v0)
+        t_right = (level - v1) / (v2 - v1)
+        t_top = (level - v3) / (v2 - v3)
+        t_left = (level - v0) / (v3 - v0)
+    edges = (
+        (x0 + t_bottom * (x1 - x0), y0),   # bottom
+        (x1, y0 + t_right * (y1 - y0)),    # right
+        (x0 + t_top * (x1 - x0), y1),      # top
+        (x0, y0 + t_left * (y1 - y0)),     # left
+    )
+
+    segments = []
+
+    def emit(mask, pairs):
+        for a, b in pairs:
+            segments.append(np.stack([
+                np.column_stack([edges[a][0][mask], edges[a][1][mask]]),
+                np.column_stack([edges[b][0][mask], edges[b][1][mask]]),
+            ], axis=1))
+
+    for case, pairs in _CASE_SEGMENTS.items():
+        mask = cases == case
+        if mask.any():
+            emit(mask, pairs)
+
+    centre_above = (v0 + v1 + v2 + v3) / 4 > level
+    for case, (above, below) in _SADDLE_SEGMENTS.items():
+        mask = cases == case
+        if mask.any():
+            emit(mask & centre_above, above)
+            emit(mask & ~centre_above, below)
+
+    if not segments:
+        return np.empty((0, 2, 2))
+    return np.concatenate(segments)
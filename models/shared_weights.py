@@ -0,0 +1,326 @@
+"""
+Shared Memory-Mapped Weights
+============================
+Exports the NumPy inference engines to plain .npy files so many serving
+processes can memory-map one copy read-only. The pages live in the OS page
+cache and are shared by every worker, so an extra worker only pays for its
+own interpreter state, not for another copy of the models.
+
+The export holds:
+    - diabetes Dense kernels/biases (scaler already fused in) plus the
+      scaler mean and scale
+    - intent Dense kernels/biases with the IDF weights folded into the
+      first kernel, the IDF vector, the sorted vocabulary, stop words
+      and class labels
+    - manifest.json with activations, analyzer settings and precision
+
+Kernels can be exported as float16 or per-channel int8 (see
+models/quantization.py); int8 kernels get companion *_scale.npy and
+*_row_scale.npy files.
+
+Loading needs neither TensorFlow nor scikit-learn: MappedIntentEngine
+tokenizes with TermAnalyzer (a re-implementation of the TfidfVectorizer
+word analyzer) and finds terms by binary search in the mapped vocabulary.
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import numpy as np
+
+from models.numpy_inference import DiabetesRiskEngine, IntentEngine
+from models.quantization import PRECISIONS, QuantizedTensor
+
+
+# ==================== CONSTANTS ====================
+
+SHARED_DIR_NAME = "shared"  # Inside a cache entry directory
+SHARED_MANIFEST_FILE = "manifest.json"
+SHARED_FORMAT_VERSION = 2
+
+
+# ==================== ANALYZER ====================
+
+class TermAnalyzer:
+    """
+    Word n-gram analyzer matching TfidfVectorizer(analyzer="word").
+
+    Lowercases, extracts tokens with token_pattern, drops stop words and
+    joins consecutive tokens into n-grams with single spaces.
+    """
+
+    def __init__(self, token_pattern, ngram_range=(1, 1), stop_words=(), lowercase=True):
+        self.token_pattern = re.compile(token_pattern)
+        self.ngram_range = tuple(ngram_range)
+        self.stop_words = frozenset(stop_words)
+        self.lowercase = lowercase
+
+    def __call__(self, text):
+        if self.lowercase:
+            text = text.lower()
+        tokens = [t for t in self.token_pattern.findall(text) if t not in self.stop_words]
+
+        min_n, max_n = self.ngram_range
+        terms = tokens if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+            terms = terms + [" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1)]
+        return terms
+
+
+# ==================== MAPPED INTENT ENGINE ====================
+
+class MappedIntentEngine(IntentEngine):
+    """
+    IntentEngine backed by memory-mapped arrays instead of a vectorizer.
+
+    Vocabulary terms are stored sorted, with the IDF vector and the first
+    kernel rows in the same order, so a term's row index is its position
+    found by np.searchsorted().
+    """
+
+    def __init__(self, weights, biases, activations, analyzer, terms, idf, classes):
+        self.weights = weights
+        self.biases = biases
+        self.activations = activations
+        self.vectorizer = None
+        self.classes = np.asarray(classes)
+
+        self._analyzer = analyzer
+        self._terms = terms
+        self._idf = idf
+        self._idf_kernel = weights[0]  # IDF already folded in at export
+
+    def first_layer(self, sentences):
+        hidden = np.zeros((len(sentences), self._idf_kernel.shape[1]))
+        last = len(self._terms) - 1
+
+        for row, sentence in enumerate(sentences):
+            terms = self._analyzer(sentence)
+            if not terms:
+                continue
+
+            terms = np.asarray(terms)
+            positions = np.minimum(np.searchsorted(self._terms, terms), last)
+            positions = positions[self._terms[positions] == terms]
+            if not len(positions):
+                continue
+
+            indices, tf = np.unique(positions, return_counts=True)
+            weighted = tf * self._idf[indices]
+            hidden[row] = (tf @ self._idf_kernel[indices]) / np.sqrt(weighted @ weighted)
+
+        return hidden + self.biases[0]
+
+
+# ==================== EXPORT ====================
+
+def export_shared_weights(risk_engine, intent_engine, directory, cache_key=None,
+                          precision="float64"):
+    """
+    Write both engines as .npy files plus a manifest.
+
+    The export is staged in a temporary directory and renamed into place,
+    so workers never map a partially written set of files.
+
+    Args:
+        risk_engine: DiabetesRiskEngine
+        intent_engine: IntentEngine built from a fitted TfidfVectorizer
+        directory: Target directory (replaced if it exists)
+        cache_key: Artifact cache key recorded in the manifest
+        precision: Kernel storage: 'float64', 'float16' or 'int8'
+
+    Returns:
+        str: directory
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unsupported precision: {precision} (use one of {', '.join(PRECISIONS)})")
+
+    vectorizer = intent_engine.vectorizer
+    _check_exportable_vectorizer(vectorizer)
+
+    # Reorder vocabulary-indexed arrays by term so lookups can bisect
+    vocabulary = vectorizer.vocabulary_
+    terms = np.array(sorted(vocabulary))
+    order = np.array([vocabulary[t] for t in terms], dtype=np.intp)
+    idf = np.asarray(vectorizer.idf_, dtype=np.float64)[order]
+
+    arrays = {
+        "risk_mean": risk_engine.mean,
+        "risk_scale": risk_engine.scale,
+        "intent_terms": terms,
+        "intent_idf": idf,
+        "intent_classes": np.asarray(intent_engine.classes).astype(str),
+        "intent_stop_words": np.array(sorted(vectorizer.get_stop_words() or ()), dtype=str),
+    }
+    def add_kernel(name, kernel):
+        if precision == "float64":
+            arrays[name] = kernel
+            return
+        quantized = QuantizedTensor.quantize(kernel, precision)
+        arrays[name] = quantized.values
+        if quantized.scale is not None:
+            arrays[f"{name}_scale"] = quantized.scale
+            arrays[f"{name}_row_scale"] = quantized.row_scale
+
+    for i, (kernel, bias) in enumerate(zip(risk_engine.weights, risk_engine.biases)):
+        add_kernel(f"risk_kernel_{i}", kernel)
+        arrays[f"risk_bias_{i}"] = bias
+    for i, (kernel, bias) in enumerate(zip(intent_engine.weights, intent_engine.biases)):
+        add_kernel(f"intent_kernel_{i}", idf[:, None] * kernel[order] if i == 0 else kernel)
+        arrays[f"intent_bias_{i}"] = bias
+
+    manifest = {
+        "format": SHARED_FORMAT_VERSION,
+        "cache_key": cache_key,
+        "precision": precision,
+        "risk_activations": list(risk_engine.activations),
+        "intent_activations": list(intent_engine.activations),
+        "token_pattern": vectorizer.token_pattern,
+        "ngram_range": list(vectorizer.ngram_range),
+        "lowercase": bool(vectorizer.lowercase),
+    }
+
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(prefix=".shared-", dir=parent)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(staging_dir, f"{name}.npy"),
+                    np.ascontiguousarray(array), allow_pickle=False)
+
+        # Manifest is written last and marks the export as complete
+        with open(os.path.join(staging_dir, SHARED_MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(staging_dir, directory)
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    return directory
+
+
+def _check_exportable_vectorizer(vectorizer):
+    """Raise ValueError unless TermAnalyzer reproduces the vectorizer exactly."""
+    problems = []
+    if not (hasattr(vectorizer, "vocabulary_") and hasattr(vectorizer, "idf_")):
+        problems.append("a fitted TfidfVectorizer is required")
+    else:
+        if vectorizer.analyzer != "word":
+            problems.append(f"analyzer={vectorizer.analyzer!r}")
+        if vectorizer.tokenizer is not None or vectorizer.preprocessor is not None:
+            problems.append("custom tokenizer/preprocessor")
+        if vectorizer.strip_accents is not None:
+            problems.append(f"strip_accents={vectorizer.strip_accents!r}")
+        if vectorizer.norm != "l2" or vectorizer.sublinear_tf or vectorizer.binary:
+            problems.append("only l2-normalized raw term counts are supported")
+    if problems:
+        raise ValueError(f"Cannot export intent vectorizer: {'; '.join(problems)}")
+
+
+# ==================== LOAD ====================
+
+def load_shared_engines(directory, mmap_mode="r"):
+    """
+    Memory-map an export written by export_shared_weights().
+
+    Args:
+        directory: Export directory
+        mmap_mode: np.load() mmap mode ('r' maps read-only; None loads copies)
+
+    Returns:
+        tuple: (DiabetesRiskEngine, MappedIntentEngine)
+    """
+    manifest_path = os.path.join(directory, SHARED_MANIFEST_FILE)
+    if not os.path.isfile(manifest_path):
+        raise ValueError(f"No shared weights export at {directory}")
+
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SHARED_FORMAT_VERSION:
+        raise ValueError(f"Unsupported shared weights format: {manifest.get('format')}")
+
+    def load(name):
+        # Plain ndarray view of the mapping: indexing a np.memmap subclass is slower
+        return np.asarray(np.load(os.path.join(directory, f"{name}.npy"),
+                                  mmap_mode=mmap_mode, allow_pickle=False))
+
+    precision = manifest["precision"]
+
+    def load_kernel(name):
+        if precision == "float64":
+            return load(name)
+        if precision == "float16":
+            return QuantizedTensor(load(name))
+        return QuantizedTensor(load(name), load(f"{name}_scale"), load(f"{name}_row_scale"))
+
+    risk_activations = manifest["risk_activations"]
+    risk_engine = DiabetesRiskEngine(
+        [load_kernel(f"risk_kernel_{i}") for i in range(len(risk_activations))],
+        [load(f"risk_bias_{i}") for i in range(len(risk_activations))],
+        risk_activations, load("risk_mean"), load("risk_scale"))
+
+    intent_activations = manifest["intent_activations"]
+    analyzer = TermAnalyzer(manifest["token_pattern"], manifest["ngram_range"],
+                            load("intent_stop_words").tolist(), manifest["lowercase"])
+    intent_engine = MappedIntentEngine(
+        [load_kernel(f"intent_kernel_{i}") for i in range(len(intent_activations))],
+        [load(f"intent_bias_{i}") for i in range(len(intent_activations))],
+        intent_activations, analyzer, load("intent_terms"), load("intent_idf"),
+        load("intent_classes"))
+
+    return risk_engine, intent_engine
+
+
+# ==================== PUBLIC API ====================
+
+def shared_weights_dir(cache_dir, cache_key, precision="float64"):
+    """Export directory for a cache entry: shared/ or shared_<precision>/."""
+    name = SHARED_DIR_NAME if precision == "float64" else f"{SHARED_DIR_NAME}_{precision}"
+    return os.path.join(cache_dir, cache_key, name)
+
+
+def is_current_export(directory, cache_key):
+    """True if directory holds a complete export in this format for cache_key."""
+    manifest_path = os.path.join(directory, SHARED_MANIFEST_FILE)
+    if not os.path.isfile(manifest_path):
+        return False
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    return manifest.get("format") == SHARED_FORMAT_VERSION and manifest.get("cache_key") == cache_key
+
+
+def prepare_shared_weights(diabetes_path, intents_path, cache_dir=None, precision="float64"):
+    """
+    Make sure the current cache entry has a shared-weights export.
+
+    Loads (or trains) the models through the artifact cache and exports them
+    into <cache entry>/shared (shared_<precision> for reduced precision)
+    unless an export for that key already exists.
+    This imports TensorFlow, so serving processes should call it in a
+    separate process and only memory-map the result.
+
+    Args:
+        diabetes_path: Path to the diabetes CSV
+        intents_path: Path to the intents CSV
+        cache_dir: Root cache directory (defaults to models.cache.CACHE_DIR)
+        precision: Kernel storage: 'float64', 'float16' or 'int8'
+
+    Returns:
+        str: Export directory
+    """
+    from models.cache import CACHE_DIR, compute_cache_key, load_or_train_models
+
+    cache_dir = cache_dir or CACHE_DIR
+    cache_key = compute_cache_key(diabetes_path, intents_path)
+    directory = shared_weights_dir(cache_dir, cache_key, precision)
+    if is_current_export(directory, cache_key):
+        return directory
+
+    artifacts = load_or_train_models(diabetes_path, intents_path, cache_dir)
+    return export_shared_weights(artifacts["risk_engine"], artifacts["intent_engine"],
+                                 directory, artifacts["cache_key"], precision)
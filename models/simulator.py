@@ -1,11 +1,13 @@
 import numpy as np
 
 # Scenario modifiers for what-if simulations
-# Each scenario modifies patient features based on lifestyle changes
+# Each scenario modifies patient features based on lifestyle changes.
+# "cost" is the relative effort of one application, used by the planners.
 
 SCENARIOS = {
     "walk_daily": {
         "description": "Walking 30 minutes daily",
+        "cost": 2,
         "modifiers": {
             "Glucose": -30,     # Major glucose reduction
             "BMI": -3.0,        # Significant BMI reduction
@@ -14,6 +16,7 @@ SCENARIOS = {
     },
     "no_exercise": {
         "description": "No regular exercise",
+        "cost": 1,
         "modifiers": {
             "Glucose": +35,     # Major glucose increase
             "BMI": +3.5,        # Significant BMI increase
@@ -22,6 +25,7 @@ SCENARIOS = {
     },
     "healthy_diet": {
         "description": "Following a low-carb, high-fiber diet",
+        "cost": 3,
         "modifiers": {
             "Glucose": -40,     # Dramatic glucose reduction
             "BMI": -4.0,        # Major weight loss
@@ -30,6 +34,7 @@ SCENARIOS = {
     },
     "poor_diet": {
         "description": "High sugar and processed food diet",
+        "cost": 1,
         "modifiers": {
             "Glucose": +45,     # Dramatic glucose increase
             "BMI": +4.5,        # Major weight gain
@@ -38,6 +43,7 @@ SCENARIOS = {
     },
     "reduce_stress": {
         "description": "Managing stress levels",
+        "cost": 1,
         "modifiers": {
             "Glucose": -15,
             "BloodPressure": -15
@@ -57,6 +63,55 @@ FEATURE_MAP = {
     "Age": 7
 }
 
+# Model input columns, in the order the network expects them
+FEATURE_COLUMNS = sorted(FEATURE_MAP, key=FEATURE_MAP.get)
+
+
+def scenario_delta(scenario_name):
+    """
+    Build the per-feature change vector and lower bound for a scenario.
+    
+    Args:
+        scenario_name: name of scenario from SCENARIOS dict
+        
+    Returns:
+        delta: length-8 array of feature changes
+        floor: length-8 array, 0 for modified features (kept non-negative)
+               and -inf for untouched ones
+    """
+    delta = np.zeros(len(FEATURE_MAP))
+    floor = np.full(len(FEATURE_MAP), -np.inf)
+    
+    for feature, change in SCENARIOS[scenario_name]["modifiers"].items():
+        if feature in FEATURE_MAP:
+            idx = FEATURE_MAP[feature]
+            delta[idx] += change
+            floor[idx] = 0.0
+    
+    return delta, floor
+
+
+# Precomputed (delta, floor) vectors for every scenario
+SCENARIO_DELTAS = {name: scenario_delta(name) for name in SCENARIOS}
+
+
+def apply_scenario_batch(patients, scenario_name):
+    """
+    Apply a what-if scenario to every row of an N x 8 patient array.
+    
+    Args:
+        patients: numpy array of shape (N, 8)
+        scenario_name: name of scenario from SCENARIOS dict
+        
+    Returns:
+        numpy.ndarray: (N, 8) float array with the scenario applied
+    """
+    if scenario_name not in SCENARIO_DELTAS:
+        raise ValueError(f"Unknown scenario: {scenario_name}")
+    
+    delta, floor = SCENARIO_DELTAS[scenario_name]
+    return np.maximum(patients + delta, floor)  # Ensure non-negative
+
 
 def apply_scenario(patient_data, scenario_name):
     """
@@ -73,16 +128,29 @@ def apply_scenario(patient_data, scenario_name):
     if scenario_name not in SCENARIOS:
         return patient_data.copy(), "Unknown scenario"
     
-    scenario = SCENARIOS[scenario_name]
-    modified = patient_data.copy()
+    modified = apply_scenario_batch(patient_data, scenario_name)
+    return modified, SCENARIOS[scenario_name]["description"]
+
+
+def build_scenario_matrix(patient_data, scenario_names=None):
+    """
+    Stack the patient and every scenario variant into one matrix.
+    
+    Args:
+        patient_data: numpy array of patient features (1 x 8)
+        scenario_names: scenarios to include (defaults to all SCENARIOS)
+        
+    Returns:
+        names: list of scenario names, aligned with rows 1..N
+        matrix: (N + 1) x 8 array; row 0 is the unchanged patient
+    """
+    if scenario_names is None:
+        scenario_names = list(SCENARIOS)
     
-    # Apply modifiers
-    for feature, change in scenario["modifiers"].items():
-        if feature in FEATURE_MAP:
-            idx = FEATURE_MAP[feature]
-            modified[0][idx] = max(0, modified[0][idx] + change)  # Ensure non-negative
+    rows = [patient_data[:1]]
+    rows += [apply_scenario_batch(patient_data[:1], name) for name in scenario_names]
     
-    return modified, scenario["description"]
+    return list(scenario_names), np.vstack(rows)
 
 
 def get_available_scenarios():
@@ -0,0 +1,43 @@
+"""
+Sparse Keras Batches
+====================
+Keras dataset over a sparse (TF-IDF or hashed) feature matrix, used by
+train_intent_model_sparse() and the online intent learner.
+
+This module imports Keras at the top, so import it inside training code
+only; models/intent_nn.py stays cheap to import for inference.
+"""
+
+import math
+
+import numpy as np
+from keras.utils import PyDataset
+
+
+class SparseBatches(PyDataset):
+    """
+    Keras dataset over a sparse feature matrix.
+
+    Only the rows of the current batch are densified, so memory per step is
+    batch_size x n_features no matter how many utterances there are.
+    """
+
+    def __init__(self, X, y, batch_size, shuffle=False, seed=42, **kwargs):
+        super().__init__(**kwargs)
+        self.X = X.tocsr()
+        self.y = np.asarray(y)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+        self.order = self.rng.permutation(len(self.y)) if shuffle else np.arange(len(self.y))
+
+    def __len__(self):
+        return math.ceil(len(self.y) / self.batch_size)
+
+    def __getitem__(self, index):
+        rows = self.order[index * self.batch_size:(index + 1) * self.batch_size]
+        return self.X[rows].toarray().astype(np.float32), self.y[rows]
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.order = self.rng.permutation(len(self.y))
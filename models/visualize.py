@@ -3,13 +3,37 @@ Training Visualization Module
 ==============================
 Generates matplotlib plots for training history to visualize model performance
 and demonstrate overfitting analysis.
+
+start_background_plots() renders in a separate process so the chat does not
+wait for matplotlib. Rendering is skipped when the histories and output
+settings hash to the same value as the last completed render. Use
+preview=True (72 dpi) or fmt="svg" for faster output than the 300-dpi PNGs.
+
+Re-render from the cached training histories:
+    python -m models.visualize [--preview] [--svg] [--force]
 """
 
-import matplotlib.pyplot as plt
+import contextlib
+import hashlib
+import json
+import multiprocessing
 import os
 
+import numpy as np
+
+
+# ==================== CONSTANTS ====================
+
+PLOT_FORMATS = ("png", "svg")
+DEFAULT_DPI = 300
+PREVIEW_DPI = 72
+PLOTS_STAMP_FILE = ".plots_hash"  # Hash of the last completed render
 
-def plot_training_history(history, model_name="Model", save_dir="plots"):
+
+# ==================== PLOTTING ====================
+
+def plot_training_history(history, model_name="Model", save_dir="plots", dpi=DEFAULT_DPI,
+                          fmt="png"):
     """
     Plot training and validation accuracy/loss curves.
     
@@ -17,7 +41,11 @@ def plot_training_history(history, model_name="Model", save_dir="plots"):
         history: Keras History object from model.fit()
         model_name: Name of the model for plot titles
         save_dir: Directory to save plots
+        dpi: Resolution for PNG output
+        fmt: 'png' or 'svg'
     """
+    import matplotlib.pyplot as plt
+
     # Create plots directory if it doesn't exist
     os.makedirs(save_dir, exist_ok=True)
     
@@ -62,9 +90,8 @@ def plot_training_history(history, model_name="Model", save_dir="plots"):
     plt.tight_layout()
     
     # Save plot
-    filename = f"{model_name.lower().replace(' ', '_')}_training_curves.png"
-    filepath = os.path.join(save_dir, filename)
-    plt.savefig(filepath, dpi=300, bbox_inches='tight')
+    filepath = os.path.join(save_dir, plot_filename(model_name, fmt))
+    plt.savefig(filepath, dpi=dpi, bbox_inches='tight')
     print(f"✅ Plot saved: {filepath}")
     
     # Close to free memory
@@ -73,6 +100,52 @@ def plot_training_history(history, model_name="Model", save_dir="plots"):
     return filepath
 
 
+def plot_filename(model_name, fmt="png"):
+    return f"{model_name.lower().replace(' ', '_')}_training_curves.{fmt}"
+
+
+def plot_risk_surface(surface, save_dir="plots", dpi=DEFAULT_DPI, fmt="png"):
+    """
+    Plot a risk sensitivity surface with its risk contours.
+
+    Args:
+        surface: Dictionary from models.sensitivity.risk_surface()
+        save_dir: Directory to save plots
+        dpi: Resolution for PNG output
+        fmt: 'png' or 'svg'
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+
+    os.makedirs(save_dir, exist_ok=True)
+    x_feature, y_feature = surface["x_feature"], surface["y_feature"]
+
+    fig, ax = plt.subplots(figsize=(8, 6))
+    mesh = ax.pcolormesh(surface["x"], surface["y"], surface["probabilities"],
+                         cmap='RdYlGn_r', vmin=0, vmax=1, shading='auto')
+    fig.colorbar(mesh, ax=ax, label='Diabetes Probability')
+
+    for (level, segments), color in zip(sorted(surface["contours"].items()), ('orange', 'red')):
+        ax.add_collection(LineCollection(segments, colors=color, linewidths=2,
+                                         label=f'Risk contour {level:g}'))
+
+    ax.plot(*surface["patient_point"], 'k*', markersize=14,
+            label=f'Patient ({surface["patient_probability"]:.2f})')
+    ax.set_xlabel(x_feature, fontsize=12)
+    ax.set_ylabel(y_feature, fontsize=12)
+    ax.set_title(f'Risk Sensitivity - {x_feature} vs {y_feature}', fontsize=14,
+                 fontweight='bold')
+    ax.legend(loc='upper left', fontsize=10)
+
+    plt.tight_layout()
+    filepath = os.path.join(save_dir, f"risk_surface_{x_feature.lower()}_{y_feature.lower()}.{fmt}")
+    plt.savefig(filepath, dpi=dpi, bbox_inches='tight')
+    print(f"✅ Plot saved: {filepath}")
+    plt.close()
+
+    return filepath
+
+
 def generate_analysis_text(history, model_name="Model"):
     """
     Generate textbook-quality analysis text for the plots.
@@ -115,7 +188,8 @@ constrained data.
     return analysis
 
 
-def plot_both_models(intent_history, diabetes_history, save_dir="plots"):
+def plot_both_models(intent_history, diabetes_history, save_dir="plots", dpi=DEFAULT_DPI,
+                     fmt="png", force=False):
     """
     Generate plots for both models and save analysis.
     
@@ -123,17 +197,34 @@ def plot_both_models(intent_history, diabetes_history, save_dir="plots"):
         intent_history: Intent model training history
         diabetes_history: Diabetes model training history
         save_dir: Directory to save plots
+        dpi: Resolution for PNG output
+        fmt: 'png' or 'svg'
+        force: Render even if the last render used the same histories
+
+    Returns:
+        tuple: (intent plot, diabetes plot, analysis file) paths
     """
+    if fmt not in PLOT_FORMATS:
+        raise ValueError(f"Unsupported plot format: {fmt} (use png or svg)")
+
+    outputs = _output_paths(save_dir, fmt)
+    analysis_file = outputs[-1]
+
+    digest = history_hash(intent_history, diabetes_history, dpi, fmt)
+    if not force and _is_up_to_date(save_dir, fmt, digest):
+        print(f"\n✅ Training plots up to date: {os.path.abspath(save_dir)}/")
+        return outputs
+
     print("\n" + "="*60)
     print("GENERATING TRAINING VISUALIZATION PLOTS")
     print("="*60)
     
     # Plot intent model
-    intent_plot = plot_training_history(intent_history, "Intent Classification Model", save_dir)
+    plot_training_history(intent_history, "Intent Classification Model", save_dir, dpi, fmt)
     intent_analysis = generate_analysis_text(intent_history, "Intent Classification Model")
     
     # Plot diabetes model
-    diabetes_plot = plot_training_history(diabetes_history, "Diabetes Risk Model", save_dir)
+    plot_training_history(diabetes_history, "Diabetes Risk Model", save_dir, dpi, fmt)
     diabetes_analysis = generate_analysis_text(diabetes_history, "Diabetes Risk Model")
     
     # Print analyses
@@ -141,14 +232,128 @@ def plot_both_models(intent_history, diabetes_history, save_dir="plots"):
     print(diabetes_analysis)
     
     # Save analysis to file
-    analysis_file = os.path.join(save_dir, "training_analysis.txt")
     with open(analysis_file, 'w', encoding='utf-8') as f:
         f.write(intent_analysis)
         f.write("\n\n")
         f.write(diabetes_analysis)
+
+    # Written last, so an interrupted render is redone next time
+    with open(os.path.join(save_dir, PLOTS_STAMP_FILE), "w", encoding="utf-8") as f:
+        f.write(digest)
     
     print(f"\n✅ Analysis saved: {analysis_file}")
     print(f"\n📁 All plots saved in: {os.path.abspath(save_dir)}/")
     print("="*60)
     
-    return intent_plot, diabetes_plot, analysis_file
+    return outputs
+
+
+# ==================== CACHING ====================
+
+def history_hash(intent_history, diabetes_history, dpi=DEFAULT_DPI, fmt="png"):
+    """Content hash of both histories' metric arrays plus the output settings."""
+    digest = hashlib.sha256(f"dpi={dpi};fmt={fmt}".encode())
+    for label, history in (("intent", intent_history), ("diabetes", diabetes_history)):
+        for name in sorted(history.history):
+            digest.update(f"{label}.{name}".encode())
+            digest.update(np.asarray(history.history[name], dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def _output_paths(save_dir, fmt):
+    return (os.path.join(save_dir, plot_filename("Intent Classification Model", fmt)),
+            os.path.join(save_dir, plot_filename("Diabetes Risk Model", fmt)),
+            os.path.join(save_dir, "training_analysis.txt"))
+
+
+def _is_up_to_date(save_dir, fmt, digest):
+    """True if the last completed render had this hash and its files still exist."""
+    try:
+        with open(os.path.join(save_dir, PLOTS_STAMP_FILE), encoding="utf-8") as f:
+            stamp = f.read().strip()
+    except OSError:
+        return False
+    return stamp == digest and all(map(os.path.isfile, _output_paths(save_dir, fmt)))
+
+
+# ==================== BACKGROUND RENDERING ====================
+
+def _render_worker(intent_history, diabetes_history, save_dir, dpi, fmt, log_path):
+    """Process target: render with the non-interactive Agg backend."""
+    import matplotlib
+    matplotlib.use("Agg")
+    from models.cache import CachedHistory
+
+    # The parent's terminal belongs to the chat; keep the report in a log
+    os.makedirs(save_dir, exist_ok=True)
+    with open(log_path, "w", encoding="utf-8") as log, contextlib.redirect_stdout(log):
+        plot_both_models(CachedHistory(intent_history), CachedHistory(diabetes_history), save_dir,
+                         dpi, fmt)
+
+
+def start_background_plots(intent_history, diabetes_history, save_dir="plots", dpi=DEFAULT_DPI,
+                           fmt="png", preview=False):
+    """
+    Render the training plots in a separate process.
+
+    Returns immediately. The process is non-daemonic, so a chat that
+    ends first still waits for the plots at interpreter exit. Output is
+    logged to <save_dir>/plots.log.
+
+    Args:
+        intent_history: Intent model training history
+        diabetes_history: Diabetes model training history
+        save_dir: Directory to save plots
+        dpi: Resolution for PNG output
+        fmt: 'png' or 'svg'
+        preview: Use PREVIEW_DPI instead of dpi
+
+    Returns:
+        multiprocessing.Process, or None if the plots are already up to date
+    """
+    if fmt not in PLOT_FORMATS:
+        raise ValueError(f"Unsupported plot format: {fmt} (use png or svg)")
+    dpi = PREVIEW_DPI if preview else dpi
+
+    # Cheap check here saves spawning an interpreter for nothing
+    if _is_up_to_date(save_dir, fmt, history_hash(intent_history, diabetes_history, dpi, fmt)):
+        return None
+
+    # Spawned: the parent may already have TensorFlow's threads running
+    process = multiprocessing.get_context("spawn").Process(
+        target=_render_worker, name="training-plots",
+        args=({k: list(v) for k, v in intent_history.history.items()},
+              {k: list(v) for k, v in diabetes_history.history.items()},
+              save_dir, dpi, fmt, os.path.join(save_dir, "plots.log")))
+    process.start()
+    return process
+
+
+# ==================== ENTRY POINT ====================
+
+def main():
+    import argparse
+    from models.cache import CACHE_DIR, HISTORIES_FILE, CachedHistory, compute_cache_key
+
+    parser = argparse.ArgumentParser(description="Render training plots from cached histories.")
+    parser.add_argument("--diabetes", default="data/diabetes.csv")
+    parser.add_argument("--intents", default="data/intents.csv")
+    parser.add_argument("--save-dir", default="plots")
+    parser.add_argument("--preview", action="store_true", help=f"Render at {PREVIEW_DPI} dpi")
+    parser.add_argument("--svg", action="store_true", help="Write SVG instead of PNG")
+    parser.add_argument("--force", action="store_true", help="Render even if up to date")
+    args = parser.parse_args()
+
+    path = os.path.join(CACHE_DIR, compute_cache_key(args.diabetes, args.intents), HISTORIES_FILE)
+    if not os.path.isfile(path):
+        raise SystemExit(f"No cached training histories at {path}; run main.py first")
+    with open(path, encoding="utf-8") as f:
+        histories = json.load(f)
+
+    plot_both_models(CachedHistory(histories["intent"]), CachedHistory(histories["diabetes"]),
+                     args.save_dir, PREVIEW_DPI if args.preview else DEFAULT_DPI,
+                     "svg" if args.svg else "png", args.force)
+
+
+if __name__ == "__main__":
+    main()
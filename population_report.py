@@ -0,0 +1,76 @@
+"""
+Population What-If Report
+=========================
+Runs every lifestyle scenario from models/simulator.py across a patient
+population (data/diabetes.csv by default) and prints a low/medium/high
+risk transition matrix per scenario.
+
+Usage:
+    python population_report.py [patients.csv] [--chunksize 50000] [--json report.json]
+"""
+
+import argparse
+import json
+
+from models.batch_scoring import DEFAULT_CHUNKSIZE, scenario_transition_matrices
+from models.cache import load_inference_engines
+from models.risk import RISK_LEVELS
+from models.simulator import SCENARIOS
+
+
+# ==================== CONFIGURATION ====================
+
+DIABETES_DATA_PATH = "data/diabetes.csv"
+INTENTS_DATA_PATH = "data/intents.csv"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scenario risk transitions over a population.")
+    parser.add_argument("input", nargs="?", default=DIABETES_DATA_PATH,
+                        help=f"CSV with the 8 diabetes feature columns (default: {DIABETES_DATA_PATH})")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"Rows per chunk (default: {DEFAULT_CHUNKSIZE})")
+    parser.add_argument("--json", dest="json_path", help="Also write the matrices to this JSON file")
+    return parser.parse_args()
+
+
+def print_report(report):
+    """Print one transition matrix per scenario."""
+    print("\n" + "="*60)
+    print("POPULATION WHAT-IF REPORT")
+    print("="*60)
+    print(f"   Patients: {report['rows']:,}   "
+          f"({report['seconds']:.2f} s, {report['rows_per_sec']:,.0f} rows/sec)")
+    if report["invalid_rows"]:
+        print(f"   Skipped:  {report['invalid_rows']:,} rows with missing or invalid features")
+
+    for name, matrix in report["matrices"].items():
+        print(f"\n📊 {SCENARIOS[name]['description']} ({name})")
+        print(f"   {'current → new':<15}" + "".join(f"{level:>10}" for level in RISK_LEVELS))
+        for level, row in zip(RISK_LEVELS, matrix):
+            print(f"   {level:<15}" + "".join(f"{count:>10,}" for count in row))
+
+    print("\n" + "="*60)
+
+
+def main():
+    args = parse_args()
+
+    artifacts = load_inference_engines(DIABETES_DATA_PATH, INTENTS_DATA_PATH)
+    report = scenario_transition_matrices(artifacts["risk_engine"], args.input,
+                                          chunksize=args.chunksize)
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "rows": report["rows"],
+                "invalid_rows": report["invalid_rows"],
+                "levels": list(RISK_LEVELS),
+                "matrices": {name: m.tolist() for name, m in report["matrices"].items()},
+            }, f, indent=2)
+        print(f"✅ Report saved: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
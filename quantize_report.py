@@ -0,0 +1,77 @@
+"""
+Quantization Report
+===================
+Compares float16 and int8 versions of the NumPy inference engines with the
+full-precision ones (see models/quantization.py): validation accuracy,
+how often the low/medium/high risk label changes, and kernel size.
+
+Serve a quantized export with `python server.py --workers N --precision int8`.
+
+Usage:
+    python quantize_report.py [--precisions float16 int8] [--json report.json]
+"""
+
+import argparse
+import json
+
+from models.cache import load_or_train_models
+from models.quantization import PRECISIONS, evaluate_quantization
+
+
+# ==================== CONFIGURATION ====================
+
+DIABETES_DATA_PATH = "data/diabetes.csv"
+INTENTS_DATA_PATH = "data/intents.csv"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Accuracy impact of reduced-precision weights.")
+    parser.add_argument("--precisions", nargs="+", choices=PRECISIONS[1:],
+                        default=list(PRECISIONS[1:]))
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this JSON file")
+    return parser.parse_args()
+
+
+def print_report(report):
+    """Print one block per model with a row per precision."""
+    print("\n" + "="*60)
+    print("QUANTIZATION REPORT")
+    print("="*60)
+
+    for model in ("diabetes", "intent"):
+        base = report["float64"][model]
+        agreement = "label agree" if model == "diabetes" else "pred agree"
+        print(f"\n🔢 {model.capitalize()} model")
+        print(f"   {'precision':<10}{'val acc':>9}{'delta':>9}{agreement:>13}{'kernel KB':>11}")
+        print(f"   {'float32':<10}{base['val_accuracy']:>9.4f}{'':>9}{'':>13}"
+              f"{base['float32_kernel_bytes'] / 1024:>11.1f}")
+
+        for precision, results in report.items():
+            if precision == "float64":
+                continue
+            stats = results[model]
+            agree = stats["risk_label_agreement"] if model == "diabetes" \
+                else stats["prediction_agreement"]
+            print(f"   {precision:<10}{stats['val_accuracy']:>9.4f}"
+                  f"{stats['accuracy_delta']:>+9.4f}{agree:>13.4%}"
+                  f"{stats['kernel_bytes'] / 1024:>11.1f}")
+
+    print("="*60)
+
+
+def main():
+    args = parse_args()
+
+    artifacts = load_or_train_models(DIABETES_DATA_PATH, INTENTS_DATA_PATH)
+    report = evaluate_quantization(artifacts["risk_engine"], artifacts["intent_engine"],
+                                   DIABETES_DATA_PATH, INTENTS_DATA_PATH, args.precisions)
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Report written: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
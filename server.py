@@ -0,0 +1,796 @@
+"""
+Chat Server
+===========
+Asyncio HTTP/JSON server (standard library only) that serves many patients
+from one process. Models are loaded once; each session keeps its patient
+array and risk level in an in-memory store with idle eviction. Inference
+runs in a thread pool so the event loop only does I/O, and intent and risk
+requests from concurrent sessions are micro-batched (see batching.py).
+
+Endpoints:
+    GET    /health                  Liveness and session count
+    GET    /metrics                 Stage latency histograms (Prometheus text)
+    GET    /stats                   Micro-batcher queue depth and batch sizes
+    POST   /assess                  {"patient": [...]} -> risk and ranked feature
+                                    contributions ("factors"), no session
+    POST   /risk-surface            {"patient": [...], "x_feature": "Glucose", "y_feature":
+                                    "BMI", "resolution": 200} -> probability grid and
+                                    0.4/0.7 risk contours (see models/sensitivity.py)
+    POST   /sessions                {"patient": [...]} -> session_id, risk, factors
+    GET    /sessions/<id>           Session risk summary
+    POST   /sessions/<id>/chat      {"message": "..."} -> bot response
+    DELETE /sessions/<id>           End a session
+    POST   /intents/learn           {"examples": [{"text", "intent"}, ...], optional
+                                    "epochs", "replay_ratio"} -> update stats (only
+                                    with --online-learning)
+
+"patient" is either a list of the 8 feature values or an object keyed by
+the feature names in data/diabetes.csv.
+
+With --workers N the server pre-forks N worker processes that accept on one
+shared listening socket. Weights are exported once to .npy files (see
+models/shared_weights.py) and every worker memory-maps them read-only, so
+workers share one copy of the models and never import TensorFlow. Sessions
+are kept in a SQLite file shared by all workers (SharedSessionStore), so
+any worker can serve any session whichever connection a request arrives
+on. /metrics and /stats are per worker.
+
+Usage:
+    python server.py [--host 127.0.0.1] [--port 8000] [--idle-timeout 1800]
+    python server.py --workers 4
+    python server.py --online-learning --log-low-confidence logs/low_confidence_turns.csv
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import secrets
+import shutil
+import signal
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import numpy as np
+
+import main as chat
+from batching import (DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS, MicroBatcher,
+                      intent_batch_fn, risk_batch_fn)
+from main import DIABETES_DATA_PATH, INTENTS_DATA_PATH, handle_turn
+from models.quantization import PRECISIONS
+from models.shared_weights import load_shared_engines, prepare_shared_weights
+from models.sensitivity import DEFAULT_RESOLUTION, risk_surface
+from models.simulator import FEATURE_COLUMNS
+from telemetry import METRICS
+
+
+# ==================== CONFIGURATION ====================
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_IDLE_TIMEOUT = 30 * 60  # seconds
+DEFAULT_MAX_SESSIONS = 100_000
+EVICTION_INTERVAL = 30  # seconds between idle sweeps
+SESSION_DB_TIMEOUT = 5.0  # seconds a worker waits for the shared session DB lock
+SESSION_CAP_INTERVAL = 64  # creates per worker between shared-store capacity checks
+
+MAX_BODY_BYTES = 64 * 1024
+MAX_HEADER_LINES = 100
+LISTEN_BACKLOG = 1024
+MAX_SURFACE_RESOLUTION = 400  # Points per axis on /risk-surface
+MAX_UPDATE_EPOCHS = 100  # Upper bound for "epochs" on /intents/learn
+MAX_REPLAY_RATIO = 100  # Upper bound for "replay_ratio" on /intents/learn
+
+logger = logging.getLogger(__name__)
+
+
+class RequestError(Exception):
+    """Client error carrying an HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ==================== SESSION STORE ====================
+
+class Session:
+    __slots__ = ("patient", "risk", "probability", "last_seen")
+
+    def __init__(self, patient, risk, probability):
+        self.patient = patient
+        self.risk = risk
+        self.probability = probability
+        self.last_seen = time.monotonic()
+
+
+class SessionStore:
+    """
+    In-memory sessions ordered by last access.
+
+    Because the OrderedDict is kept in access order, idle eviction only
+    scans from the oldest end and stops at the first live session.
+    """
+
+    blocking = False  # Cheap enough to call on the event loop
+
+    def __init__(self, idle_timeout=DEFAULT_IDLE_TIMEOUT, max_sessions=DEFAULT_MAX_SESSIONS):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def create(self, patient, risk, probability):
+        session_id = secrets.token_hex(16)
+        self._sessions[session_id] = Session(patient, risk, probability)
+
+        # Over capacity: drop the least recently used session
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+        return session_id
+
+    def get(self, session_id):
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.last_seen = time.monotonic()
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id):
+        return self._sessions.pop(session_id, None) is not None
+
+    def evict_idle(self, now=None):
+        """Remove sessions idle for longer than idle_timeout; return how many."""
+        cutoff = (now if now is not None else time.monotonic()) - self.idle_timeout
+        evicted = 0
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_seen > cutoff:
+                break
+            del self._sessions[session_id]
+            evicted += 1
+        return evicted
+
+
+class SharedSessionStore:
+    """
+    Sessions in a SQLite file, shared by pre-forked workers.
+
+    Same interface as SessionStore. Calls may wait on another worker's
+    write lock, so the server runs them in its executor (blocking = True).
+    Each process and thread opens its own connection on first use (SQLite
+    connections must not cross fork() or be shared between threads), and
+    WAL mode lets workers read while another one writes. last_seen is
+    wall-clock time, since it is compared across processes.
+
+    max_sessions is checked every SESSION_CAP_INTERVAL creates per worker
+    rather than on every insert, so the table can briefly exceed it by up
+    to that many sessions per worker.
+    """
+
+    blocking = True
+
+    def __init__(self, path, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 max_sessions=DEFAULT_MAX_SESSIONS):
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._local = threading.local()
+        self._creates = 0
+
+    def _connect(self):
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            db = sqlite3.connect(self.path, timeout=SESSION_DB_TIMEOUT, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, "
+                       "patient BLOB, risk TEXT, probability REAL, last_seen REAL)")
+            db.execute("CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen)")
+            local.db, local.pid = db, os.getpid()
+        return local.db
+
+    def close(self):
+        """Close this thread's connection (call before forking workers)."""
+        local = self._local
+        if getattr(local, "pid", None) == os.getpid():
+            local.db.close()
+        local.db = local.pid = None
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def create(self, patient, risk, probability):
+        session_id = secrets.token_hex(16)
+        db = self._connect()
+        db.execute("INSERT INTO sessions VALUES (?, ?, ?, ?, ?)",
+                   (session_id, np.asarray(patient, dtype=np.float64).tobytes(), risk,
+                    float(probability), time.time()))
+
+        # Over capacity: drop the least recently used sessions. Counting is a
+        # full scan, so only every SESSION_CAP_INTERVAL creates
+        self._creates += 1
+        if self._creates % SESSION_CAP_INTERVAL == 0:
+            excess = len(self) - self.max_sessions
+            if excess > 0:
+                db.execute("DELETE FROM sessions WHERE id IN "
+                           "(SELECT id FROM sessions ORDER BY last_seen LIMIT ?)", (excess,))
+
+        return session_id
+
+    def get(self, session_id):
+        db = self._connect()
+        now = time.time()
+        if db.execute("UPDATE sessions SET last_seen = ? WHERE id = ?",
+                      (now, session_id)).rowcount == 0:
+            return None
+        row = db.execute("SELECT patient, risk, probability FROM sessions WHERE id = ?",
+                         (session_id,)).fetchone()
+        if row is None:  # Deleted by another worker in between
+            return None
+        patient, risk, probability = row
+        session = Session(np.frombuffer(patient, dtype=np.float64).reshape(1, -1).copy(),
+                          risk, probability)
+        session.last_seen = now
+        return session
+
+    def delete(self, session_id):
+        return self._connect().execute("DELETE FROM sessions WHERE id = ?",
+                                       (session_id,)).rowcount > 0
+
+    def evict_idle(self, now=None):
+        """Remove sessions idle for longer than idle_timeout; return how many."""
+        cutoff = (now if now is not None else time.time()) - self.idle_timeout
+        return self._connect().execute("DELETE FROM sessions WHERE last_seen <= ?",
+                                       (cutoff,)).rowcount
+
+
+# ==================== APPLICATION ====================
+
+class ChatServer:
+    """Routes JSON requests to the chat pipeline."""
+
+    def __init__(self, risk_engine, intent_engine, store=None, executor=None,
+                 max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS,
+                 learner=None, learner_dir=None):
+        self.risk_engine = risk_engine
+        self.intent_engine = intent_engine
+        self.learner = learner  # OnlineIntentLearner, or None
+        self.learner_dir = learner_dir
+        self._learn_lock = asyncio.Lock()  # one update/swap/save at a time
+        self.store = store if store is not None else SessionStore()
+        self.executor = executor or ThreadPoolExecutor()
+        self.intent_batcher = MicroBatcher(intent_batch_fn(intent_engine), max_batch_size,
+                                           max_wait_ms, self.executor, name="intent")
+        self.risk_batcher = MicroBatcher(risk_batch_fn(risk_engine, explain=True), max_batch_size,
+                                         max_wait_ms, self.executor, name="risk")
+
+    async def run_blocking(self, func, *args):
+        """Run model inference off the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def call_store(self, method, *args):
+        """Call a session store method, in the executor if the store can block."""
+        func = getattr(self.store, method)
+        if getattr(self.store, "blocking", False):
+            return await self.run_blocking(func, *args)
+        return func(*args)
+
+    # ---------- inference ----------
+
+    async def assess(self, patient):
+        """Micro-batched risk assessment; returns (risk, probability, factors)."""
+        risk, probability, ranked = await self.risk_batcher.submit(patient)
+        factors = [{"feature": feature, "contribution": round(value, 4)}
+                   for feature, value in ranked]
+        return risk, probability, factors
+
+    async def risk_surface(self, patient, options):
+        """Probability grid over two features, as JSON-ready lists."""
+        try:
+            surface = await self.run_blocking(lambda: risk_surface(self.risk_engine, patient,
+                                                                   **options))
+        except ValueError as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, str(e))
+        return {
+            "x_feature": surface["x_feature"],
+            "y_feature": surface["y_feature"],
+            "x": surface["x"].tolist(),
+            "y": surface["y"].tolist(),
+            "probabilities": np.round(surface["probabilities"], 4).tolist(),
+            "contours": {f"{level:g}": segments.tolist()
+                         for level, segments in surface["contours"].items()},
+            "patient_point": surface["patient_point"],
+            "patient_probability": surface["patient_probability"],
+        }
+
+    async def chat(self, session, message):
+        with METRICS.stage("turn"):
+            prediction = await self.intent_batcher.submit(message)
+            return await self.run_blocking(handle_turn, message, session.patient, session.risk,
+                                           self.risk_engine, self.intent_engine, prediction)
+
+    async def learn_intents(self, texts, labels, options=None):
+        """
+        Fine-tune the online intent model, then hot-swap it in.
+
+        Concurrent calls are serialized, so each update is swapped in and
+        saved before the next one starts. options are extra keyword
+        arguments for OnlineIntentLearner.update() (epochs, replay_ratio).
+        """
+        options = options or {}
+        async with self._learn_lock:
+            stats = await self.run_blocking(lambda: self.learner.update(texts, labels, **options))
+            self.swap_intent_engine(self.learner.engine)
+            if self.learner_dir:
+                await self.run_blocking(self.learner.save, self.learner_dir)
+        return stats
+
+    def swap_intent_engine(self, intent_engine):
+        """Serve a new intent engine; batches already running finish on the old one."""
+        self.intent_engine = intent_engine
+        self.intent_batcher.batch_fn = intent_batch_fn(intent_engine)
+
+    # ---------- routing ----------
+
+    async def dispatch(self, method, path, body):
+        """
+        Handle one request.
+
+        Returns:
+            tuple: (HTTPStatus, payload) where payload is a dict or str
+        """
+        parts = [p for p in path.split("?", 1)[0].split("/") if p]
+
+        if parts == ["health"] and method == "GET":
+            return HTTPStatus.OK, {"status": "ok", "sessions": await self.call_store("__len__")}
+
+        if parts == ["metrics"] and method == "GET":
+            return HTTPStatus.OK, METRICS.to_prometheus()
+
+        if parts == ["stats"] and method == "GET":
+            return HTTPStatus.OK, {"intent": self.intent_batcher.stats(),
+                                   "risk": self.risk_batcher.stats()}
+
+        if parts == ["assess"] and method == "POST":
+            patient = parse_patient(body)
+            risk, probability, factors = await self.assess(patient)
+            return HTTPStatus.OK, {"risk": risk, "probability": probability, "factors": factors}
+
+        if parts == ["risk-surface"] and method == "POST":
+            patient = parse_patient(body)
+            return HTTPStatus.OK, await self.risk_surface(patient, parse_surface_options(body))
+
+        if parts == ["sessions"] and method == "POST":
+            patient = parse_patient(body)
+            risk, probability, factors = await self.assess(patient)
+            session_id = await self.call_store("create", patient, risk, probability)
+            return HTTPStatus.CREATED, {"session_id": session_id, "risk": risk,
+                                        "probability": probability, "factors": factors}
+
+        if parts == ["intents", "learn"] and method == "POST":
+            if self.learner is None:
+                raise RequestError(HTTPStatus.NOT_FOUND,
+                                   "Online learning is off (start with --online-learning)")
+            texts, labels = parse_examples(body)
+            try:
+                stats = await self.learn_intents(texts, labels, parse_update_options(body))
+            except ValueError as e:
+                raise RequestError(HTTPStatus.BAD_REQUEST, str(e))
+            return HTTPStatus.OK, stats
+
+        if len(parts) in (2, 3) and parts[0] == "sessions":
+            return await self.dispatch_session(method, parts, body)
+
+        raise RequestError(HTTPStatus.NOT_FOUND, f"No route for {method} {path}")
+
+    async def dispatch_session(self, method, parts, body):
+        session_id = parts[1]
+
+        if len(parts) == 2 and method == "DELETE":
+            if not await self.call_store("delete", session_id):
+                raise RequestError(HTTPStatus.NOT_FOUND, "Unknown session")
+            return HTTPStatus.OK, {"deleted": session_id}
+
+        session = await self.call_store("get", session_id)
+        if session is None:
+            raise RequestError(HTTPStatus.NOT_FOUND, "Unknown or expired session")
+
+        if len(parts) == 2 and method == "GET":
+            return HTTPStatus.OK, {"session_id": session_id, "risk": session.risk,
+                                   "probability": session.probability}
+
+        if len(parts) == 3 and parts[2] == "chat" and method == "POST":
+            message = parse_json(body).get("message")
+            if not isinstance(message, str) or not message.strip():
+                raise RequestError(HTTPStatus.BAD_REQUEST, "'message' must be a non-empty string")
+            response = await self.chat(session, message.strip())
+            return HTTPStatus.OK, {"response": response, "risk": session.risk}
+
+        raise RequestError(HTTPStatus.NOT_FOUND, "No such session route")
+
+    # ---------- HTTP ----------
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection (keep-alive aware)."""
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+
+                try:
+                    status, payload = await self.dispatch(method, path, body)
+                except RequestError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception:  # Never let one request kill the connection loop
+                    logger.exception("Unhandled error in %s %s", method, path)
+                    status, payload = (HTTPStatus.INTERNAL_SERVER_ERROR,
+                                       {"error": "Internal server error"})
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(render_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except RequestError as e:
+            writer.write(render_response(e.status, {"error": str(e)}, keep_alive=False))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def evict_periodically(self, interval=EVICTION_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            await self.call_store("evict_idle")
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, sock=None):
+        if sock is not None:
+            server = await asyncio.start_server(self.handle_connection, sock=sock)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+
+        eviction = asyncio.create_task(self.evict_periodically())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            eviction.cancel()
+
+
+# ==================== HTTP HELPERS ====================
+
+async def read_request(reader):
+    """
+    Read one HTTP request.
+
+    Returns:
+        tuple or None: (method, path, headers, body bytes), None on clean EOF
+    """
+    request_line = await _read_line(reader)
+    if not request_line:
+        return None
+
+    try:
+        method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await _read_line(reader)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise RequestError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many headers")
+
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if length < 0:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Body too large")
+    body = await reader.readexactly(length) if length else b""
+
+    return method.upper(), path, headers, body
+
+
+async def _read_line(reader):
+    """readline() that reports lines over the stream limit as a bad request."""
+    try:
+        return await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Request line or header too long")
+
+
+def render_response(status, payload, keep_alive=True):
+    if isinstance(payload, str):
+        body, content_type = payload.encode(), "text/plain; version=0.0.4"
+    else:
+        body, content_type = json.dumps(payload).encode(), "application/json"
+
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+
+def parse_json(body):
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Body must be JSON")
+    if not isinstance(data, dict):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+    return data
+
+
+def parse_patient(body):
+    """Validate a request's 'patient' field into a 1 x 8 float array."""
+    patient = parse_json(body).get("patient")
+
+    if isinstance(patient, dict):
+        missing = [col for col in FEATURE_COLUMNS if col not in patient]
+        if missing:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Missing features: {', '.join(missing)}")
+        patient = [patient[col] for col in FEATURE_COLUMNS]
+
+    if not isinstance(patient, list) or len(patient) != len(FEATURE_COLUMNS):
+        raise RequestError(HTTPStatus.BAD_REQUEST,
+                           f"'patient' must have {len(FEATURE_COLUMNS)} values: "
+                           f"{', '.join(FEATURE_COLUMNS)}")
+    if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in patient):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Patient values must be numbers")
+
+    patient = np.array([patient], dtype=float)
+    if not np.isfinite(patient).all():
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Patient values must be finite")
+    return patient
+
+
+def parse_surface_options(body):
+    """Validate the optional /risk-surface fields into risk_surface() keyword arguments."""
+    data = parse_json(body)
+    options = {}
+    for key in ("x_feature", "y_feature"):
+        if key in data:
+            options[key] = str(data[key])
+
+    resolution = data.get("resolution", DEFAULT_RESOLUTION)
+    if not isinstance(resolution, int) or not 2 <= resolution <= MAX_SURFACE_RESOLUTION:
+        raise RequestError(HTTPStatus.BAD_REQUEST,
+                           f"'resolution' must be an integer from 2 to {MAX_SURFACE_RESOLUTION}")
+    options["resolution"] = resolution
+
+    for key in ("x_range", "y_range"):
+        if key in data:
+            bounds = data[key]
+            if (not isinstance(bounds, list) or len(bounds) != 2
+                    or not all(isinstance(v, (int, float)) and not isinstance(v, bool)
+                               for v in bounds)):
+                raise RequestError(HTTPStatus.BAD_REQUEST, f"'{key}' must be [low, high]")
+            try:
+                bounds = tuple(float(v) for v in bounds)
+            except OverflowError:  # int too large for a float
+                bounds = (float("inf"),)
+            if not np.isfinite(bounds).all():
+                raise RequestError(HTTPStatus.BAD_REQUEST, f"'{key}' bounds must be finite")
+            options[key] = bounds
+    return options
+
+
+def parse_examples(body):
+    """Validate {'examples': [{'text', 'intent'}, ...]} into (texts, labels)."""
+    examples = parse_json(body).get("examples")
+    if not isinstance(examples, list) or not examples:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "'examples' must be a non-empty list")
+
+    texts, labels = [], []
+    for example in examples:
+        if not isinstance(example, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Each example must be an object")
+        text = str(example.get("text", "")).strip()
+        intent = str(example.get("intent", "")).strip()
+        if not text or not intent:
+            raise RequestError(HTTPStatus.BAD_REQUEST,
+                               "Each example needs a non-empty 'text' and 'intent'")
+        texts.append(text)
+        labels.append(intent)
+    return texts, labels
+
+
+def parse_update_options(body):
+    """Validate the optional /intents/learn fields into update() keyword arguments."""
+    data = parse_json(body)
+    options = {}
+    for key, low, high in (("epochs", 1, MAX_UPDATE_EPOCHS),
+                           ("replay_ratio", 0, MAX_REPLAY_RATIO)):
+        if key in data:
+            value = data[key]
+            if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+                raise RequestError(HTTPStatus.BAD_REQUEST,
+                                   f"'{key}' must be an integer from {low} to {high}")
+            options[key] = value
+    return options
+
+
+# ==================== PRE-FORK WORKERS ====================
+
+def export_weights_in_subprocess(diabetes_path, intents_path, precision="float64"):
+    """
+    Run prepare_shared_weights() in a fresh (spawned) process.
+
+    Loading or training the models imports TensorFlow; doing it in a
+    throwaway process keeps the pre-fork parent, and every worker forked
+    from it, free of TensorFlow.
+
+    Returns:
+        str: Shared weights directory
+    """
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(prepare_shared_weights,
+                          (diabetes_path, intents_path, None, precision))
+
+
+def run_worker(sock, shared_dir, store, args):
+    """Worker process body: map the weights and serve on the shared socket."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Parent handles Ctrl+C
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    risk_engine, intent_engine = load_shared_engines(shared_dir)
+    server = ChatServer(risk_engine, intent_engine, store,
+                        ThreadPoolExecutor(max_workers=args.threads),
+                        args.max_batch_size, args.max_wait_ms)
+    asyncio.run(server.serve(sock=sock))
+
+
+def serve_prefork(args):
+    """
+    Export weights, bind one socket and keep args.workers forked workers alive.
+
+    Workers that die unexpectedly are replaced. SIGINT/SIGTERM stop all of them.
+    """
+    if not hasattr(os, "fork"):
+        raise ValueError("--workers requires a platform with os.fork()")
+
+    shared_dir = export_weights_in_subprocess(DIABETES_DATA_PATH, INTENTS_DATA_PATH,
+                                              args.precision)
+
+    sock = socket.create_server((args.host, args.port), backlog=LISTEN_BACKLOG)
+    sock.setblocking(False)
+
+    # One session table for all workers; created here, removed on shutdown
+    session_dir = tempfile.mkdtemp(prefix="chat-sessions-")
+    store = SharedSessionStore(os.path.join(session_dir, "sessions.db"),
+                               args.idle_timeout, args.max_sessions)
+    store.evict_idle()  # Creates the table
+    store.close()
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(sock, shared_dir, store, args)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        return pid
+
+    workers = {spawn() for _ in range(args.workers)}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    print(f"✅ Serving on http://{args.host}:{args.port} with {args.workers} workers "
+          f"(weights: {shared_dir}; Ctrl+C to stop)")
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if not stopping:
+            print(f"⚠️  Worker {pid} exited (status {status}); restarting")
+            workers.add(spawn())
+
+    sock.close()
+    shutil.rmtree(session_dir, ignore_errors=True)
+    print("\n👋 Server stopped")
+
+
+# ==================== ENTRY POINT ====================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve the diabetes chatbot over HTTP/JSON.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Pre-forked worker processes sharing memory-mapped weights")
+    parser.add_argument("--precision", choices=PRECISIONS, default="float64",
+                        help="Kernel precision of the shared weights (with --workers)")
+    parser.add_argument("--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT,
+                        help="Seconds before an idle session is evicted")
+    parser.add_argument("--max-sessions", type=int, default=DEFAULT_MAX_SESSIONS)
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Inference thread pool size (default: Python's default)")
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help="Largest micro-batch per model")
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="Longest a request waits for its batch to fill")
+    parser.add_argument("--metrics", action="store_true", help="Record stage latency metrics")
+    parser.add_argument("--online-learning", action="store_true",
+                        help="Serve the hashed online intent model and enable /intents/learn "
+                             "(single process only)")
+    parser.add_argument("--log-low-confidence", metavar="PATH",
+                        help="Append low-confidence turns to this CSV for labeling")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    METRICS.enabled = args.metrics
+    chat.LOW_CONFIDENCE_LOG_PATH = args.log_low_confidence
+
+    if args.workers > 1:
+        if args.online_learning:
+            raise SystemExit("--online-learning needs a single process (drop --workers)")
+        serve_prefork(args)
+        return
+
+    from models.cache import load_inference_engines
+
+    artifacts = load_inference_engines(DIABETES_DATA_PATH, INTENTS_DATA_PATH)
+    intent_engine, learner, learner_dir = artifacts["intent_engine"], None, None
+    if args.online_learning:
+        from models.online_intent import OnlineIntentLearner
+        learner, learner_dir = OnlineIntentLearner.load_or_train(DIABETES_DATA_PATH,
+                                                                 INTENTS_DATA_PATH)
+        intent_engine = learner.engine
+
+    server = ChatServer(artifacts["risk_engine"], intent_engine,
+                        SessionStore(args.idle_timeout, args.max_sessions),
+                        ThreadPoolExecutor(max_workers=args.threads),
+                        args.max_batch_size, args.max_wait_ms, learner, learner_dir)
+
+    print(f"✅ Serving on http://{args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped")
+
+
+if __name__ == "__main__":
+    main()
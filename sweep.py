@@ -0,0 +1,395 @@
+"""
+Hyperparameter Sweep
+====================
+Evaluates a grid of model configurations with stratified k-fold
+cross-validation, spreading the (configuration, fold) jobs over a process
+pool, and prints a ranked table.
+
+Each worker process reads the CSV and builds the fold indices once, in its
+initializer; intent workers also memoize the TF-IDF matrices per
+(vectorizer settings, fold), so configurations that differ only in the
+network reuse the vectorized data. TensorFlow threads are capped per
+worker so the pool doesn't oversubscribe the CPU.
+
+Every finished fold is appended to a JSON-lines results file. Rerunning
+the same sweep skips folds that are already there, so an interrupted
+sweep resumes where it stopped. The ranking prefers accuracy, then the
+smallest network; the recommended configuration is the smallest one
+within --tolerance of the best mean validation accuracy.
+
+Usage:
+    python sweep.py diabetes [--folds 5] [--workers 4]
+    python sweep.py intent --grid '{"hidden_units": [[16, 8], [32, 16]]}'
+"""
+
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from models.parallel_training import INTEROP_THREADS, limit_threads
+
+
+# ==================== CONFIGURATION ====================
+
+DIABETES_DATA_PATH = "data/diabetes.csv"
+INTENTS_DATA_PATH = "data/intents.csv"
+SWEEP_DIR = "sweeps"
+
+DEFAULT_FOLDS = 5
+DEFAULT_SEED = 42
+DEFAULT_TOLERANCE = 0.01  # Accuracy the recommended model may give up
+INNER_VALIDATION_FRACTION = 0.1  # Training rows held back for intent early stopping
+SWEEP_VERSION = 2  # Bump when fold scoring changes, so old results are not resumed
+
+# Values to try per hyperparameter; unlisted keys keep the *_PARAMS defaults
+DIABETES_GRID = {
+    "hidden_units": [[4, 2], [8, 4], [16, 8], [32, 16]],
+    "epochs": [50, 100],
+    "batch_size": [16, 32],
+}
+
+INTENT_GRID = {
+    "max_features": [250, 500],
+    "ngram_range": [[1, 1], [1, 2]],
+    "hidden_units": [[8, 8], [16, 8], [32, 16]],
+    "dropout": [[0.4, 0.3]],
+}
+
+
+# ==================== WORKER SIDE ====================
+
+_WORKER = {}  # Per-process data loaded once by _init_worker()
+
+
+def _init_worker(kind, csv_path, folds, seed, threads):
+    """Pool initializer: cap threads, load the data and build the folds once."""
+    limit_threads(threads, INTEROP_THREADS)
+
+    from sklearn.model_selection import StratifiedKFold
+
+    if kind == "diabetes":
+        from models.diabetes_nn import load_diabetes_data
+        X, y = load_diabetes_data(csv_path)
+    else:
+        from sklearn.preprocessing import LabelEncoder
+        from models.intent_nn import load_intent_data
+        texts, labels = load_intent_data(csv_path)
+        X, y = texts.to_numpy(), LabelEncoder().fit_transform(labels)
+
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+    _WORKER.update(kind=kind, X=X, y=y, seed=seed, folds=list(splitter.split(X, y)),
+                   vectorized={})
+
+
+def _diabetes_fold(params, train_idx, val_idx):
+    from sklearn.preprocessing import StandardScaler
+    from models.diabetes_nn import build_diabetes_model
+
+    X, y = _WORKER["X"], _WORKER["y"]
+    scaler = StandardScaler().fit(X[train_idx])
+    X_train, X_val = scaler.transform(X[train_idx]), scaler.transform(X[val_idx])
+
+    model = build_diabetes_model(X.shape[1], params["hidden_units"])
+    history = model.fit(X_train, y[train_idx], epochs=params["epochs"],
+                        batch_size=params["batch_size"], verbose=0)
+    loss, accuracy = model.evaluate(X_val, y[val_idx], verbose=0)
+    return model, loss, accuracy, len(history.history["loss"])
+
+
+def _intent_fold(params, train_idx, val_idx, fold):
+    from keras.callbacks import EarlyStopping
+    from models.intent_nn import build_intent_model, build_vectorizer
+
+    texts, y = _WORKER["X"], _WORKER["y"]
+
+    # Same vectorizer settings on the same fold -> reuse the matrices
+    vec_key = (params["max_features"], tuple(params["ngram_range"]), params["max_df"], fold)
+    if vec_key not in _WORKER["vectorized"]:
+        vectorizer = build_vectorizer(params)
+        X_train = vectorizer.fit_transform(texts[train_idx]).toarray()
+        X_val = vectorizer.transform(texts[val_idx]).toarray()
+        _WORKER["vectorized"][vec_key] = (X_train, X_val)
+    X_train, X_val = _WORKER["vectorized"][vec_key]
+
+    # Early stopping watches an inner split of the training rows; the
+    # held-out fold is only used for the reported score
+    y_train = y[train_idx]
+    order = np.random.default_rng((_WORKER["seed"], fold)).permutation(len(train_idx))
+    n_inner = max(1, int(len(order) * INNER_VALIDATION_FRACTION))
+    inner, fit = order[:n_inner], order[n_inner:]
+
+    model = build_intent_model(X_train.shape[1], len(np.unique(y)),
+                               params["hidden_units"], params["dropout"])
+    early_stop = EarlyStopping(monitor="val_loss", patience=params["patience"],
+                               restore_best_weights=True)
+    history = model.fit(X_train[fit], y_train[fit], epochs=params["epochs"],
+                        batch_size=params["batch_size"],
+                        validation_data=(X_train[inner], y_train[inner]),
+                        callbacks=[early_stop], verbose=0)
+    loss, accuracy = model.evaluate(X_val, y[val_idx], verbose=0)
+    return model, loss, accuracy, len(history.history["loss"])
+
+
+def _run_fold(config_id, params, fold):
+    """
+    Train and score one configuration on one fold (runs in a worker).
+
+    Returns:
+        dict: Result record for the results file
+    """
+    start = time.perf_counter()
+    train_idx, val_idx = _WORKER["folds"][fold]
+
+    if _WORKER["kind"] == "diabetes":
+        model, loss, accuracy, epochs = _diabetes_fold(params, train_idx, val_idx)
+    else:
+        model, loss, accuracy, epochs = _intent_fold(params, train_idx, val_idx, fold)
+
+    return {
+        "config_id": config_id,
+        "params": params,
+        "fold": fold,
+        "val_accuracy": float(accuracy),
+        "val_loss": float(loss),
+        "epochs_run": epochs,
+        "n_params": int(model.count_params()),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+# ==================== GRID ====================
+
+def expand_grid(defaults, grid):
+    """
+    Cartesian product of the grid values over the default hyperparameters.
+
+    Returns:
+        list: (config_id, params dict) tuples
+    """
+    unknown = set(grid) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown hyperparameters in grid: {', '.join(sorted(unknown))}")
+
+    keys = sorted(grid)
+    configs = []
+    for values in itertools.product(*(grid[k] for k in keys)):
+        params = {**defaults, **dict(zip(keys, values))}
+        config_id = hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:10]
+        configs.append((config_id, params))
+    return configs
+
+
+def sweep_key(kind, csv_path, folds, seed):
+    """Identify a sweep by model, data contents and fold layout."""
+    digest = hashlib.sha256(f"{kind}|{folds}|{seed}|v{SWEEP_VERSION}".encode())
+    with open(csv_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+# ==================== RESULTS ====================
+
+def load_results(path, key):
+    """Completed fold records of sweep `key` from a results file."""
+    records = []
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Truncated last line from an interrupted run
+                if record.get("sweep") == key:
+                    records.append(record)
+    return records
+
+
+def rank_configs(records, folds, tolerance=DEFAULT_TOLERANCE):
+    """
+    Aggregate fold records per configuration and rank them.
+
+    Only configurations with all folds finished are ranked.
+
+    Returns:
+        tuple: (ranked list of summary dicts, recommended summary or None)
+    """
+    by_config = {}
+    for record in records:
+        by_config.setdefault(record["config_id"], {})[record["fold"]] = record
+
+    summaries = []
+    for config_id, fold_records in by_config.items():
+        if len(fold_records) < folds:
+            continue
+        accuracies = np.array([r["val_accuracy"] for r in fold_records.values()])
+        losses = np.array([r["val_loss"] for r in fold_records.values()])
+        first = next(iter(fold_records.values()))
+        summaries.append({
+            "config_id": config_id,
+            "params": first["params"],
+            "mean_accuracy": float(accuracies.mean()),
+            "std_accuracy": float(accuracies.std()),
+            "mean_loss": float(losses.mean()),
+            "n_params": first["n_params"],
+            "seconds": float(sum(r["seconds"] for r in fold_records.values())),
+        })
+
+    summaries.sort(key=lambda s: (-s["mean_accuracy"], s["n_params"]))
+    if not summaries:
+        return summaries, None
+
+    cutoff = summaries[0]["mean_accuracy"] - tolerance
+    recommended = min((s for s in summaries if s["mean_accuracy"] >= cutoff),
+                      key=lambda s: (s["n_params"], -s["mean_accuracy"]))
+    return summaries, recommended
+
+
+# ==================== SWEEP ====================
+
+def run_sweep(kind, grid=None, csv_path=None, folds=DEFAULT_FOLDS, seed=DEFAULT_SEED,
+              workers=None, results_path=None):
+    """
+    Run (or resume) a cross-validated grid sweep.
+
+    Args:
+        kind: 'diabetes' or 'intent'
+        grid: Hyperparameter grid (defaults to DIABETES_GRID / INTENT_GRID)
+        csv_path: Training CSV (defaults to the bundled data)
+        folds: Number of stratified folds
+        seed: Fold shuffling seed
+        workers: Worker processes (default: CPU count)
+        results_path: JSON-lines results file (default: sweeps/<kind>_results.jsonl)
+
+    Returns:
+        list: All fold records of this sweep, including earlier runs
+    """
+    from models.diabetes_nn import DIABETES_PARAMS
+    from models.intent_nn import INTENT_PARAMS
+
+    if kind == "diabetes":
+        defaults, default_grid, default_csv = DIABETES_PARAMS, DIABETES_GRID, DIABETES_DATA_PATH
+    elif kind == "intent":
+        defaults, default_grid, default_csv = INTENT_PARAMS, INTENT_GRID, INTENTS_DATA_PATH
+    else:
+        raise ValueError(f"Unknown model kind: {kind}")
+
+    csv_path = csv_path or default_csv
+    results_path = results_path or os.path.join(SWEEP_DIR, f"{kind}_results.jsonl")
+    key = sweep_key(kind, csv_path, folds, seed)
+
+    records = load_results(results_path, key)
+    done = {(r["config_id"], r["fold"]) for r in records}
+    jobs = [(config_id, params, fold)
+            for config_id, params in expand_grid(defaults, grid or default_grid)
+            for fold in range(folds) if (config_id, fold) not in done]
+
+    print(f"\n🔬 {kind} sweep: {len(jobs)} fold jobs to run, {len(done)} already done "
+          f"({results_path})")
+    if not jobs:
+        return records
+
+    workers = workers or os.cpu_count() or 1
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    os.makedirs(os.path.dirname(results_path) or ".", exist_ok=True)
+
+    with open(results_path, "a", encoding="utf-8") as out, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                initializer=_init_worker,
+                                initargs=(kind, csv_path, folds, seed, threads)) as pool:
+        futures = [pool.submit(_run_fold, *job) for job in jobs]
+        for i, future in enumerate(as_completed(futures), 1):
+            record = {"sweep": key, **future.result()}
+            out.write(json.dumps(record) + "\n")
+            out.flush()  # Each finished fold survives an interrupted sweep
+            records.append(record)
+            print(f"   [{i}/{len(jobs)}] {record['config_id']} fold {record['fold']}: "
+                  f"val_accuracy {record['val_accuracy']:.3f} ({record['seconds']:.1f}s)")
+
+    return records
+
+
+# ==================== REPORTING ====================
+
+def print_ranking(kind, summaries, recommended, grid_keys):
+    print("\n" + "="*90)
+    print(f"{kind.upper()} SWEEP RANKING (mean ± std validation accuracy over folds)")
+    print("="*90)
+    print(f"   {'rank':<6}{'config':<12}{'accuracy':>16}{'loss':>9}{'params':>9}   settings")
+    for rank, s in enumerate(summaries, 1):
+        marker = " ⭐" if s is recommended else ""
+        settings = ", ".join(f"{k}={s['params'][k]}" for k in grid_keys)
+        print(f"   {rank:<6}{s['config_id']:<12}"
+              f"{s['mean_accuracy']:>9.3f} ± {s['std_accuracy']:.3f}"
+              f"{s['mean_loss']:>9.3f}{s['n_params']:>9,}   {settings}{marker}")
+    print("="*90)
+    if recommended:
+        print(f"⭐ Recommended (smallest within tolerance): {recommended['config_id']} "
+              f"— {recommended['n_params']:,} parameters, "
+              f"accuracy {recommended['mean_accuracy']:.3f}")
+
+
+def save_ranking(summaries, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["rank", "config_id", "mean_accuracy", "std_accuracy", "mean_loss",
+                         "n_params", "seconds", "params"])
+        for rank, s in enumerate(summaries, 1):
+            writer.writerow([rank, s["config_id"], f"{s['mean_accuracy']:.4f}",
+                             f"{s['std_accuracy']:.4f}", f"{s['mean_loss']:.4f}",
+                             s["n_params"], f"{s['seconds']:.1f}",
+                             json.dumps(s["params"], sort_keys=True)])
+
+
+# ==================== ENTRY POINT ====================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cross-validated hyperparameter sweep.")
+    parser.add_argument("kind", choices=["diabetes", "intent"])
+    parser.add_argument("--csv", dest="csv_path", help="Training CSV (default: bundled data)")
+    parser.add_argument("--grid", help="JSON object overriding grid entries, "
+                                       "e.g. '{\"hidden_units\": [[8, 4], [16, 8]]}'")
+    parser.add_argument("--folds", type=int, default=DEFAULT_FOLDS)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Accuracy the recommended (smallest) model may give up")
+    parser.add_argument("--results", dest="results_path",
+                        help=f"Results file (default: {SWEEP_DIR}/<kind>_results.jsonl)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    grid = dict(DIABETES_GRID if args.kind == "diabetes" else INTENT_GRID)
+    if args.grid:
+        grid.update(json.loads(args.grid))
+
+    records = run_sweep(args.kind, grid, args.csv_path, args.folds, args.seed,
+                        args.workers, args.results_path)
+
+    # Ranks every finished configuration of this sweep, including earlier grids
+    summaries, recommended = rank_configs(records, args.folds, args.tolerance)
+    print_ranking(args.kind, summaries, recommended, sorted(grid))
+
+    ranking_path = os.path.join(SWEEP_DIR, f"{args.kind}_ranking.csv")
+    os.makedirs(SWEEP_DIR, exist_ok=True)
+    save_ranking(summaries, ranking_path)
+    print(f"✅ Ranking saved: {ranking_path}")
+
+
+if __name__ == "__main__":
+    main()
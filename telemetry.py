@@ -0,0 +1,259 @@
+"""
+Chat Turn Telemetry
+===================
+Lightweight per-stage latency instrumentation for the chat loop.
+
+Each stage records into a fixed-size histogram with log-spaced buckets
+(1 µs to ~17 s), so memory is constant no matter how many turns are
+served. Timing uses time.perf_counter() (monotonic). When telemetry is
+disabled, stage() returns a shared no-op context manager and nothing is
+recorded.
+
+Snapshots can be exported as JSON or in the Prometheus text exposition
+format, either on demand, on SIGUSR1, or at process exit.
+"""
+
+import atexit
+import bisect
+import json
+import os
+import signal
+import threading
+import time
+
+
+# ==================== CONSTANTS ====================
+
+# Bucket upper bounds in seconds: 1 µs * 2^(k/4), k = 0..96 (~17 s)
+BUCKET_BOUNDS = tuple(1e-6 * 2 ** (k / 4) for k in range(97))
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+# ==================== HISTOGRAM ====================
+
+class Histogram:
+    """
+    Fixed-size latency histogram with log-spaced buckets.
+
+    Stages are timed from executor threads as well as the event loop, so
+    updates (and exports) hold the histogram's lock. The lock is reentrant
+    because the SIGUSR1 handler exports on the main thread, possibly while
+    that thread is inside record().
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max", "lock")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.lock = threading.RLock()
+
+    def record(self, seconds):
+        index = bisect.bisect_left(BUCKET_BOUNDS, seconds)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds < self.min:
+                self.min = seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q):
+        """
+        Estimate a quantile by interpolating inside the matching bucket.
+
+        Args:
+            q: Quantile in [0, 1]
+
+        Returns:
+            float: Latency in seconds (0.0 when empty)
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = BUCKET_BOUNDS[i - 1] if i > 0 else 0.0
+                upper = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / n
+                return min(max(estimate, self.min), self.max)
+            seen += n
+        return self.max
+
+
+# ==================== TELEMETRY ====================
+
+class _NullStage:
+    """No-op context manager returned while telemetry is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter() - self.start)
+        return False
+
+
+class Telemetry:
+    """Registry of per-stage histograms and event counters."""
+
+    def __init__(self, enabled=False, prefix="chatbot"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.RLock()  # Reentrant for the SIGUSR1 dump (see Histogram)
+
+    def stage(self, name):
+        """
+        Context manager timing one stage.
+
+        Usage:
+            with METRICS.stage("intent"):
+                ...
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self._histogram(name))
+
+    def record(self, name, seconds):
+        """Record an externally measured duration for a stage."""
+        if self.enabled:
+            self._histogram(name).record(seconds)
+
+    def count(self, event):
+        """Increment an event counter (e.g. 'intent.fallback')."""
+        if self.enabled:
+            with self._lock:
+                self.counters[event] = self.counters.get(event, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def _histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, Histogram())
+        return histogram
+
+    # ==================== EXPORT ====================
+
+    def snapshot(self):
+        """
+        Summarize every stage and counter.
+
+        Returns:
+            dict: {'stages': {name: {count, mean_ms, p50_ms, ...}}, 'counters': {...}}
+        """
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+        stages = {}
+        for name, h in histograms:
+            with h.lock:
+                stats = {"count": h.count,
+                         "mean_ms": 1e3 * h.total / h.count if h.count else 0.0,
+                         "max_ms": 1e3 * h.max}
+                for q in QUANTILES:
+                    stats[f"p{int(q * 100)}_ms"] = 1e3 * h.quantile(q)
+            stages[name] = stats
+        with self._lock:
+            counters = dict(sorted(self.counters.items()))
+        return {"stages": stages, "counters": counters}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """Render histograms, quantile gauges and counters in Prometheus text format."""
+        metric = f"{self.prefix}_stage_duration_seconds"
+        lines = [f"# HELP {metric} Chat turn stage latency.",
+                 f"# TYPE {metric} histogram"]
+
+        # Every stage exports the full fixed bucket list, so the set of `le`
+        # series is the same on every scrape
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+        quantiles = {}
+        for name, h in histograms:
+            with h.lock:
+                counts, count, total = list(h.counts), h.count, h.total
+                quantiles[name] = [h.quantile(q) for q in QUANTILES]
+            cumulative = 0
+            for bound, n in zip(BUCKET_BOUNDS, counts):
+                cumulative += n
+                lines.append(f'{metric}_bucket{{stage="{name}",le="{bound:.9g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{stage="{name}",le="+Inf"}} {count}')
+            lines.append(f'{metric}_sum{{stage="{name}"}} {total:.9g}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {count}')
+
+        quantile_metric = f"{self.prefix}_stage_duration_quantile_seconds"
+        lines += [f"# HELP {quantile_metric} Estimated stage latency quantiles.",
+                  f"# TYPE {quantile_metric} gauge"]
+        for name, _ in histograms:
+            for q, value in zip(QUANTILES, quantiles[name]):
+                lines.append(f'{quantile_metric}{{stage="{name}",quantile="{q}"}} '
+                             f'{value:.9g}')
+
+        counter_metric = f"{self.prefix}_events_total"
+        lines += [f"# HELP {counter_metric} Chat events.",
+                  f"# TYPE {counter_metric} counter"]
+        with self._lock:
+            counters = sorted(self.counters.items())
+        for event, n in counters:
+            lines.append(f'{counter_metric}{{event="{event}"}} {n}')
+
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """
+        Write a snapshot to path (.json for JSON, anything else Prometheus text).
+
+        The file is written to a temporary name and renamed, so scrapers
+        never see a partial file.
+        """
+        content = self.to_json() if path.endswith(".json") else self.to_prometheus()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        return path
+
+    def install_dump_handlers(self, path):
+        """Dump to path at process exit and whenever SIGUSR1 is received."""
+        atexit.register(self.dump, path)
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.dump(path))
+
+
+# Process-wide instance used by the chat loop
+METRICS = Telemetry()
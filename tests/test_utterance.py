@@ -0,0 +1,47 @@
+"""Regression tests for utterance.parse_utterance()."""
+
+import pytest
+
+from utterance import parse_utterance
+
+
+@pytest.mark.parametrize("text, scenario", [
+    # Inflected forms the substring matcher used to catch
+    ("what if I exercised more", "walk_daily"),
+    ("what if I keep exercising", "walk_daily"),
+    ("what if I walked every day", "walk_daily"),
+    ("what if I stop stressing", "reduce_stress"),
+    ("what if I was less stressed", "reduce_stress"),
+    ("what if I try strict dieting", "healthy_diet"),
+    ("what if I ate healthier", "healthy_diet"),
+    ("what if I had eaten junk", "poor_diet"),
+    ("what if I stopped exercising", "no_exercise"),
+    ("what if I avoided exercising", "no_exercise"),
+    # Whole-word matching still applies
+    ("this is great, I know", None),
+])
+def test_scenario(text, scenario):
+    assert parse_utterance(text).scenario == scenario
+
+
+@pytest.mark.parametrize("text, glucose", [
+    ("my sugar is high", "high"),
+    ("I reduced my sugar", "high"),
+    ("feeling low", "low"),
+    ("please follow up", "normal"),
+])
+def test_glucose(text, glucose):
+    assert parse_utterance(text).glucose == glucose
+
+
+def test_quite_is_not_a_negation():
+    assert not parse_utterance("I'd quite like to walk more").negated
+
+
+@pytest.mark.parametrize("text, health_plan", [
+    ("give me a step-by-step plan", True),
+    ("I need a long-term lifestyle plan", True),
+    ("plan my day", False),
+])
+def test_health_plan(text, health_plan):
+    assert parse_utterance(text).health_plan is health_plan
@@ -0,0 +1,163 @@
+"""
+Utterance Parser
+================
+Parses a user message into the cues the chat loop needs (glucose state,
+simulation scenario, negation, simulate/compare flags) in a single pass.
+
+The text is lowercased and tokenized once; every 1..N-word window of
+tokens is then looked up in a phrase table compiled at import time.
+Matching is therefore on whole words ("no" no longer matches "know") and
+the cost per turn depends on the message length, not the lexicon size.
+A single-word phrase ending in "*" is a stem and matches any word that
+starts with it ("exercis*" matches "exercised" and "exercising", but
+"eat*" still does not match "great").
+"""
+
+import re
+
+
+# ==================== LEXICON ====================
+
+# Cue category -> phrases that trigger it. Multi-word phrases are allowed;
+# single words ending in "*" are stems (see module docstring).
+CUE_PHRASES = {
+    "glucose_low": ["low", "hypo", "hypoglycemia"],
+    "glucose_high": ["high", "higher", "reduce*", "reducing", "hyperglycemia"],
+    "negation": ["don't", "dont", "do not", "no", "stop*", "not", "never", "avoid*",
+                 "skip", "skips", "skipped", "skipping", "quit", "quits", "quitting",
+                 "without", "bad", "poor", "junk"],
+    "exercise": ["walk*", "exercis*", "workout*"],
+    "diet": ["diet*", "eat*", "ate", "food*", "meal*"],
+    "diet_negative": ["junk", "unhealthy", "fast food", "sugary"],
+    "diet_positive": ["healthy", "healthier", "good", "strict", "better"],
+    "stress": ["stress*"],
+    "what_if": ["what if"],
+    "simulate": ["what if", "simulate", "show me", "predict", "compare"],
+    "compare": ["compare", "all scenarios", "everything"],
+    # Requests to change something only; status questions ("am I low risk?")
+    # must not start a goal-seek search
+    # Multi-step lifestyle plans; not bare "plan", which daily planning uses
+    "health_plan": ["step by step", "lifestyle plan", "health plan", "action plan",
+                    "long term plan"],
+    "goal_seek": ["lower my risk", "reduce my risk", "get my risk down", "get to low risk",
+                  "reach low risk", "what would it take", "what do i need to change",
+                  "what should i change", "what do i have to change"],
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def compile_lexicon(cue_phrases):
+    """
+    Build the phrase lookup table.
+
+    Args:
+        cue_phrases: dict mapping cue category to a list of phrases
+
+    Returns:
+        tuple: (dict phrase -> frozenset of categories, longest phrase in words,
+               dict stem -> frozenset of categories)
+    """
+    table, stems = {}, {}
+    for category, phrases in cue_phrases.items():
+        for phrase in phrases:
+            key = " ".join(TOKEN_PATTERN.findall(phrase.lower()))
+            if phrase.endswith("*"):
+                if " " in key:
+                    raise ValueError(f"Only single-word phrases can be stems: {phrase!r}")
+                stems.setdefault(key, set()).add(category)
+            else:
+                table.setdefault(key, set()).add(category)
+
+    max_words = max(len(key.split()) for key in table)
+    return ({key: frozenset(cats) for key, cats in table.items()}, max_words,
+            {stem: frozenset(cats) for stem, cats in stems.items()})
+
+
+LEXICON, MAX_PHRASE_WORDS, STEMS = compile_lexicon(CUE_PHRASES)
+
+
+# ==================== PARSED UTTERANCE ====================
+
+class ParsedUtterance:
+    """Cues extracted from one user message."""
+
+    __slots__ = ("text", "cues", "glucose", "scenario", "negated",
+                 "simulate", "what_if", "compare", "goal_seek", "health_plan")
+
+    def __init__(self, text, cues):
+        self.text = text
+        self.cues = cues
+        self.negated = "negation" in cues
+        self.simulate = "simulate" in cues
+        self.what_if = "what_if" in cues
+        self.compare = "compare" in cues
+        self.goal_seek = "goal_seek" in cues
+        self.health_plan = "health_plan" in cues
+        self.glucose = _resolve_glucose(cues)
+        self.scenario = _resolve_scenario(cues, self.negated)
+
+    def __repr__(self):
+        return (f"ParsedUtterance(glucose={self.glucose!r}, scenario={self.scenario!r}, "
+                f"negated={self.negated}, simulate={self.simulate}, compare={self.compare}, "
+                f"goal_seek={self.goal_seek}, health_plan={self.health_plan})")
+
+
+def parse_utterance(text, lexicon=LEXICON, max_words=MAX_PHRASE_WORDS, stems=STEMS):
+    """
+    Parse a user message in one tokenize-and-lookup pass.
+
+    Args:
+        text: User input string
+        lexicon: Phrase table from compile_lexicon()
+        max_words: Longest phrase in the lexicon, in words
+        stems: Stem table from compile_lexicon()
+
+    Returns:
+        ParsedUtterance: Extracted cues
+    """
+    tokens = TOKEN_PATTERN.findall(text.lower().replace("’", "'"))
+    cues = set()
+
+    for i in range(len(tokens)):
+        phrase = tokens[i]
+        for k in range(1, len(phrase) + 1):
+            categories = stems.get(phrase[:k])
+            if categories:
+                cues.update(categories)
+        for j in range(i + 1, min(i + max_words, len(tokens)) + 1):
+            if j > i + 1:
+                phrase = phrase + " " + tokens[j - 1]
+            categories = lexicon.get(phrase)
+            if categories:
+                cues.update(categories)
+
+    return ParsedUtterance(text, cues)
+
+
+# ==================== RESOLUTION ====================
+
+def _resolve_glucose(cues):
+    """'low' wins over 'high'; otherwise 'normal'."""
+    if "glucose_low" in cues:
+        return "low"
+    elif "glucose_high" in cues:
+        return "high"
+    return "normal"
+
+
+def _resolve_scenario(cues, negated):
+    """Pick a simulator scenario with the same precedence as the chat loop."""
+    if "exercise" in cues:
+        return "no_exercise" if negated else "walk_daily"
+
+    elif "diet" in cues:
+        if negated or "diet_negative" in cues:
+            return "poor_diet"
+        elif "diet_positive" in cues:
+            return "healthy_diet"
+
+    elif "stress" in cues:
+        return "reduce_stress"
+
+    return None